@@ -10,7 +10,10 @@ function connectToNativeHost() {
     console.log("Received from native host:", response);
 
     // --- COMMAND DISPATCHER ---
-    if (response.action === "close_tab") {
+    if (response.action === "resync_tabs") {
+      sendTabSnapshot();
+    }
+    else if (response.action === "close_tab") {
       if (response.tabId) {
         chrome.tabs.remove(response.tabId);
       }
@@ -24,7 +27,7 @@ function connectToNativeHost() {
       if (response.url) {
         chrome.tabs.create({ url: response.url, active: response.active !== false }, (tab) => {
           console.log("✅ Background Tab Created:", tab.id);
-          nativePort.postMessage({ action: "tab_created", tabId: tab.id });
+          nativePort.postMessage({ action: "tab_created", tabId: tab.id, requestId: response.requestId });
         });
       }
     }
@@ -45,42 +48,39 @@ function connectToNativeHost() {
       }
     }
     else if (response.action === "capture_tab") {
-      // TAB SCREENSHOT
-      if (response.tabId) {
-        // 1. Activate the tab first (required for captureVisibleTab)
-        chrome.tabs.update(response.tabId, { active: true }, () => {
-          // 2. Wait for render (500ms delay)
-          setTimeout(() => {
-            chrome.tabs.captureVisibleTab(response.windowId, { format: "png" }, (dataUrl) => {
-              if (chrome.runtime.lastError) {
-                console.error("Capture failed:", chrome.runtime.lastError);
-                nativePort.postMessage({ action: "capture_error", error: chrome.runtime.lastError.message });
-                return;
-              }
-              // 3. Send back to native host
-              nativePort.postMessage({ action: "capture_result", data: dataUrl, tabId: response.tabId });
-            });
-          }, 800); // 800ms delay to be safe
-        });
-      }
+      // TAB SCREENSHOT (sent back in chunks tagged with the requestId)
+      captureTab(response);
     }
     else if (["highlight", "click", "read", "scroll", "type", "scan", "press_key"].includes(response.action)) {
       console.log("🧭 NAV COMMAND RECEIVED:", response);
 
       const targetTabId = response.tabId;
+      // Echo the request id so Zyron can match the reply to the command that asked for it
+      const requestId = response.requestId;
+      const sendResult = (data) => {
+        if (nativePort) nativePort.postMessage({ action: "navigation_result", data: data, requestId: requestId });
+      };
 
       if (targetTabId) {
         // Targeted Tab Execution
         chrome.tabs.sendMessage(targetTabId, response).then(reply => {
-          if (reply) nativePort.postMessage({ action: "navigation_result", data: reply });
-        }).catch(err => console.error("Nav Error on Tab", targetTabId, err));
+          if (reply) sendResult(reply);
+        }).catch(err => {
+          console.error("Nav Error on Tab", targetTabId, err);
+          sendResult({ success: false, error: String(err) });
+        });
       } else {
         // Fallback to Active Tab
         chrome.tabs.query({ active: true, currentWindow: true }, (tabs) => {
           if (tabs && tabs[0]) {
             chrome.tabs.sendMessage(tabs[0].id, response).then(reply => {
-              if (reply) nativePort.postMessage({ action: "navigation_result", data: reply });
-            }).catch(err => console.error("Nav Error on Active Tab:", err));
+              if (reply) sendResult(reply);
+            }).catch(err => {
+              console.error("Nav Error on Active Tab:", err);
+              sendResult({ success: false, error: String(err) });
+            });
+          } else {
+            sendResult({ success: false, error: "No active tab" });
           }
         });
       }
@@ -92,12 +92,16 @@ function connectToNativeHost() {
       console.log("Native host disconnected with error:", p.error);
     }
     nativePort = null;
-    // Try to reconnect after a delay
-    setTimeout(connectToNativeHost, 10000);
+    // Try to reconnect after a delay (the new host starts from a fresh snapshot)
+    setTimeout(() => {
+      connectToNativeHost();
+      sendTabSnapshot();
+    }, 10000);
   });
 }
 
 connectToNativeHost();
+sendTabSnapshot();
 
 // Listen for messages from popup or page
 chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
@@ -107,35 +111,154 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
   }
 });
 
+// --- TAB SCREENSHOTS ---
+// Base64 characters per capture_chunk message (a multiple of 4, so every chunk decodes on its own)
+const CAPTURE_CHUNK_SIZE = 256 * 1024;
+
+function blobToBase64(blob) {
+  return new Promise((resolve, reject) => {
+    const reader = new FileReader();
+    reader.onload = () => resolve(reader.result.slice(reader.result.indexOf(",") + 1));
+    reader.onerror = () => reject(reader.error);
+    reader.readAsDataURL(blob);
+  });
+}
+
+async function captureTab(request) {
+  const requestId = request.requestId;
+  const fail = (error) => {
+    console.error("Capture failed:", error);
+    if (nativePort) nativePort.postMessage({ action: "capture_error", requestId: requestId, error: String(error) });
+  };
+  if (!request.tabId) return fail("No tabId given");
+
+  try {
+    const format = request.format || "jpeg";
+    const quality = request.quality ?? 80;
+    const started = performance.now();
+
+    // 1. Activate the tab first (required for captureVisibleTab) and let it render
+    await chrome.tabs.update(request.tabId, { active: true });
+    await new Promise(resolve => setTimeout(resolve, request.settleMs ?? 800));
+    const settled = performance.now();
+
+    // 2. captureVisibleTab encodes PNG or JPEG itself
+    const dataUrl = await chrome.tabs.captureVisibleTab(request.windowId, {
+      format: format === "png" ? "png" : "jpeg",
+      quality: quality
+    });
+    const captured = performance.now();
+
+    // 3. WebP, or a smaller size, means one more encode on an OffscreenCanvas
+    let mime = format === "png" ? "image/png" : "image/jpeg";
+    let base64 = null;
+    let width = null;
+    let height = null;
+    if (format === "webp" || request.maxWidth) {
+      const bitmap = await createImageBitmap(await (await fetch(dataUrl)).blob());
+      const scale = request.maxWidth ? Math.min(1, request.maxWidth / bitmap.width) : 1;
+      width = Math.round(bitmap.width * scale);
+      height = Math.round(bitmap.height * scale);
+      if (scale < 1 || format === "webp") {
+        const canvas = new OffscreenCanvas(width, height);
+        canvas.getContext("2d").drawImage(bitmap, 0, 0, width, height);
+        const blob = await canvas.convertToBlob({
+          type: format === "webp" ? "image/webp" : mime,
+          quality: quality / 100
+        });
+        mime = blob.type; // Falls back to PNG where WebP encoding is unsupported
+        base64 = await blobToBase64(blob);
+      }
+      bitmap.close();
+    }
+    if (base64 === null) base64 = dataUrl.slice(dataUrl.indexOf(",") + 1);
+    const encoded = performance.now();
+
+    // 4. Send back to native host in chunks; the first one carries the metadata
+    if (!nativePort) return;
+    const total = Math.max(1, Math.ceil(base64.length / CAPTURE_CHUNK_SIZE));
+    for (let index = 0; index < total; index++) {
+      const chunk = {
+        action: "capture_chunk",
+        requestId: requestId,
+        index: index,
+        total: total,
+        data: base64.slice(index * CAPTURE_CHUNK_SIZE, (index + 1) * CAPTURE_CHUNK_SIZE)
+      };
+      if (index === 0) {
+        Object.assign(chunk, {
+          mime: mime,
+          width: width,
+          height: height,
+          timings: {
+            settleMs: Math.round(settled - started),
+            captureMs: Math.round(captured - settled),
+            encodeMs: Math.round(encoded - captured)
+          }
+        });
+      }
+      nativePort.postMessage(chunk);
+    }
+  } catch (err) {
+    fail(err);
+  }
+}
+
 // Real-time tab monitoring
-async function sendTabsToHost() {
+// The host keeps a tab table: it gets one full snapshot, then only what changed.
+// Every event carries the next sequence number; on a gap the host asks for "resync_tabs".
+let tabSeq = 0;
+
+function tabInfo(tab) {
+  return {
+    id: tab.id,
+    title: tab.title,
+    url: tab.url,
+    windowId: tab.windowId,
+    active: tab.active
+  };
+}
+
+function sendTabEvent(type, payload) {
+  if (!nativePort) return; // The snapshot sent on reconnect covers anything missed
+  tabSeq += 1;
+  nativePort.postMessage({ action: "tab_event", type: type, seq: tabSeq, ...payload });
+}
+
+async function sendTabSnapshot() {
   if (!nativePort) return;
 
   try {
     const tabs = await chrome.tabs.query({});
-    const tabData = tabs.map(tab => ({
-      id: tab.id,
-      title: tab.title,
-      url: tab.url,
-      windowId: tab.windowId,
-      active: tab.active
-    }));
-
     nativePort.postMessage({
-      action: "update_tabs",
-      tabs: tabData
+      action: "tab_snapshot",
+      seq: tabSeq,
+      tabs: tabs.map(tabInfo)
     });
   } catch (e) {
     console.error("Error sending tabs:", e);
   }
 }
 
-// Update every 2 seconds for real-time Focus Mode support
-setInterval(sendTabsToHost, 2000);
-// Also update on tab events
-chrome.tabs.onUpdated.addListener(sendTabsToHost);
-chrome.tabs.onRemoved.addListener(sendTabsToHost);
-chrome.tabs.onActivated.addListener(sendTabsToHost);
+chrome.tabs.onCreated.addListener((tab) => {
+  sendTabEvent("created", { tab: tabInfo(tab) });
+});
+chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
+  // Loading progress, favicons etc. don't change what Zyron sees
+  if ("title" in changeInfo || "url" in changeInfo) {
+    sendTabEvent("updated", { tab: tabInfo(tab) });
+  }
+});
+chrome.tabs.onRemoved.addListener((tabId) => {
+  sendTabEvent("removed", { tabId: tabId });
+});
+chrome.tabs.onActivated.addListener((activeInfo) => {
+  sendTabEvent("activated", { tabId: activeInfo.tabId, windowId: activeInfo.windowId });
+});
+chrome.tabs.onAttached.addListener((tabId) => {
+  // Moved to another window
+  chrome.tabs.get(tabId).then(tab => sendTabEvent("updated", { tab: tabInfo(tab) })).catch(() => {});
+});
 
 // Function to get all tabs from all windows
 async function getAllTabs() {
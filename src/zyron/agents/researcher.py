@@ -1,10 +1,10 @@
 import time
-import ollama
 import os
-import psutil
+import zyron.features.processes as processes
 import requests
 from datetime import datetime
 from zyron.features.browser_control import navigate, read_page, scan_page, click_element, create_tab, close_tab
+from zyron.core.models import residency
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,13 +25,7 @@ RULES:
 
 def is_firefox_running():
     """Checks if any firefox.exe process is active."""
-    for proc in psutil.process_iter(['name']):
-        try:
-            if "firefox" in proc.info['name'].lower():
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    return False
+    return any(proc.name and "firefox" in proc.name.lower() for proc in processes.snapshot())
 
 def clean_html(html):
     """Very basic HTML text extraction for requests fallback."""
@@ -116,13 +110,12 @@ def perform_research(query):
     
     try:
         print(f"   → Synthesizing answer using {MODEL_NAME}...")
-        response = ollama.chat(
-            model=MODEL_NAME,
+        response = residency.chat(
+            MODEL_NAME,
             messages=[
                 {'role': 'system', 'content': RESEARCH_SYSTEM_PROMPT},
                 {'role': 'user', 'content': prompt},
-            ],
-            keep_alive=0
+            ]
         )
         answer = response['message']['content']
         print("✅ Research synthesis complete.")
@@ -1,11 +1,8 @@
 import os
 import webbrowser
-import pyautogui
-import cv2
 import screen_brightness_control as sbc
 import psutil
 import shutil
-import sounddevice as sd
 from scipy.io.wavfile import write
 import numpy as np
 import requests
@@ -14,6 +11,8 @@ import zyron.features.activity as activity_monitor
 import zyron.features.clipboard as clipboard_monitor
 import zyron.features.files.finder as file_finder  # Uses the new smart finder we just created
 import zyron.agents.researcher as researcher
+from zyron.core.audio import audio_capture, SAMPLE_RATE as AUDIO_SAMPLE_RATE
+from zyron.utils.lazy import lazy_import
 from src.zyron.utils.settings import settings
 from datetime import datetime
 import threading
@@ -22,6 +21,11 @@ import time
 # Audio control imports for media functions
 from pycaw.pycaw import AudioUtilities
 
+# Imported on first use or warmed up in the background (main.py): loading them costs more
+# than the rest of this module together
+pyautogui = lazy_import("pyautogui")
+cv2 = lazy_import("cv2")
+
 
 PROCESS_NAMES = {
     # Browsers
@@ -317,31 +321,20 @@ def capture_screen():
 
 def record_audio(duration=10):
     """Records audio from the default microphone for specified duration (in seconds).
-    Uses sounddevice library - Works on Windows Python 3.10 without C++ compiler!"""
+    Reads the shared capture stream (core/audio.py), so it works while the wake word engine listens."""
     os.makedirs(settings.MEDIA_PATH, exist_ok=True)
     file_path = os.path.join(os.getcwd(), f"{settings.MEDIA_PATH}/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_audio_recording.wav")
     
-    # Audio recording parameters
-    SAMPLE_RATE = 44100 
-    CHANNELS = 1 
-    
     print(f"🎤 Recording audio for {duration} seconds...")
     
     try:
       
-        recording = sd.rec(
-            int(duration * SAMPLE_RATE), 
-            samplerate=SAMPLE_RATE, 
-            channels=CHANNELS, 
-            dtype='int16'
-        )
-      
-        sd.wait()
+        recording = np.frombuffer(audio_capture.record(duration), dtype=np.int16)
         
         print("✅ Recording complete.")
         
         
-        write(file_path, SAMPLE_RATE, recording)
+        write(file_path, AUDIO_SAMPLE_RATE, recording)
         
         return file_path
         
@@ -795,19 +788,20 @@ def set_volume(level):
 def execute_command(cmd_json):
     """
     Main dispatcher for Zyron commands.
-    Supports single dict or list of dicts (chaining).
+    Supports a single dict or any iterable of dicts (chaining): a list, or a stream such as
+    brain.stream_command, whose actions run as soon as they arrive.
     """
     if not cmd_json: return
     
-    if isinstance(cmd_json, list):
-        results = []
-        for cmd in cmd_json:
-            res = _single_execute(cmd)
-            if res and isinstance(res, str):
-                results.append(res)
-        return " ".join(results) if results else "Done."
+    if isinstance(cmd_json, dict):
+        return _single_execute(cmd_json)
     
-    return _single_execute(cmd_json)
+    results = []
+    for cmd in cmd_json:
+        res = _single_execute(cmd)
+        if res and isinstance(res, str):
+            results.append(res)
+    return " ".join(results) if results else "Done."
 
 def _single_execute(cmd_json):
     if not cmd_json: return
@@ -1,11 +1,14 @@
 import logging
 import asyncio
 import os
+import time
 import re # Support regex for better scoring
 from dotenv import load_dotenv
 from telegram import Update, constants, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, ContextTypes, MessageHandler, CommandHandler, CallbackQueryHandler, filters
-from zyron.core.brain import process_command
+from zyron.core.brain import stream_command
+from zyron.core.intents import telegram_router
+from zyron.core.models import warm_up
 from zyron.agents.system import execute_command, capture_webcam
 import zyron.features.browser_control as browser_control
 import zyron.core.memory as memory
@@ -15,6 +18,7 @@ import zyron.features.files.tracker as file_tracker
 import zyron.features.focus_mode as focus_mode
 import zyron.features.zombie_reaper as zombie_reaper
 from zyron.utils.env_check import check_dependencies
+from zyron.utils import lazy
 
 # Run health check before anything else
 check_dependencies()
@@ -103,6 +107,39 @@ async def safe_send_action(bot, chat_id, action):
     except Exception as e:
         print(f"⚠️ Network Warning: Could not send chat action: {e}")
 
+async def stream_actions(user_text):
+    """Run brain.stream_command in a worker thread and yield each action as soon as it is parsed"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+
+    def produce():
+        try:
+            for action in stream_command(user_text):
+                loop.call_soon_threadsafe(queue.put_nowait, action)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+    loop.run_in_executor(None, produce)
+    while True:
+        item = await queue.get()
+        if item is finished:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+async def _prepend(first, rest):
+    yield first
+    async for item in rest:
+        yield item
+
+async def _from_list(items):
+    for item in items:
+        yield item
+
 @auth_required
 async def handle_clipboard_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle inline button callbacks for clipboard items"""
@@ -348,28 +385,13 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # 1. Safe "Typing" Indicator (Won't crash if internet lags)
     await safe_send_action(context.bot, chat_id, constants.ChatAction.TYPING)
 
-    # Pre-process common commands
+    # Pre-process common commands (one pass over the text, see core/intents.py)
     command_json = None
+    intent = telegram_router.match(user_text)
     
-    if "/battery" in lower_text or "battery" in lower_text:
-        command_json = {"action": "check_battery"}
-    elif "/systemhealth" in lower_text or "system health" in lower_text:
-        command_json = {"action": "check_health"}
-    elif ("/screenshot" in lower_text or "screenshot" in lower_text) and not ("tab" in lower_text or "browser" in lower_text):
-        command_json = {"action": "take_screenshot"}
-    elif "/sleep" in lower_text:
-        command_json = {"action": "system_sleep"}
-    elif "/shutdown" in lower_text or "shutdown" in lower_text:
-        command_json = {"action": "shutdown_pc"}
-    elif "/restart" in lower_text or "restart" in lower_text:
-        command_json = {"action": "restart_pc"}
-    elif "/panic" in lower_text or "🚨 panic" in lower_text:
-        command_json = {"action": "system_panic"}
-    elif "/camera_on" in lower_text:
-        command_json = {"action": "camera_stream", "value": "on"}
-    elif "/camera_off" in lower_text:
-        command_json = {"action": "camera_stream", "value": "off"}
-    elif "/recordaudio" in lower_text:
+    if intent is None:
+        pass
+    elif intent.name == "record_audio":
         parts = lower_text.split()
         if len(parts) > 1:
             arg = parts[1]
@@ -398,19 +420,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=get_main_keyboard()
             )
             return
-            
-    elif "/location" in lower_text or any(x in lower_text for x in ["my location", "where am i", "laptop location", "where is my laptop", "find location"]):
-        command_json = {"action": "get_location"}
-    # --- EXISTING BUTTON TRIGGERS ---
-    elif "/clear_bin" in lower_text or "clear bin" in lower_text:
-        command_json = {"action": "clear_recycle_bin"}
-    elif "/storage" in lower_text or "check storage" in lower_text:
-        command_json = {"action": "check_storage"}
-    elif "/activities" in lower_text or "activities" in lower_text:
-        command_json = {"action": "get_activities"}
     
     # --- MEDIA CONTROLLER ---
-    elif "/media" in lower_text:
+    elif intent.name == "media_menu":
         # Send inline keyboard for media controls
         keyboard = [
             [
@@ -433,33 +445,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             reply_markup=reply_markup
         )
         return  # Exit early since we handled this
-    
-    # --- NEW CLIPBOARD TRIGGER ---
-    elif "/copied_texts" in lower_text or any(x in lower_text for x in ["copied texts", "clipboard history", "what did i copy", "show copied"]):
-        command_json = {"action": "get_clipboard_history"}
-
-    # --- FEATURE #11: FOCUS MODE COMMANDS ---
-    elif "/focus_mode_on" in lower_text or "focus on" in lower_text:
-        command_json = {"action": "focus_mode", "sub_action": "on"}
-    elif "/focus_mode_off" in lower_text or "focus off" in lower_text:
-        command_json = {"action": "focus_mode", "sub_action": "off"}
-    elif "/blacklist" in lower_text:
-        # Check for arguments: /blacklist add steam discord
-        parts = lower_text.split()
-        if len(parts) >= 3:
-            sub_action = parts[1]
-            items = parts[2:] # Capture all remaining parts
-            if sub_action == "add":
-                command_json = {"action": "focus_mode", "sub_action": "add", "items": items}
-            elif sub_action == "remove":
-                command_json = {"action": "focus_mode", "sub_action": "remove", "items": items}
-            else:
-                command_json = {"action": "focus_mode", "sub_action": "status"}
-        else:
-            command_json = {"action": "focus_mode", "sub_action": "status"}
 
     # --- CAFFEINE MODE (KEEP AWAKE) COMMANDS ---
-    elif "/caffeine" in lower_text:
+    elif intent.name == "caffeine":
         # Parse argument: on or off
         parts = lower_text.split()
         if len(parts) >= 2:
@@ -484,39 +472,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
     
-    # --- CAFFEINE MODE KEYBOARD BUTTONS ---
-    elif "☕ stay awake" in lower_text:
-        command_json = {"action": "toggle_caffeine", "state": True}
-    elif "💤 normal mode" in lower_text:
-        command_json = {"action": "toggle_caffeine", "state": False}
-
-    # --- NAVIGATION AGENT TRIGGERS ---
-    elif "/read" in lower_text or "read page" in lower_text:
-        command_json = {"action": "browser_nav", "sub_action": "read"}
-        
-    elif "/scan" in lower_text:
-        command_json = {"action": "browser_nav", "sub_action": "scan"}
-        
-    elif "/scroll" in lower_text or "scroll down" in lower_text:
-        direction = "down"
-        if "up" in lower_text: direction = "up"
-        if "top" in lower_text: direction = "top"
-        if "bottom" in lower_text: direction = "bottom"
-        command_json = {"action": "browser_nav", "sub_action": "scroll", "direction": direction}
-        
-    elif "/type" in lower_text:
-        try:
-            parts = user_text.split(" ", 2)
-            if len(parts) >= 3:
-                command_json = {"action": "browser_nav", "sub_action": "type", "selector": parts[1], "text": parts[2]}
-        except: pass
-        
-    elif "/click" in lower_text:
-        try:
-            parts = user_text.split(" ", 1)
-            if len(parts) >= 2:
-                command_json = {"action": "browser_nav", "sub_action": "click", "selector": parts[1]}
-        except: pass
+    else:
+        # Battery, screenshot, power, camera, focus mode, navigation...
+        command_json = intent.command
 
     # Show processing message (with error handling)
     status_msg = None
@@ -536,26 +494,57 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         pass # If we can't send "Thinking", just continue
 
     if not command_json:
-        loop = asyncio.get_running_loop()
+        # Use AI to process command - actions are streamed, the first one runs while the model
+        # is still writing the rest (so the total is unknown up front)
+        actions = stream_actions(user_text)
         try:
-            # Use AI to process command - now returns list
-            command_list = await loop.run_in_executor(None, process_command, user_text)
+            first_action = await actions.__anext__()
+        except StopAsyncIteration:
+            first_action = None
         except Exception as e:
             # If AI fails, send error
             if status_msg: await status_msg.delete()
             await update.message.reply_text(f"❌ Brain Error: {e}", reply_markup=get_main_keyboard())
             return
+        command_source = _prepend(first_action, actions) if first_action else _from_list([])
+        total_commands = None
     else:
         # Normalize pre-parsed command to list
         command_list = [command_json] if isinstance(command_json, dict) else command_json
+        command_source = _from_list(command_list or [])
+        total_commands = len(command_list) if command_list else 0
 
     # --- MULTI-COMMAND EXECUTION LOOP ---
-    total_commands = len(command_list) if command_list else 0
+    cmd_index = -1
+    previous_action = None
     
-    for cmd_index, command_json in enumerate(command_list or []):
+    while True:
+        # Pull the next action by hand: the brain can still fail mid-stream, after earlier actions ran
+        try:
+            command_json = await command_source.__anext__()
+        except StopAsyncIteration:
+            break
+        except Exception as e:
+            print(f"❌ Brain Error (mid-stream): {e}")
+            if status_msg:
+                try: await status_msg.delete()
+                except Exception: pass
+            await update.message.reply_text(f"❌ Brain Error: {e}", reply_markup=get_main_keyboard())
+            return
+        cmd_index += 1
+        
+        # --- DELAY BETWEEN CHAINED BROWSER COMMANDS ---
+        if cmd_index > 0:
+            # Delay for browser actions to allow page to load
+            if previous_action in ["open_url", "browser_nav", "browser_control"]:
+                await asyncio.sleep(2.5)
+            else:
+                await asyncio.sleep(0.5)
+        
         # Show step indicator for multi-command chains
-        if total_commands > 1:
-            step_msg = f"⚙️ Step {cmd_index + 1}/{total_commands}: {command_json.get('action', 'Processing')}..."
+        if (total_commands or 0) > 1 or (total_commands is None and cmd_index > 0):
+            step_total = f"/{total_commands}" if total_commands else ""
+            step_msg = f"⚙️ Step {cmd_index + 1}{step_total}: {command_json.get('action', 'Processing')}..."
             try:
                 if status_msg:
                     await status_msg.edit_text(step_msg)
@@ -594,8 +583,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # --- ACTIVITIES HANDLER (Supports splitting messages) ---
         if action == "get_activities":
             if status_msg: await status_msg.delete()
-            # 1. Get raw data from muscles (which calls activity_monitor)
-            raw_data = execute_command(command_json)
+            # 1. Get raw data from muscles (which calls activity_monitor), off the event loop
+            loop = asyncio.get_running_loop()
+            raw_data = await loop.run_in_executor(None, execute_command, command_json)
             
             if raw_data:
                 # 2. Format the data using the helper function in activity_monitor
@@ -1075,23 +1065,20 @@ Longitude: {location_data['longitude']}
                         await update.message.reply_text(f"🎬 Command {command} sent to **{tab_title}**", reply_markup=get_main_keyboard())
                     elif command == "screenshot":
                         window_id = best_match.get('windowId')
-                        browser_control.capture_tab_with_window(tab_id, window_id)
                         loader = await update.message.reply_text("📸 Capturing tab...", reply_markup=get_main_keyboard())
-                        shot_path = os.path.join(os.environ.get('TEMP', ''), 'zyron_tab_screenshot.png')
-                        if os.path.exists(shot_path):
-                            try: os.remove(shot_path)
-                            except: pass
-                        found = False
-                        for _ in range(10):
-                            if os.path.exists(shot_path):
-                                found = True
-                                break
-                            await asyncio.sleep(0.5)
-                        if found:
-                            await update.message.reply_photo(photo=open(shot_path, 'rb'), caption=f"📸 **{best_match.get('title')}**")
+                        shot = await browser_control.capture_tab_async(tab_id, window_id)
+                        if shot.get("success"):
+                            upload_started = time.perf_counter()
+                            await update.message.reply_photo(photo=shot["image"], caption=f"📸 **{best_match.get('title')}**")
                             await loader.delete()
+                            timings = shot["timings"]
+                            upload_ms = (time.perf_counter() - upload_started) * 1000
+                            print(f"📸 Tab capture: {timings['totalMs']:.0f} ms to bytes "
+                                  f"(settle {timings.get('settleMs', 0):.0f}, capture {timings.get('captureMs', 0):.0f}, "
+                                  f"encode {timings.get('encodeMs', 0):.0f}, transfer {timings.get('transferMs', 0):.0f}) "
+                                  f"+ Telegram upload {upload_ms:.0f} ms, {len(shot['image']) // 1024} KB {shot.get('mime')}")
                         else:
-                            await loader.edit_text("❌ Screenshot timeout.")
+                            await loader.edit_text(f"❌ Screenshot failed: {shot.get('error')}")
                 else:
                     await update.message.reply_text(f"❌ Found '**{best_match.get('title', 'Unknown')}**' but it has no ID.", reply_markup=get_main_keyboard())
                 return
@@ -1558,13 +1545,7 @@ Longitude: {location_data['longitude']}
                 if status_msg: await status_msg.delete()
                 await update.message.reply_text(f"❌ Error: {e}", reply_markup=get_main_keyboard())
 
-        # --- DELAY BETWEEN CHAINED BROWSER COMMANDS ---
-        if total_commands > 1 and cmd_index < total_commands - 1:
-            # Delay for browser actions to allow page to load
-            if action in ["open_url", "browser_nav", "browser_control"]:
-                await asyncio.sleep(2.5)
-            else:
-                await asyncio.sleep(0.5)
+        previous_action = action
 
 if __name__ == "__main__":
     print("🚀 TELEGRAM BOT STARTED...")
@@ -1582,6 +1563,14 @@ if __name__ == "__main__":
         application.add_handler(CallbackQueryHandler(handle_media_callback, pattern="^(media_|vol_)"))
         application.add_handler(MessageHandler(filters.TEXT, handle_message))
         
+        # The bot owns the browser bridge (a voice assistant started later goes through it)
+        browser_control.start_bridge()
+        
+        # Load the models in the background so the first message doesn't pay the cold start
+        warm_up()
+        # Same for the screenshot/webcam libraries the system agent imports lazily
+        lazy.warm_up("pyautogui", "cv2")
+        
         # Run
         print("🤖 Bot is pooling...")
         
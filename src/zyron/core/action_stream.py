@@ -0,0 +1,71 @@
+"""
+Action Stream Module for Zyron Desktop Assistant
+Incremental parser that pulls complete action objects out of a streamed LLM answer
+"""
+
+import json
+
+
+class ActionStreamParser:
+    """
+    Feed it the model's output chunk by chunk; it returns every action object as soon as
+    its closing brace arrives.
+
+    Handles a single object, a JSON array of objects, ``` fences and stray chatter around
+    the JSON: anything outside a top-level {...} is skipped, so the array brackets and the
+    commas between actions never have to be complete.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.count = 0
+
+    def feed(self, chunk):
+        """Consume a piece of text; returns the list of action dicts completed by it"""
+        completed = []
+        for char in chunk:
+            if self._depth == 0:
+                # Between actions: wait for the next object to open
+                if char == '{':
+                    self._buffer = ['{']
+                    self._depth = 1
+                continue
+
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    action = self._finish()
+                    if action is not None:
+                        completed.append(action)
+        return completed
+
+    def _finish(self):
+        text = ''.join(self._buffer)
+        self._buffer = []
+        try:
+            action = json.loads(text)
+        except ValueError:
+            print(f"⚠️ Skipping malformed action: {text[:80]}")
+            return None
+        if not isinstance(action, dict):
+            return None
+        self.count += 1
+        return action
@@ -0,0 +1,282 @@
+"""
+Audio Capture Service for Zyron Desktop Assistant
+One long-lived microphone stream shared by the wake word engine, command capture and recordings
+"""
+
+import time
+import wave
+import threading
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # int16 mono
+
+# Audio kept in the ring; a reader further behind than this loses the oldest part
+RING_SECONDS = 30
+
+# Microphone callback size: small enough for wake word spotting, large enough to be cheap
+BLOCK_MS = 20
+
+
+def seconds_to_bytes(seconds):
+    return int(seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+
+
+def bytes_to_seconds(count):
+    return count / SAMPLE_WIDTH / SAMPLE_RATE
+
+
+class AudioRing:
+    """
+    Fixed-size byte ring with one writer and any number of readers.
+
+    Positions are absolute byte offsets into the stream since it started. The writer copies a
+    block in and only then advances `written`, so readers never see a half-written block and
+    need no lock: a reader only checks that its offset hasn't been overwritten yet.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity - capacity % SAMPLE_WIDTH
+        self._buffer = bytearray(self.capacity)
+        self.written = 0
+
+    def write(self, data):
+        data = bytes(data)
+        total = len(data)
+        data = data[-self.capacity:]
+        # Only the tail of an oversized block is kept: it lands where its first byte would have
+        start = (self.written + total - len(data)) % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        self._buffer[:len(data) - first] = data[first:]
+        self.written += total
+
+    @property
+    def oldest(self):
+        return max(0, self.written - self.capacity)
+
+    def read(self, offset, max_bytes=None):
+        """Bytes from offset up to what has been written (at most max_bytes); offset is clamped to what's still held"""
+        end = self.written
+        offset = max(offset, end - self.capacity)
+        if max_bytes is not None:
+            end = min(end, offset + max_bytes)
+        if end <= offset:
+            return offset, b""
+        start = offset % self.capacity
+        count = end - offset
+        if start + count <= self.capacity:
+            data = bytes(self._buffer[start:start + count])
+        else:
+            data = bytes(self._buffer[start:]) + bytes(self._buffer[:count - (self.capacity - start)])
+        # The writer may have lapped us while copying: drop what was overwritten
+        overrun = self.written - self.capacity - offset
+        if overrun > 0:
+            data = data[overrun:]
+            offset += overrun
+        return offset, data
+
+
+class AudioReader:
+    """A consumer's own position in the shared stream"""
+
+    def __init__(self, service, offset):
+        self.service = service
+        self.offset = offset
+        self.dropped = 0  # Bytes lost because this reader fell more than RING_SECONDS behind
+
+    def read(self, max_bytes=None, timeout=0.2):
+        """Next available audio (waits up to timeout for some); b"" when there is none yet"""
+        if self.service.ring.written <= self.offset:
+            self.service.wait_for_data(self.offset, timeout)
+        start, data = self.service.ring.read(self.offset, max_bytes)
+        self.dropped += start - self.offset
+        self.offset = start + len(data)
+        return data
+
+    def blocks(self, block_bytes=None, duration=None, stop=None):
+        """
+        Yields audio as it arrives (in pieces of block_bytes when given) until `duration`
+        seconds of wall time pass or stop() returns True; runs forever otherwise.
+        """
+        deadline = time.time() + duration if duration is not None else None
+        pending = b""
+        while (deadline is None or time.time() < deadline) and not (stop and stop()):
+            if not self.service.running and self.service.ring.written <= self.offset:
+                return  # Source ended (e.g. end of a replayed file)
+            pending += self.read(timeout=0.05)
+            if block_bytes:
+                while len(pending) >= block_bytes:
+                    yield pending[:block_bytes]
+                    pending = pending[block_bytes:]
+            elif pending:
+                yield pending
+                pending = b""
+        if pending:
+            yield pending
+
+    @property
+    def position(self):
+        return self.offset
+
+
+class MicrophoneSource:
+    """Default input device through sounddevice, delivering BLOCK_MS blocks"""
+
+    def __init__(self, block_ms=BLOCK_MS, device=None):
+        self.block_ms = block_ms
+        self.device = device
+        self._stream = None
+
+    def start(self, write, ended):
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            write(indata)
+
+        self._stream = sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=int(SAMPLE_RATE * self.block_ms / 1000),
+                                         dtype='int16', channels=1, device=self.device, callback=callback)
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class FileSource:
+    """
+    Replays a 16 kHz mono 16-bit WAV file as if it were the microphone (tests, benchmarks).
+    realtime=False delivers the blocks as fast as the readers can be woken.
+    """
+
+    def __init__(self, path, block_ms=BLOCK_MS, realtime=True, loop=False):
+        self.path = path
+        self.block_ms = block_ms
+        self.realtime = realtime
+        self.loop = loop
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, write, ended):
+        with wave.open(self.path, 'rb') as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{self.path}: expected 16 kHz mono 16-bit PCM")
+        self._thread = threading.Thread(target=self._run, args=(write, ended), daemon=True, name="audio-file-source")
+        self._thread.start()
+
+    def _run(self, write, ended):
+        frames = max(1, int(SAMPLE_RATE * self.block_ms / 1000))
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            with wave.open(self.path, 'rb') as wav:
+                while not self._stop.is_set():
+                    data = wav.readframes(frames)
+                    if not data:
+                        break
+                    if self.realtime:
+                        next_at += bytes_to_seconds(len(data))
+                        time.sleep(max(0.0, next_at - time.perf_counter()))
+                    write(data)
+            if not self.loop:
+                break
+        ended()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+class AudioCaptureService:
+    """
+    Keeps one input stream open and writes it into an AudioRing; every consumer (wake word,
+    command recognition, recordings) reads through its own AudioReader. Nothing reopens the
+    device between the wake word and the command, and a reader can start at an earlier offset
+    (e.g. just after the wake word) as long as it is still in the ring.
+    """
+
+    def __init__(self, source=None, ring_seconds=RING_SECONDS):
+        self.source = source
+        self.ring = AudioRing(seconds_to_bytes(ring_seconds))
+        self.running = False  # Audio is still arriving
+        self._started = False  # Stays set after a replayed file ends, so it isn't replayed again
+        self._data = threading.Condition()
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return self
+            if self.source is None:
+                self.source = MicrophoneSource()
+            self.running = self._started = True
+            try:
+                self.source.start(self._write, self._ended)
+            except Exception:
+                self.running = self._started = False
+                raise
+            print("🎙️ Audio capture started")
+        return self
+
+    def _write(self, data):
+        self.ring.write(data)
+        # Wake readers waiting for audio (the data itself is read without this lock)
+        with self._data:
+            self._data.notify_all()
+
+    def _ended(self):
+        """The source ran out (end of a replayed file): readers finish once they catch up"""
+        self.running = False
+        with self._data:
+            self._data.notify_all()
+
+    def wait_for_data(self, offset, timeout):
+        with self._data:
+            if self.ring.written <= offset and self.running:
+                self._data.wait(timeout)
+
+    def stop(self):
+        with self._start_lock:
+            if self.source is not None and self._started:
+                self.source.stop()
+            self.running = self._started = False
+        with self._data:
+            self._data.notify_all()
+
+    @property
+    def position(self):
+        """Offset of the newest audio (where a reader starting 'now' begins)"""
+        return self.ring.written
+
+    def reader(self, offset=None):
+        """A reader starting at offset (default: now); offsets older than the ring start at the oldest audio held"""
+        reader = AudioReader(self, self.position if offset is None else max(offset, self.ring.oldest))
+        self.start()
+        return reader
+
+    def record(self, seconds, offset=None):
+        """`seconds` of audio from offset (default: now), as raw int16 bytes"""
+        reader = self.reader(offset)
+        wanted = seconds_to_bytes(seconds)
+        chunks = []
+        received = 0
+        deadline = time.time() + seconds + 2.0
+        while received < wanted and time.time() < deadline:
+            if not self.running and self.ring.written <= reader.offset:
+                break
+            data = reader.read(wanted - received, timeout=0.1)
+            chunks.append(data)
+            received += len(data)
+        return b"".join(chunks)
+
+
+audio_capture = AudioCaptureService()
+
+
+def use_source(source):
+    """Swap the shared service's source (e.g. a FileSource in tests); the next reader starts it"""
+    audio_capture.stop()
+    audio_capture.source = source
+    audio_capture.ring = AudioRing(audio_capture.ring.capacity)
+    return audio_capture
@@ -1,7 +1,12 @@
-import ollama
-import json
-from .memory import get_context_string
-from src.zyron.utils.settings import settings
+import time
+from .action_stream import ActionStreamParser
+from .memory import get_context_string, get_context_key
+from .response_cache import response_cache
+from .intents import route_command
+from .models import residency
+
+# Response cache hit rate is logged every this many cache lookups
+CACHE_STATS_EVERY = 25
 
 
 BASE_SYSTEM_PROMPT = """
@@ -113,176 +118,116 @@ Use the [CURRENT CONTEXT STATE] to resolve "it", "that", "there".
 """
 
 def process_command(user_input):
-    print(f"⚡ Sending to Qwen: {user_input}")
+    """Full list of actions for user_input (see stream_command for early dispatch)"""
+    return list(stream_command(user_input))
+
+
+def _apply_overrides(data, user_input, lower, is_first):
+    """Fix-ups that depend on what the model answered, applied to each streamed action"""
+    # 11. Force File Send (MERGED LOGIC)
+    send_keywords = ["give", "send", "upload", "fetch", "get"]
+    safe_to_override = True
+    
+    # Added 'storage', 'bin', 'clipboard', 'copied' to safe exclusion list
+    for k in ["list", "camera", "battery", "cpu", "ram", "health", "record", "audio", "activities", "storage", "bin", "clipboard", "copied", "copy"]:
+        if k in lower:
+            safe_to_override = False
+            break
+            
+    if any(k in lower for k in send_keywords) and safe_to_override:
+        found_path = data.get('path') or data.get('url') or data.get('app_name')
+        if found_path:
+            data = {"action": "send_file", "path": found_path}
+
+    # 12. Force Web Research
+    research_triggers = ["who is", "what is", "how much", "tell me about", "look up", "research", "search for", "find info", "is there", "are there"]
+    is_question_str = any(lower.startswith(t) for t in ["who", "what", "how", "where", "why", "when", "is ", "are ", "tell me", "can you find"])
+    is_actual_question = lower.endswith("?") or is_question_str
+    
+    # Only override if it's currently general chat or a weak match
+    # AND it doesn't look like a system command (e.g. "What's my battery")
+    system_keywords = ["battery", "health", "cpu", "ram", "storage", "recycle", "clipboard", "copied", "screenshot", "activities", "open", "close"]
+    looks_like_system = any(k in lower for k in system_keywords)
+
+    if is_first and (is_actual_question or any(t in lower for t in research_triggers)) and data.get("action") == "general_chat" and not looks_like_system:
+        data = {"action": "web_research", "query": user_input}
+
+    return data
+
+
+def stream_command(user_input):
+    """
+    Yields the actions for user_input one by one, as soon as each is known.
+    The model's answer is streamed and parsed incrementally, so the first step of a
+    multi-step answer can run while the model is still writing the rest.
+    """
+    started = time.perf_counter()
+
+    # Deterministic commands are resolved by the intent router, no model call needed
+    routed = route_command(user_input)
+    if routed is not None:
+        print(f"⚡ Fast path: {routed['action']}")
+        yield routed
+        return
+
+    # Repeated commands are answered from the response cache
+    context_key = get_context_key(include_short_term=response_cache.needs_short_term_context(user_input))
+    cache_key = response_cache.make_key(user_input, context_key)
+    cached = response_cache.get(cache_key)
+    stats = response_cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    if lookups and lookups % CACHE_STATS_EVERY == 0:
+        print(f"📊 Response cache: {stats['hit_rate']:.0%} hits over {lookups} lookups, {stats['entries']} entries")
+    if cached is not None:
+        print(f"⚡ Cache hit: {[a.get('action') for a in cached]}")
+        yield from cached
+        return
+
+    print(f"⚡ Sending to {residency.intent_model}: {user_input}")
     
     
     current_context = get_context_string()
     
     
     full_prompt = BASE_SYSTEM_PROMPT + "\n" + current_context
+    lower = user_input.lower()
+    actions = []
     
     try:
-        response = ollama.chat(
-            model=settings.MODEL_NAME, 
+        # Intent parsing uses the pinned intent model (the main model unless INTENT_MODEL_NAME is set)
+        pieces = residency.stream_chat(
+            residency.intent_model, 
             messages=[
                 {'role': 'system', 'content': full_prompt},
                 {'role': 'user', 'content': user_input},
-            ],
-            keep_alive=0 
+            ]
         )
-        content = response['message']['content']
-        
-        
-        if "```" in content:
-            content = content.replace("```json", "").replace("```", "").strip()
+        parser = ActionStreamParser()
         
-        data = json.loads(content)
-        
-        
-        lower = user_input.lower()
-        
-        # 1. Force Camera
-        if "camera" in lower and "on" in lower: 
-            data = {"action": "camera_stream", "value": "on"}
-        elif "camera" in lower and "off" in lower: 
-            data = {"action": "camera_stream", "value": "off"}
-            
-        # 2. Force Sleep/Screenshot/Battery
-        elif "/sleep" in lower: 
-            data = {"action": "system_sleep"}
-        elif "/shutdown" in lower:
-            data = {"action": "shutdown_pc"}
-        elif "/restart" in lower:
-            data = {"action": "restart_pc"}
-        elif ("/screenshot" in lower or "screenshot" in lower) and not ("tab" in lower or "browser" in lower): 
-            data = {"action": "take_screenshot"}
-        elif "battery" in lower: 
-            data = {"action": "check_battery"}
-            
-        # 3. Force Health Check
-        elif any(x in lower for x in ["cpu", "ram", "system health", "lag", "pc status"]):
-            data = {"action": "check_health"}
-
-        # 4. Force Memory Save
-        elif "my name is" in lower:
-            name_part = user_input.split("is")[-1].strip()
-            name_part = name_part.replace(".", "").replace("!", "")
-            data = {"action": "save_memory", "key": "user_name", "value": name_part}
-
-        # 5. Force Audio Recording
-        elif "/recordaudio" in lower or "record audio" in lower:
-            data = {"action": "record_audio", "duration": 10}
-
-        # 6. Force Activity Check
-        elif any(x in lower for x in ["/activities", "/current_activities", "current activities", "what's open", "running apps", "active windows", "show activities", "what is happening", "open tabs", "what am i doing"]):
-            data = {"action": "get_activities"}
-
-        # 7. Force Clear Recycle Bin (FROM OLD CODE)
-        elif any(x in lower for x in ["/clear_bin", "clear recycle bin", "empty recycle bin", "delete recycle bin", "clear bin", "empty bin", "clean recycle bin", "clear the bin", "empty the bin"]):
-            data = {"action": "clear_recycle_bin"}
-
-        # 8. Force Storage Check (FROM OLD CODE)
-        elif any(x in lower for x in ["/storage", "check storage", "disk space", "storage space", "drive space", "how much storage", "storage status", "check drives", "disk usage", "storage left"]):
-            data = {"action": "check_storage"}
-
-        # 9. Force Clipboard History (FROM NEW CODE)
-        elif any(x in lower for x in ["/copied_texts", "copied texts", "clipboard history", "clipboard", "what did i copy", "show copied", "give me copied texts"]):
-            data = {"action": "get_clipboard_history"}
-
-        # 10. Force Caffeine Mode (Keeping Awake)
-        elif any(x in lower for x in ["keep awake", "don't sleep", "stay awake", "enable caffeine", "disable sleep", "caffeine mode on", "keep system awake", "prevent sleep", "no sleep"]):
-            data = {"action": "toggle_caffeine", "state": True}
-        elif any(x in lower for x in ["go to sleep", "disable caffeine", "normal mode", "can sleep now", "caffeine mode off", "allow sleep", "enable sleep"]):
-            data = {"action": "toggle_caffeine", "state": False}
-
-        # 11. Browser Control (NEW)
-        # "Close the youtube tab", "Mute the music"
-        elif "close" in lower and ("tab" in lower or "video" in lower):
-            # We need to find the TAB ID first. This logic is usually in main.py or telegram.py
-            # But the Brain just decides the INTENT.
-            # We will return a "browser_action" command and let the Agent resolve the specific tab ID
-            data = {"action": "browser_control", "command": "close", "query": user_input}
-            
-        elif ("mute" in lower or "silence" in lower) and ("tab" in lower or "video" in lower or "music" in lower):
-            data = {"action": "browser_control", "command": "mute", "query": user_input}
-            
-        elif ("play" in lower or "pause" in lower or "resume" in lower or "video" in lower) and ("music" in lower or "video" in lower or "youtube" in lower):
-            command = "play" if "play" in lower or "resume" in lower else "pause"
-            data = {"action": "browser_control", "command": command, "query": user_input}
-
-        elif "screenshot" in lower and ("tab" in lower or "browser" in lower or "page" in lower):
-            data = {"action": "browser_control", "command": "screenshot", "query": user_input}
-        
-        # MEDIA CONTROLLER - Playback Controls
-        # {"pause music", "next song", "previous track", "play music"}
-        elif any(x in lower for x in ["pause music", "pause song", "stop music", "stop song", "pause the music", "pause the song"]):
-            data = {"action": "control_media", "media_action": "playpause"}
-        
-        elif any(x in lower for x in ["play music", "play song", "resume music", "unpause", "play the music", "play the song"]) and "youtube" not in lower and "video" not in lower:
-            data = {"action": "control_media", "media_action": "playpause"}
-        
-        elif any(x in lower for x in ["next track", "next song", "skip song", "skip track", "next music", "play next"]):
-            data = {"action": "control_media", "media_action": "nexttrack"}
-        
-        elif any(x in lower for x in ["previous track", "previous song", "prev track", "prev song", "last song", "go back"]):
-            data = {"action": "control_media", "media_action": "prevtrack"}
-        
-        elif any(x in lower for x in ["mute audio", "mute sound", "mute volume", "silence", "mute the volume"]) and "tab" not in lower:
-            data = {"action": "control_media", "media_action": "volumemute"}
-        
-        # MEDIA CONTROLLER - Volume Control
-        # {"volume 50", "set volume to 80", "volume to 30 percent"}
-        elif "volume" in lower and any(char.isdigit() for char in user_input):
-            import re
-            # Extract number from command
-            numbers = re.findall(r'\d+', user_input)
-            if numbers:
-                level = int(numbers[0])
-                # Ensure it's within valid range
-                level = max(0, min(100, level))
-                data = {"action": "set_volume", "level": level}
-        
-        # 11. Force Find File (Context-Aware File Finder)
-        # Detect file finding queries - "find that", "get me that", "send that", "that file", etc.
-        find_triggers = ["find that", "get that", "send that", "give me that", "that file", "that pdf", "that document", "that excel", "that image", "that video", "i was reading", "i opened", "i was working on", "file i", "document i"]
-        if any(trigger in lower for trigger in find_triggers):
-            # Pass query once - file_finder.py will extract time and type
-            data = {"action": "find_file", "query": user_input}
-
-        # 11. Force File Send (MERGED LOGIC)
-        send_keywords = ["give", "send", "upload", "fetch", "get"]
-        safe_to_override = True
-        
-        # Added 'storage', 'bin', 'clipboard', 'copied' to safe exclusion list
-        for k in ["list", "camera", "battery", "cpu", "ram", "health", "record", "audio", "activities", "storage", "bin", "clipboard", "copied", "copy"]:
-            if k in lower:
-                safe_to_override = False
-                break
+        for piece in pieces:
+            for data in parser.feed(piece):
+                model_action = data.get("action")
+                data = _apply_overrides(data, user_input, lower, is_first=not actions)
+                if not actions:
+                    print(f"⏱️ First action after {time.perf_counter() - started:.2f}s: {data.get('action')}")
+                actions.append(data)
+                yield data
                 
-        if any(k in lower for k in send_keywords) and safe_to_override:
-            found_path = data.get('path') or data.get('url') or data.get('app_name')
-            if found_path:
-                data = {"action": "send_file", "path": found_path}
-
-        # 12. Force Web Research
-        research_triggers = ["who is", "what is", "how much", "tell me about", "look up", "research", "search for", "find info", "is there", "are there"]
-        is_question_str = any(lower.startswith(t) for t in ["who", "what", "how", "where", "why", "when", "is ", "are ", "tell me", "can you find"])
-        is_actual_question = lower.endswith("?") or is_question_str
-        
-        # Only override if it's currently general chat or a weak match
-        # AND it doesn't look like a system command (e.g. "What's my battery")
-        system_keywords = ["battery", "health", "cpu", "ram", "storage", "recycle", "clipboard", "copied", "screenshot", "activities", "open", "close"]
-        looks_like_system = any(k in lower for k in system_keywords)
-
-        current_action = data[0].get("action") if isinstance(data, list) else data.get("action")
-        if (is_actual_question or any(t in lower for t in research_triggers)) and current_action == "general_chat" and not looks_like_system:
-            data = {"action": "web_research", "query": user_input}
-
-        # Normalize to list for multi-command support
-        if isinstance(data, list):
-            return data
-        return [data]
+                # A question answered as chat becomes a single research action
+                if model_action == "general_chat" and data.get("action") == "web_research":
+                    pieces.close()
+                    response_cache.put(cache_key, actions, user_input)
+                    return
 
     except Exception as e:
         print(f"Error: {e}")
-        return [{"action": "general_chat", "response": "I had a brain glitch."}]
\ No newline at end of file
+        if not actions:
+            yield {"action": "general_chat", "response": "I had a brain glitch."}
+        return
+
+    if not actions:
+        print("Error: no valid action in the model's answer")
+        yield {"action": "general_chat", "response": "I had a brain glitch."}
+        return
+
+    response_cache.put(cache_key, actions, user_input)
@@ -1,9 +1,18 @@
 import sys
 import json
 import struct
+import base64
 import os
+import threading
 from pathlib import Path
 
+try:
+    from zyron.core.browser_ipc import HostLink, TabTable, HOST_MESSAGE_ACTIONS
+except ImportError:
+    # Launched as a plain script by the browser (zyron_host.bat): make the package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from zyron.core.browser_ipc import HostLink, TabTable, HOST_MESSAGE_ACTIONS
+
 # The native messaging host must read and write from/to stdin/stdout.
 # Each message is prefixed by a 32-bit (4-byte) length field.
 
@@ -16,54 +25,42 @@ def get_message():
     message = sys.stdin.buffer.read(message_length).decode('utf-8')
     return json.loads(message)
 
+_stdout_lock = threading.Lock()
+
 def send_message(message):
     """Encodes and writes a message to standard output."""
     content = json.dumps(message).encode('utf-8')
-    sys.stdout.buffer.write(struct.pack('=I', len(content)))
-    sys.stdout.buffer.write(content)
-    sys.stdout.buffer.flush()
+    # Commands from the assistant and replies from the main loop share stdout
+    with _stdout_lock:
+        sys.stdout.buffer.write(struct.pack('=I', len(content)))
+        sys.stdout.buffer.write(content)
+        sys.stdout.buffer.flush()
 
-import threading
-import time
+# --- Tab Table ---
+# Built from the extension's snapshot + created/updated/removed events; Zyron gets the same stream
+tab_table = TabTable()
 
-# --- Command Queue Logic ---
-COMMAND_FILE_PATH = Path(os.environ.get('TEMP', '')) / 'zyron_firefox_commands.json'
+def send_tab_snapshot():
+    """Gives a (re)connected assistant the full tab list it will then receive deltas for."""
+    if tab_table.synced:
+        assistant.send(tab_table.snapshot_message())
 
-def poll_command_queue():
-    """Background thread to check for commands from Zyron."""
-    while True:
-        try:
-            if COMMAND_FILE_PATH.exists():
-                try:
-                    with open(COMMAND_FILE_PATH, 'r') as f:
-                        commands = json.load(f)
-                    
-                    # Clear the file after reading
-                    os.remove(COMMAND_FILE_PATH)
-                    
-                    # Process commands
-                    if isinstance(commands, list):
-                        for cmd in commands:
-                            if cmd:
-                                send_message(cmd)
-                    elif isinstance(commands, dict):
-                        send_message(commands)
-                    
-                except json.JSONDecodeError:
-                    pass
-                except Exception as e:
-                    pass
-            
-            time.sleep(0.5) # Check every 500ms
-        except Exception:
-            time.sleep(1)
+def handle_command(command):
+    """Commands from Zyron go to the browser; tab resyncs are answered from our own table when it is current."""
+    if command.get("action") == "resync_tabs" and tab_table.synced:
+        send_tab_snapshot()
+    else:
+        send_message(command)
+
+# --- Assistant Link ---
+# Commands from Zyron arrive over a local socket (named pipe on Windows) and go straight to the browser
+assistant = HostLink(on_command=handle_command, on_connect=send_tab_snapshot)
 
 def main():
     """Main loop of the native messaging host."""
     
-    # Start polling thread
-    t = threading.Thread(target=poll_command_queue, daemon=True)
-    t.start()
+    # Connect to the assistant (retries in the background until it is running)
+    assistant.start()
 
     try:
         while True:
@@ -75,45 +72,26 @@ def main():
             if message.get("action") == "ping":
                 send_message({"status": "ok", "message": "Zyron Native Host is alive"})
             
-            # Action: Update Tabs
-            elif message.get("action") == "update_tabs":
-                # For now, we'll just save this to a local file that activity.py can read
-                # In the future, we might use a faster IPC or shared memory
-                temp_path = Path(os.environ.get('TEMP', '')) / 'zyron_firefox_tabs.json'
-                try:
-                    with open(temp_path, 'w') as f:
-                        json.dump(message.get("tabs", []), f)
-                    send_message({"status": "success", "received": len(message.get("tabs", []))})
-                except Exception as e:
-                    send_message({"status": "error", "message": str(e)})
+            # Action: Tab Snapshot / Tab Event
+            elif message.get("action") == "tab_snapshot" or message.get("action") == "tab_event":
+                # Apply to our table and pass the same (small) message on to Zyron
+                if tab_table.apply(message):
+                    assistant.send(message)
+                elif tab_table.wants_resync():
+                    # Sequence gap: ask the extension for the full list again
+                    send_message({"action": "resync_tabs"})
             
-            # Action: Save Screenshot
-            elif message.get("action") == "capture_result":
-                import base64
-                data_url = message.get("data", "")
-                if data_url and "base64," in data_url:
-                    try:
-                        header, encoded = data_url.split(",", 1)
-                        img_data = base64.b64decode(encoded)
-                        
-                        shot_path = Path(os.environ.get('TEMP', '')) / 'zyron_tab_screenshot.png'
-                        with open(shot_path, 'wb') as f:
-                            f.write(img_data)
-                            
-                        # Signal success? Optional.
-                    except Exception as e:
-                        # Log error
-                        pass
+            # Action: Screenshot Chunk
+            elif message.get("action") == "capture_chunk":
+                # Decode here so the assistant receives the raw image bytes, not base64 text
+                payload = base64.b64decode(message.pop("data", ""))
+                assistant.send(message, payload=payload)
             
-            # Action: Navigation Result
-            elif message.get("action") == "navigation_result" or message.get("action") == "tab_created":
-                # Save the result from the content script or background script to a file
-                nav_path = Path(os.environ.get('TEMP', '')) / 'zyron_nav_result.json'
-                try:
-                    with open(nav_path, 'w') as f:
-                        json.dump(message if message.get("action") == "tab_created" else message.get("data", {}), f)
-                except Exception as e:
-                    send_message({"status": "error", "message": str(e)})
+            # Action: Navigation Result / Tab Created / Capture Error
+            elif message.get("action") in HOST_MESSAGE_ACTIONS:
+                # Hand the result (with the requestId it answers) straight to the assistant
+                if not assistant.send(message):
+                    send_message({"status": "error", "message": "Zyron is not connected"})
 
             else:
                 send_message({"status": "unknown_action", "received": message})
@@ -0,0 +1,327 @@
+"""
+Intent Router Module for Zyron Desktop Assistant
+Resolves deterministic commands (battery, /sleep, cpu, clipboard, caffeine...) before the LLM is called
+"""
+
+import re
+from collections import deque
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of trigger phrases.
+    One pass over the text reports every phrase occurring in it (overlaps included),
+    which is exactly what a chain of `phrase in text` checks computes.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = sorted(set(phrases))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for phrase in self.phrases:
+            state = 0
+            for char in phrase:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (phrase,)
+
+        # Breadth-first failure links; every state also reports its suffix matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Set of all phrases that occur in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class Rule:
+    """
+    One entry of an ordered intent table.
+
+    all_of:  groups of phrases; at least one phrase of every group must occur
+    none_of: phrases that must not occur
+    when:    optional extra check(text, lower) for things phrases can't express
+    command: a static command dict, a callable(text, lower, hits) returning one (or None),
+             or None for intents the caller handles itself by name
+    """
+
+    def __init__(self, name, all_of, none_of=(), command=None, when=None):
+        self.name = name
+        self.all_of = [tuple(group) for group in all_of]
+        self.none_of = tuple(none_of)
+        self.command = command
+        self.when = when
+
+    def phrases(self):
+        for group in self.all_of:
+            yield from group
+        yield from self.none_of
+
+    def matches(self, hits, text, lower):
+        if any(phrase in hits for phrase in self.none_of):
+            return False
+        if not all(any(phrase in hits for phrase in group) for group in self.all_of):
+            return False
+        return self.when is None or self.when(text, lower)
+
+    def build(self, text, lower, hits):
+        if callable(self.command):
+            return self.command(text, lower, hits)
+        return dict(self.command) if self.command is not None else None
+
+
+class IntentMatch:
+    """First matching rule: its name plus the command it produced (may be None)"""
+
+    def __init__(self, name, command):
+        self.name = name
+        self.command = command
+
+    def __repr__(self):
+        return f"IntentMatch({self.name!r}, {self.command!r})"
+
+
+class IntentRouter:
+    """Ordered rule table compiled into a single phrase automaton; the first matching rule wins"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.matcher = PhraseMatcher(phrase for rule in self.rules for phrase in rule.phrases())
+
+    def match(self, text):
+        lower = text.lower()
+        hits = self.matcher.find(lower)
+        if not hits:
+            return None
+        for rule in self.rules:
+            if rule.matches(hits, text, lower):
+                return IntentMatch(rule.name, rule.build(text, lower, hits))
+        return None
+
+    def route(self, text):
+        """Command dict for text, or None when the LLM has to decide"""
+        match = self.match(text)
+        return match.command if match else None
+
+
+# ==================== COMMAND BUILDERS ====================
+
+def _with_query(action, command):
+    return lambda text, lower, hits: {"action": action, "command": command, "query": text}
+
+
+def _save_name(text, lower, hits):
+    name_part = text.split("is")[-1].strip()
+    name_part = name_part.replace(".", "").replace("!", "")
+    return {"action": "save_memory", "key": "user_name", "value": name_part}
+
+
+def _browser_playback(text, lower, hits):
+    command = "play" if "play" in hits or "resume" in hits else "pause"
+    return {"action": "browser_control", "command": command, "query": text}
+
+
+def _set_volume(text, lower, hits):
+    numbers = re.findall(r'\d+', text)
+    if not numbers:
+        return None
+    # Ensure it's within valid range
+    level = max(0, min(100, int(numbers[0])))
+    return {"action": "set_volume", "level": level}
+
+
+def _has_digit(text, lower):
+    return any(char.isdigit() for char in text)
+
+
+def _blacklist(text, lower, hits):
+    # /blacklist add steam discord
+    parts = lower.split()
+    if len(parts) >= 3 and parts[1] in ("add", "remove"):
+        return {"action": "focus_mode", "sub_action": parts[1], "items": parts[2:]}
+    return {"action": "focus_mode", "sub_action": "status"}
+
+
+def _scroll(text, lower, hits):
+    direction = "down"
+    if "up" in lower: direction = "up"
+    if "top" in lower: direction = "top"
+    if "bottom" in lower: direction = "bottom"
+    return {"action": "browser_nav", "sub_action": "scroll", "direction": direction}
+
+
+def _type_text(text, lower, hits):
+    parts = text.split(" ", 2)
+    if len(parts) >= 3:
+        return {"action": "browser_nav", "sub_action": "type", "selector": parts[1], "text": parts[2]}
+    return None
+
+
+def _click(text, lower, hits):
+    parts = text.split(" ", 1)
+    if len(parts) >= 2:
+        return {"action": "browser_nav", "sub_action": "click", "selector": parts[1]}
+    return None
+
+
+# ==================== RULE TABLES ====================
+
+FIND_FILE_TRIGGERS = ("find that", "get that", "send that", "give me that", "that file", "that pdf",
+                      "that document", "that excel", "that image", "that video", "i was reading",
+                      "i opened", "i was working on", "file i", "document i")
+
+# Keyword overrides of brain.process_command, in their original priority order.
+# Find-file queries come first because they used to override every other match.
+BRAIN_RULES = [
+    Rule("find_file", [FIND_FILE_TRIGGERS], command=lambda text, lower, hits: {"action": "find_file", "query": text}),
+
+    # 1. Camera
+    Rule("camera_on", [("camera",), ("on",)], command={"action": "camera_stream", "value": "on"}),
+    Rule("camera_off", [("camera",), ("off",)], command={"action": "camera_stream", "value": "off"}),
+
+    # 2. Sleep/Screenshot/Battery
+    Rule("system_sleep", [("/sleep",)], command={"action": "system_sleep"}),
+    Rule("shutdown_pc", [("/shutdown",)], command={"action": "shutdown_pc"}),
+    Rule("restart_pc", [("/restart",)], command={"action": "restart_pc"}),
+    Rule("take_screenshot", [("/screenshot", "screenshot")], none_of=("tab", "browser"),
+         command={"action": "take_screenshot"}),
+    Rule("check_battery", [("battery",)], command={"action": "check_battery"}),
+
+    # 3. Health Check
+    Rule("check_health", [("cpu", "ram", "system health", "lag", "pc status")], command={"action": "check_health"}),
+
+    # 4. Memory Save
+    Rule("save_memory", [("my name is",)], command=_save_name),
+
+    # 5. Audio Recording
+    Rule("record_audio", [("/recordaudio", "record audio")], command={"action": "record_audio", "duration": 10}),
+
+    # 6. Activity Check
+    Rule("get_activities", [("/activities", "/current_activities", "current activities", "what's open", "running apps",
+                             "active windows", "show activities", "what is happening", "open tabs", "what am i doing")],
+         command={"action": "get_activities"}),
+
+    # 7. Clear Recycle Bin
+    Rule("clear_recycle_bin", [("/clear_bin", "clear recycle bin", "empty recycle bin", "delete recycle bin", "clear bin",
+                                "empty bin", "clean recycle bin", "clear the bin", "empty the bin")],
+         command={"action": "clear_recycle_bin"}),
+
+    # 8. Storage Check
+    Rule("check_storage", [("/storage", "check storage", "disk space", "storage space", "drive space", "how much storage",
+                            "storage status", "check drives", "disk usage", "storage left")],
+         command={"action": "check_storage"}),
+
+    # 9. Clipboard History
+    Rule("get_clipboard_history", [("/copied_texts", "copied texts", "clipboard history", "clipboard", "what did i copy",
+                                    "show copied", "give me copied texts")],
+         command={"action": "get_clipboard_history"}),
+
+    # 10. Caffeine Mode (Keeping Awake)
+    Rule("caffeine_on", [("keep awake", "don't sleep", "stay awake", "enable caffeine", "disable sleep", "caffeine mode on",
+                          "keep system awake", "prevent sleep", "no sleep")],
+         command={"action": "toggle_caffeine", "state": True}),
+    Rule("caffeine_off", [("go to sleep", "disable caffeine", "normal mode", "can sleep now", "caffeine mode off",
+                           "allow sleep", "enable sleep")],
+         command={"action": "toggle_caffeine", "state": False}),
+
+    # 11. Browser Control - the agent resolves the actual tab from the query
+    Rule("browser_close", [("close",), ("tab", "video")], command=_with_query("browser_control", "close")),
+    Rule("browser_mute", [("mute", "silence"), ("tab", "video", "music")], command=_with_query("browser_control", "mute")),
+    Rule("browser_playback", [("play", "pause", "resume", "video"), ("music", "video", "youtube")], command=_browser_playback),
+    Rule("browser_screenshot", [("screenshot",), ("tab", "browser", "page")], command=_with_query("browser_control", "screenshot")),
+
+    # Media Controller - Playback
+    Rule("media_pause", [("pause music", "pause song", "stop music", "stop song", "pause the music", "pause the song")],
+         command={"action": "control_media", "media_action": "playpause"}),
+    Rule("media_play", [("play music", "play song", "resume music", "unpause", "play the music", "play the song")],
+         none_of=("youtube", "video"), command={"action": "control_media", "media_action": "playpause"}),
+    Rule("media_next", [("next track", "next song", "skip song", "skip track", "next music", "play next")],
+         command={"action": "control_media", "media_action": "nexttrack"}),
+    Rule("media_prev", [("previous track", "previous song", "prev track", "prev song", "last song", "go back")],
+         command={"action": "control_media", "media_action": "prevtrack"}),
+    Rule("media_mute", [("mute audio", "mute sound", "mute volume", "silence", "mute the volume")], none_of=("tab",),
+         command={"action": "control_media", "media_action": "volumemute"}),
+
+    # Media Controller - Volume
+    Rule("set_volume", [("volume",)], when=_has_digit, command=_set_volume),
+]
+
+# Pre-parse chain of the Telegram agent (slash commands and keyboard buttons).
+# Rules without a command are handled by name in telegram.handle_message (they need replies).
+TELEGRAM_RULES = [
+    Rule("check_battery", [("/battery", "battery")], command={"action": "check_battery"}),
+    Rule("check_health", [("/systemhealth", "system health")], command={"action": "check_health"}),
+    Rule("take_screenshot", [("/screenshot", "screenshot")], none_of=("tab", "browser"),
+         command={"action": "take_screenshot"}),
+    Rule("system_sleep", [("/sleep",)], command={"action": "system_sleep"}),
+    Rule("shutdown_pc", [("/shutdown", "shutdown")], command={"action": "shutdown_pc"}),
+    Rule("restart_pc", [("/restart", "restart")], command={"action": "restart_pc"}),
+    Rule("system_panic", [("/panic", "🚨 panic")], command={"action": "system_panic"}),
+    Rule("camera_on", [("/camera_on",)], command={"action": "camera_stream", "value": "on"}),
+    Rule("camera_off", [("/camera_off",)], command={"action": "camera_stream", "value": "off"}),
+    Rule("record_audio", [("/recordaudio",)]),
+    Rule("get_location", [("/location", "my location", "where am i", "laptop location", "where is my laptop", "find location")],
+         command={"action": "get_location"}),
+
+    # --- EXISTING BUTTON TRIGGERS ---
+    Rule("clear_recycle_bin", [("/clear_bin", "clear bin")], command={"action": "clear_recycle_bin"}),
+    Rule("check_storage", [("/storage", "check storage")], command={"action": "check_storage"}),
+    Rule("get_activities", [("/activities", "activities")], command={"action": "get_activities"}),
+
+    # --- MEDIA CONTROLLER ---
+    Rule("media_menu", [("/media",)]),
+
+    # --- CLIPBOARD ---
+    Rule("get_clipboard_history", [("/copied_texts", "copied texts", "clipboard history", "what did i copy", "show copied")],
+         command={"action": "get_clipboard_history"}),
+
+    # --- FOCUS MODE ---
+    Rule("focus_on", [("/focus_mode_on", "focus on")], command={"action": "focus_mode", "sub_action": "on"}),
+    Rule("focus_off", [("/focus_mode_off", "focus off")], command={"action": "focus_mode", "sub_action": "off"}),
+    Rule("blacklist", [("/blacklist",)], command=_blacklist),
+
+    # --- CAFFEINE MODE (KEEP AWAKE) ---
+    Rule("caffeine", [("/caffeine",)]),
+    Rule("caffeine_on", [("☕ stay awake",)], command={"action": "toggle_caffeine", "state": True}),
+    Rule("caffeine_off", [("💤 normal mode",)], command={"action": "toggle_caffeine", "state": False}),
+
+    # --- NAVIGATION AGENT ---
+    Rule("browser_read", [("/read", "read page")], command={"action": "browser_nav", "sub_action": "read"}),
+    Rule("browser_scan", [("/scan",)], command={"action": "browser_nav", "sub_action": "scan"}),
+    Rule("browser_scroll", [("/scroll", "scroll down")], command=_scroll),
+    Rule("browser_type", [("/type",)], command=_type_text),
+    Rule("browser_click", [("/click",)], command=_click),
+]
+
+brain_router = IntentRouter(BRAIN_RULES)
+telegram_router = IntentRouter(TELEGRAM_RULES)
+
+
+def route_command(user_input):
+    """Deterministic command for user_input, or None if the LLM is needed"""
+    return brain_router.route(user_input)
@@ -1,9 +1,52 @@
 import json
 import os
+import copy
+import threading
 from datetime import datetime
+from zyron.utils.persistence import WriteBehindPersister
 
 MEMORY_FILE = "long_term_memory.json"
 
+# Latest long-term state. It is loaded once, then re-read only when the file's (mtime, size)
+# signature shows someone else changed it; the file on disk may lag behind while a write is pending.
+_long_term = None
+_long_term_lock = threading.RLock()
+_file_signature = None
+_long_term_version = 0     # bumped on every change to _long_term (mutation or reload)
+_unsaved_changes = 0       # mutations not yet on disk ...
+_snapshot_changes = 0      # ... and how many of them the in-flight write carries
+
+# Rendered context, reused until the state it was rendered from changes
+_context_cache = (None, None)
+_context_key_cache = (None, None)
+
+
+def _file_stat():
+    try:
+        stat = os.stat(MEMORY_FILE)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def _snapshot_long_term():
+    global _snapshot_changes
+    with _long_term_lock:
+        _snapshot_changes = _unsaved_changes
+        return copy.deepcopy(_long_term or {})
+
+
+def _long_term_written():
+    # Our own write changed the signature; remember it so it doesn't look like an outside edit
+    global _file_signature, _unsaved_changes
+    with _long_term_lock:
+        _unsaved_changes -= _snapshot_changes
+        _file_signature = _file_stat()
+
+
+long_term_persister = WriteBehindPersister(MEMORY_FILE, _snapshot_long_term, indent=4,
+                                           on_written=_long_term_written)
+
 
 short_term = {
     "last_app_opened": None,
@@ -14,19 +57,36 @@ short_term = {
 }
 
 def load_long_term():
-    if os.path.exists(MEMORY_FILE):
-        try:
-            with open(MEMORY_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {} 
-    return {}
+    global _long_term, _file_signature, _long_term_version
+    with _long_term_lock:
+        signature = _file_stat()
+        # Unsaved changes win over the (stale) file
+        if _long_term is not None and (_unsaved_changes or signature == _file_signature):
+            return _long_term
+        data = {}
+        if signature is not None:
+            try:
+                with open(MEMORY_FILE, 'r') as f:
+                    data = json.load(f)
+            except:
+                pass
+        _long_term = data
+        _file_signature = signature
+        _long_term_version += 1
+        return _long_term
+
+def _long_term_changed():
+    """Call (holding _long_term_lock) after mutating the long-term dict"""
+    global _long_term_version, _unsaved_changes
+    _long_term_version += 1
+    _unsaved_changes += 1
+    long_term_persister.mark_dirty()
 
 def save_long_term(key, value):
-    data = load_long_term()
-    data[key] = value
-    with open(MEMORY_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    with _long_term_lock:
+        data = load_long_term()
+        data[key] = value
+        _long_term_changed()
 
 def update_context(action_type, target=None):
     short_term["last_action_type"] = action_type
@@ -40,21 +100,48 @@ def update_context(action_type, target=None):
     elif action_type == "browser_interaction":
         short_term["last_focused_tab"] = target
 
+def _short_term_state():
+    return (short_term['last_focused_tab'], short_term['last_app_opened'],
+            short_term['last_browser_used'], short_term['last_file_path'])
+
 def get_context_string():
     """Returns a summary of BOTH Short-Term and Long-Term memory."""
-    long_term_data = load_long_term() 
-    now = datetime.now()
-    current_time = now.strftime("%A, %B %d, %Y - %H:%M:%S")
-    
-    return f"""
-    [CURRENT CONTEXT STATE]
-    - Current Time: {current_time}
+    global _context_cache
+    with _long_term_lock:
+        long_term_data = load_long_term()
+        # Keyed on the values themselves, since callers also write short_term directly
+        state = (_long_term_version,) + _short_term_state()
+        if _context_cache[0] != state:
+            _context_cache = (state, f"""
     - KNOWN USER INFO: {long_term_data}
     - >>> LAST ACTIVE BROWSER TAB: {short_term['last_focused_tab']} <<<
     - Last App Opened: {short_term['last_app_opened']}
     - Last Browser Used: {short_term['last_browser_used']}
     - Last File/Folder: {short_term['last_file_path']}
+    """)
+        rendered_state = _context_cache[1]
+
+    # Only the clock line is rendered on every call
+    current_time = datetime.now().strftime("%A, %B %d, %Y - %H:%M:%S")
+    return f"""
+    [CURRENT CONTEXT STATE]
+    - Current Time: {current_time}""" + rendered_state
+
+def get_context_key(include_short_term=True):
+    """
+    The parts of get_context_string() that can change the model's answer, as a stable string.
+    Leaves out the clock and the file-type statistics (only the file finder reads those).
     """
+    global _context_key_cache
+    with _long_term_lock:
+        data = load_long_term()
+        if _context_key_cache[0] != _long_term_version:
+            user_info = {k: v for k, v in data.items() if k != "file_preferences"}
+            _context_key_cache = (_long_term_version, json.dumps(user_info, sort_keys=True, default=str))
+        key = _context_key_cache[1]
+    if include_short_term:
+        key += json.dumps(list(_short_term_state()), default=str)
+    return key
 
 def track_file_preference(file_type):
     """
@@ -65,28 +152,28 @@ def track_file_preference(file_type):
         file_type: File extension (e.g., 'pdf', 'docx', 'xlsx')
     """
     try:
-        data = load_long_term()
+        with _long_term_lock:
+            data = load_long_term()
         
-        # Initialize file preferences if not exists
-        if "file_preferences" not in data:
-            data["file_preferences"] = {
-                "preferred_types": {},
-                "total_searches": 0
-            }
+            # Initialize file preferences if not exists
+            if "file_preferences" not in data:
+                data["file_preferences"] = {
+                    "preferred_types": {},
+                    "total_searches": 0
+                }
         
-        # Increment count for this file type
-        prefs = data["file_preferences"]
-        if file_type not in prefs["preferred_types"]:
-            prefs["preferred_types"][file_type] = 0
+            # Increment count for this file type
+            prefs = data["file_preferences"]
+            if file_type not in prefs["preferred_types"]:
+                prefs["preferred_types"][file_type] = 0
         
-        prefs["preferred_types"][file_type] += 1
-        prefs["total_searches"] += 1
+            prefs["preferred_types"][file_type] += 1
+            prefs["total_searches"] += 1
         
-        # Save updated preferences
-        with open(MEMORY_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+            # Save updated preferences (written behind)
+            _long_term_changed()
         
-        print(f"📊 Tracked file preference: {file_type} (total: {prefs['preferred_types'][file_type]})")
+            print(f"📊 Tracked file preference: {file_type} (total: {prefs['preferred_types'][file_type]})")
         
     except Exception as e:
         print(f"Error tracking file preference: {e}")
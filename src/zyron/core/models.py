@@ -0,0 +1,132 @@
+"""
+Model Residency Module for Zyron Desktop Assistant
+Keeps Ollama models loaded between requests instead of cold-loading them for every command
+"""
+
+import time
+import threading
+import ollama
+from zyron.utils.settings import settings
+
+
+def parse_keep_alive(value):
+    """
+    Ollama accepts a duration string ('10m', '1h') or a number of seconds (negative = forever).
+    Plain numbers from .env are passed as numbers so '-1' and '600' work too.
+    """
+    if isinstance(value, (int, float)):
+        return value
+    value = str(value).strip()
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        return value
+
+
+def _field(response, key):
+    """Numeric field of an Ollama response (dict or response object), 0 when missing"""
+    try:
+        return response.get(key) or 0
+    except AttributeError:
+        return getattr(response, key, 0) or 0
+
+
+class ModelResidency:
+    """
+    Decides how long each model stays in memory after a call and reports per-call timings.
+
+    The main model (settings.MODEL_NAME) stays loaded for MODEL_KEEP_ALIVE after its last use,
+    then Ollama evicts it. An optional small intent model (settings.INTENT_MODEL_NAME) is pinned
+    for the whole session so command parsing never waits for a load.
+    """
+
+    def __init__(self, main_model=None, intent_model=None, keep_alive=None):
+        self.main_model = main_model or settings.MODEL_NAME
+        self.intent_model = intent_model or settings.INTENT_MODEL_NAME or self.main_model
+        self.keep_alive = parse_keep_alive(settings.MODEL_KEEP_ALIVE if keep_alive is None else keep_alive)
+        self.pinned = {self.intent_model} if self.intent_model != self.main_model else set()
+        self.last_used = {}
+        self.last_timings = {}
+        self._lock = threading.Lock()
+
+    def keep_alive_for(self, model):
+        return -1 if model in self.pinned else self.keep_alive
+
+    def chat(self, model, messages, **kwargs):
+        """ollama.chat() with the residency policy applied; logs load vs eval time"""
+        kwargs.setdefault('keep_alive', self.keep_alive_for(model))
+        response = ollama.chat(model=model, messages=messages, **kwargs)
+        self._record(model, response)
+        return response
+
+    def stream_chat(self, model, messages, **kwargs):
+        """Streaming ollama.chat(): yields content pieces, timings are logged from the final chunk"""
+        kwargs.setdefault('keep_alive', self.keep_alive_for(model))
+        for chunk in ollama.chat(model=model, messages=messages, stream=True, **kwargs):
+            piece = chunk['message']['content']
+            if piece:
+                yield piece
+            if _field(chunk, 'done'):
+                self._record(model, chunk)
+
+    def _record(self, model, response):
+        # Durations in the Ollama response are nanoseconds
+        timings = {
+            'load': _field(response, 'load_duration') / 1e9,
+            'prompt_eval': _field(response, 'prompt_eval_duration') / 1e9,
+            'eval': _field(response, 'eval_duration') / 1e9,
+            'total': _field(response, 'total_duration') / 1e9,
+            'eval_count': _field(response, 'eval_count'),
+        }
+        with self._lock:
+            self.last_used[model] = time.time()
+            self.last_timings[model] = timings
+
+        state = "cold load" if timings['load'] > 1.0 else "warm"
+        print(f"⏱️ {model} ({state}): load {timings['load']:.2f}s | prompt {timings['prompt_eval']:.2f}s | "
+              f"eval {timings['eval']:.2f}s ({timings['eval_count']} tokens) | total {timings['total']:.2f}s")
+
+    def load(self, model):
+        """Load a model without generating anything (an empty prompt only loads it)"""
+        start = time.time()
+        ollama.generate(model=model, prompt='', keep_alive=self.keep_alive_for(model))
+        with self._lock:
+            self.last_used[model] = time.time()
+        return time.time() - start
+
+    def evict(self, model):
+        """Unload a model right away"""
+        try:
+            ollama.generate(model=model, prompt='', keep_alive=0)
+        except Exception as e:
+            print(f"⚠️ Could not unload {model}: {e}")
+
+    def warm_up(self, background=True):
+        """Load the intent and main models so the first command doesn't pay the cold start"""
+        def _warm():
+            for model in dict.fromkeys([self.intent_model, self.main_model]):
+                try:
+                    took = self.load(model)
+                    print(f"🔥 Model ready: {model} ({took:.1f}s)")
+                except Exception as e:
+                    print(f"⚠️ Model warm-up failed for {model}: {e}")
+
+        if not settings.MODEL_WARMUP:
+            return None
+        if not background:
+            _warm()
+            return None
+        thread = threading.Thread(target=_warm, daemon=True, name="model-warmup")
+        thread.start()
+        return thread
+
+
+residency = ModelResidency()
+
+
+def chat(model, messages, **kwargs):
+    return residency.chat(model, messages, **kwargs)
+
+
+def warm_up(background=True):
+    return residency.warm_up(background=background)
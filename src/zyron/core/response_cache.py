@@ -0,0 +1,137 @@
+"""
+Response Cache Module for Zyron Desktop Assistant
+LRU + TTL cache of brain.process_command results, so repeated commands skip the LLM
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from zyron.utils.settings import settings
+from zyron.utils.persistence import WriteBehindPersister
+
+RESPONSE_CACHE_FILE = "response_cache.json"
+
+# Answers that depend on more than the utterance (the clock, chit-chat) are never cached
+UNCACHEABLE_ACTIONS = {"general_chat"}
+
+# Words that make an utterance refer to the current context ("close it", "send that again")
+CONTEXT_WORDS = {"it", "that", "this", "there", "them", "those", "these", "again", "same", "last", "previous"}
+
+# Politeness and wake words that don't change what the user wants
+FILLER_WORDS = {"please", "pls", "plz", "kindly", "hey", "hi", "zyron", "pikachu", "thanks"}
+FILLER_PREFIXES = ("can you ", "could you ", "would you ", "will you ")
+
+_PUNCTUATION = re.compile(r"[^\w\s/'.:-]")
+
+
+def normalize_utterance(text):
+    """'Hey Zyron, open YouTube please!' -> 'open youtube'"""
+    words = [w.strip(".:-'") for w in _PUNCTUATION.sub(" ", text.lower()).split()]
+    text = " ".join(w for w in words if w and w not in FILLER_WORDS)
+    for prefix in FILLER_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+class ResponseCache:
+    """
+    Maps (normalized utterance, relevant context) -> action list.
+    Least recently used entries are dropped past `max_entries`, and entries expire after `ttl` seconds.
+    The table is saved to disk through a write-behind persister.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_FILE, max_entries=None, ttl=None):
+        self.path = path
+        self.max_entries = settings.RESPONSE_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> {"actions": [...], "created": epoch, "utterance": str}
+        self._lock = threading.Lock()
+        self._persister = WriteBehindPersister(path, self._snapshot)
+        self._load()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _snapshot(self):
+        with self._lock:
+            return [{"key": key, **copy.deepcopy(entry)} for key, entry in self._entries.items()]
+
+    def _load(self):
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            now = time.time()
+            for item in saved:
+                if now - item.get("created", 0) < self.ttl:
+                    key = item.pop("key")
+                    self._entries[key] = item
+        except Exception as e:
+            print(f"Error loading response cache: {e}")
+
+    def make_key(self, user_input, context_key):
+        utterance = normalize_utterance(user_input)
+        digest = hashlib.sha1(context_key.encode('utf-8')).hexdigest()[:16]
+        return f"{utterance}|{digest}"
+
+    @staticmethod
+    def needs_short_term_context(user_input):
+        return any(word in CONTEXT_WORDS for word in normalize_utterance(user_input).split())
+
+    def get(self, key):
+        """Cached action list (a fresh copy) or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created"] >= self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["actions"])
+
+    def put(self, key, actions, user_input=""):
+        if not self.enabled or not actions:
+            return
+        if any(not isinstance(a, dict) or a.get("action") in UNCACHEABLE_ACTIONS for a in actions):
+            return
+        with self._lock:
+            self._entries[key] = {"actions": copy.deepcopy(actions), "created": time.time(), "utterance": user_input}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._persister.mark_dirty()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+        self._persister.mark_dirty()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,74 @@
+"""
+Speculative Dispatch for Zyron Desktop Assistant
+Starts a deterministic command on a stable partial transcript, before the speaker has finished
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .intents import route_command
+
+# Only read-only actions are started early: a wrong guess just means a discarded result
+# (take_screenshot is left out - it writes a file to MEDIA_PATH)
+SPECULATIVE_ACTIONS = {
+    "check_battery", "check_health", "check_storage",
+    "get_activities", "get_clipboard_history", "get_location",
+}
+
+Speculation = namedtuple('Speculation', ['command', 'heard', 'future', 'started'])
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative")
+
+
+class SpeculativeDispatcher:
+    """
+    consider(hypothesis) is fed every hypothesis of the live transcript (voice.take_user_input).
+    When a stable one resolves through the intent router to a read-only action, that action
+    starts running at once. resolve(final_text) then confirms it, when the final transcript
+    routes to the same command, and returns its future; otherwise the speculative result is
+    cancelled or discarded and the caller dispatches the final text as usual.
+    """
+
+    def __init__(self, execute, actions=SPECULATIVE_ACTIONS):
+        self.execute = execute
+        self.actions = set(actions)
+        self.pending = None
+        self.confirmed = 0
+        self.cancelled = 0
+
+    def consider(self, hypothesis):
+        if not hypothesis.stable or not hypothesis.text:
+            return
+        command = route_command(hypothesis.text)
+        if command is None or command.get("action") not in self.actions:
+            return
+        if self.pending is not None and self.pending.command == command:
+            return
+        # A later correction changed the command: drop the earlier guess
+        self._cancel()
+        print(f"🔮 Speculating: {command['action']} (heard so far: '{hypothesis.text}')")
+        self.pending = Speculation(command, hypothesis.text, _executor.submit(self.execute, command), time.perf_counter())
+
+    def resolve(self, final_text):
+        """Future of the confirmed speculative action for final_text, or None"""
+        pending = self.pending
+        if pending is None:
+            return None
+        if final_text and route_command(final_text) == pending.command:
+            self.pending = None
+            self.confirmed += 1
+            ahead = (time.perf_counter() - pending.started) * 1000
+            print(f"✅ Speculative {pending.command['action']} confirmed (started {ahead:.0f} ms before the final transcript)")
+            return pending.future
+        self._cancel()
+        return None
+
+    def _cancel(self):
+        pending, self.pending = self.pending, None
+        if pending is None:
+            return
+        self.cancelled += 1
+        # Not started yet: it never runs; already running: its result is ignored
+        pending.future.cancel()
+        print(f"↩️ Speculative {pending.command['action']} cancelled")
@@ -0,0 +1,130 @@
+"""
+Voice Activity Detection for Zyron Desktop Assistant
+Ends command capture on trailing silence instead of recording for a fixed time
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from zyron.utils.settings import settings
+from zyron.core.audio import seconds_to_bytes, bytes_to_seconds
+
+FRAME_MS = 20
+
+# Audio kept from just before speech starts, so soft first syllables aren't clipped
+PRE_ROLL_MS = 300
+
+# audio: the captured bytes (b"" when nobody spoke)
+# ended_by: 'silence', 'max_length', 'stream_end' or 'no_speech'
+# speech_end: time.perf_counter() at which the speaker stopped (None without speech)
+# text: transcript, when a recognizer listened along (see WakeWordEngine.capture_utterance)
+Utterance = namedtuple('Utterance', ['audio', 'ended_by', 'speech_seconds', 'speech_end', 'text'], defaults=[None])
+
+
+class VoiceActivityDetector:
+    """
+    Energy + zero-crossing detector over 20 ms frames.
+
+    A frame is voiced when its RMS energy is well above the running noise floor. Quieter frames
+    with a high zero-crossing rate (s, f, sh) only count while speech is already going on, so
+    word endings are kept but hiss never starts an utterance.
+
+    The noise floor drops to any quieter frame at once and rises slowly (about 2 s), so it
+    settles in the pauses between syllables: capture can start mid-sentence (right after the
+    wake word) and still adapt to a noisy room.
+    """
+
+    def __init__(self, energy_ratio=3.0, min_energy=200.0, fricative_zcr=0.3):
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.fricative_zcr = fricative_zcr
+        self.noise = None
+
+    def is_speech(self, frame, in_speech=False):
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        if not len(samples):
+            return False
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        if self.noise is None or rms < self.noise:
+            self.noise = rms
+        else:
+            self.noise += 0.01 * (rms - self.noise)
+        threshold = max(self.min_energy, self.noise * self.energy_ratio)
+        if rms > threshold:
+            return True
+        zcr = float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1])))
+        return in_speech and rms > threshold / 2 and zcr > self.fricative_zcr
+
+
+class UtteranceSegmenter:
+    """
+    Cuts one utterance out of an AudioReader: frames() yields the audio from just before the
+    speech starts until the speaker has been silent for hangover_ms, nobody started speaking
+    within start_timeout seconds, or max_seconds of audio were captured; `utterance` is set
+    when it finishes. Recognizers can consume the frames while they are being captured.
+    Defaults come from the VAD_* settings.
+    """
+
+    def __init__(self, vad=None, hangover_ms=None, start_timeout=None, max_seconds=None):
+        self.vad = vad or VoiceActivityDetector()
+        self.hangover = seconds_to_bytes((settings.VAD_HANGOVER_MS if hangover_ms is None else hangover_ms) / 1000)
+        self.start_timeout = settings.VAD_START_TIMEOUT if start_timeout is None else start_timeout
+        self.max_bytes = seconds_to_bytes(settings.VAD_MAX_SECONDS if max_seconds is None else max_seconds)
+        self.utterance = None
+
+    def frames(self, reader):
+        pre_roll = seconds_to_bytes(PRE_ROLL_MS / 1000)
+        frame_bytes = seconds_to_bytes(FRAME_MS / 1000)
+
+        captured = bytearray()
+        speech_start = None  # Offsets into `captured`
+        speech_end = None
+        waited = 0
+        ended_by = 'no_speech'
+        # Wall-clock limit as a backstop if the stream stalls
+        for frame in reader.blocks(frame_bytes, duration=self.start_timeout + bytes_to_seconds(self.max_bytes) + 1.0):
+            in_speech = speech_start is not None
+            captured += frame
+            if self.vad.is_speech(frame, in_speech):
+                if not in_speech:
+                    speech_start = len(captured) - len(frame)
+                    yield bytes(captured)  # Pre-roll and the first voiced frame
+                speech_end = len(captured)
+            if speech_start is None:
+                waited += len(frame)
+                if bytes_to_seconds(waited) >= self.start_timeout:
+                    break
+                # Only the pre-roll is kept while waiting
+                if len(captured) > pre_roll:
+                    del captured[:len(captured) - pre_roll]
+                continue
+            if in_speech:
+                yield frame
+            if len(captured) - speech_end >= self.hangover:
+                ended_by = 'silence'
+                break
+            if len(captured) >= self.max_bytes:
+                ended_by = 'max_length'
+                break
+
+        if speech_start is None:
+            self.utterance = Utterance(b"", 'no_speech', 0.0, None)
+            return
+        if ended_by == 'no_speech':
+            ended_by = 'stream_end'  # The source ended (or stalled) mid-speech
+        # When the speaker stopped, in wall time: the newest audio in the stream is "now"
+        behind = bytes_to_seconds(reader.service.position - reader.offset + len(captured) - speech_end)
+        speech_end_at = time.perf_counter() - behind
+        # Keep a little of the trailing silence: recognizers like a clean ending
+        audio = bytes(captured[:speech_end + seconds_to_bytes(0.2)])
+        self.utterance = Utterance(audio, ended_by, bytes_to_seconds(speech_end - speech_start), speech_end_at)
+
+
+def capture_utterance(reader, **limits):
+    """The next utterance from reader (see UtteranceSegmenter for the limits)"""
+    segmenter = UtteranceSegmenter(**limits)
+    for _ in segmenter.frames(reader):
+        pass
+    return segmenter.utterance
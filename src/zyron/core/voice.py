@@ -1,45 +1,88 @@
-import speech_recognition as sr
-import pyttsx3
+import os
+import time
+from .audio import SAMPLE_RATE
+from zyron.utils import lazy
+
+# Nothing heavy is loaded at import: the engines below are built on first use,
+# or ahead of time by warm_up() (main.py) while the rest of Zyron starts
+sr = lazy.lazy_import("speech_recognition")
+
 
-# Initialize
-recognizer = sr.Recognizer()
-engine = pyttsx3.init()
-engine.setProperty('rate', 170)
+def _tts_engine():
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty('rate', 170)
+    return engine
 
-# --- CONFIGURATION ---
-try:
-    # Indent everything inside the 'try' block
+
+def _wake_engine():
     from .wake_word import WakeWordEngine
-    wake_engine = WakeWordEngine()
-    HAS_OFFLINE_WAKE = True
+    return WakeWordEngine()
+
 
-except Exception as e:
-    # This block runs only if the code above fails
-    print(f"⚠️ Offline Wake Engine missing: {e}")
-    HAS_OFFLINE_WAKE = False  # Set to False because it failed
+speech_recognizer = lazy.register("speech_recognizer", lambda: sr.Recognizer())
+tts = lazy.register("tts_engine", _tts_engine)
+wake_engine = lazy.register("wake_word_engine", _wake_engine)
 
 # Load Offline Mode Config
-import os
 OFFLINE_MODE = os.getenv("OFFLINE_MODE", "false").lower() == "true"
 
+
+def warm_up():
+    """
+    Loads the Vosk model in the background. The TTS engine is still built by the first speak():
+    the SAPI5 driver is COM-based and has to be used from the thread that created it.
+    """
+    return lazy.warm_up("wake_word_engine", "speech_recognizer")
+
+
+def offline_wake():
+    """The Vosk wake word engine, or None when it couldn't load (online fallback)"""
+    try:
+        return wake_engine.get()
+    except Exception:
+        return None
+
 # We accept variations because Google sometimes mishears "Pikachu"
 WAKE_WORDS = ["pikachu", "pika", "peek a", "pick a", "picacho", "hey you", "he got true", "gotcha", "got you", "be got to", "because to", "he got you" ]
 
+# When the speaker finished the last command (time.perf_counter()), for latency reports
+last_speech_end = None
+
+def speech_latency_ms():
+    """Milliseconds since the end of the last spoken command (0 if unknown)"""
+    if last_speech_end is None:
+        return 0.0
+    return (time.perf_counter() - last_speech_end) * 1000
+
 def speak(text):
     print(f"⚡ Zyron: {text}")
     try:
+        engine = tts.get()
         engine.say(text)
         engine.runAndWait()
     except:
         pass
 
+def acknowledge():
+    """Short non-blocking chime: the wake word was heard"""
+    print("⚡ Zyron: Pika Pika! (listening)")
+    try:
+        import winsound
+        winsound.MessageBeep(winsound.MB_OK)  # Plays asynchronously
+    except Exception:
+        print("\a", end="", flush=True)
+
 def listen_for_command():
     # Priority: Offline Wake Word
-    if HAS_OFFLINE_WAKE:
+    wake = offline_wake()
+    if wake is not None:
         try:
-            detected_word = wake_engine.listen()
+            detected_word = wake.listen()
             if detected_word:
-                speak("Pika Pika!")
+                # A chime instead of a spoken reply: nothing blocks, so the command capture
+                # starts right where the wake word ended ("pikachu open youtube" in one breath)
+                acknowledge()
                 return True
             return False
         except Exception as e:
@@ -47,6 +90,7 @@ def listen_for_command():
             pass # Fallback to online
 
     # Fallback: Online Google Speech Recognition (Legacy)
+    recognizer = speech_recognizer.get()
     with sr.Microphone() as source:
         print("\n👂 Listening for 'Hey Pikachu' (Online)...", end="", flush=True)
         
@@ -80,31 +124,36 @@ def listen_for_command():
             print("\n   -> Network Error")
             return False
 
-def take_user_input():
+def take_user_input(on_hypothesis=None):
     # Hybrid Mode: Wake Word (Vosk) -> Command (Google Online)
     # BYPASSING PyAudio: We rely on sounddevice (via wake_engine) to capture raw audio
     # and feed it manually into speech_recognition.
     
-    if HAS_OFFLINE_WAKE:
+    wake = offline_wake()
+    if wake is not None:
         try:
-            # 1. Capture Raw Audio using SoundDevice
-            raw_audio, sample_rate = wake_engine.capture_audio(timeout=5)
-            
-            # 2. Convert to sr.AudioData
-            audio_data = sr.AudioData(raw_audio, sample_rate, 2) # 2 bytes per sample (int16)
+            # 1. Capture until the speaker stops (voice activity detection on the shared stream);
+            #    Vosk transcribes along the way and reports partial hypotheses to on_hypothesis
+            utterance = wake.capture_utterance(on_hypothesis=on_hypothesis)
+            if not utterance.audio:
+                print("   -> No speech heard.")
+                return None
+            print(f"   -> Heard {utterance.speech_seconds:.1f}s of speech (ended by {utterance.ended_by})")
             
-            # 3. SELECT MODE: Offline vs Online
+            # 2. SELECT MODE: Vosk's streamed transcript, or the same audio sent to Google
             if OFFLINE_MODE:
-                print("   -> Processing Offline (Vosk)...")
-                query = wake_engine.capture_command(timeout=5)
-                print(f"   -> Command received: {query}")
-                return query
+                query = utterance.text
             else:
                 # 3. Send to Google (Hybrid)
                 print("   -> Sending to Google Cloud...")
+                recognizer = speech_recognizer.get()
+                audio_data = sr.AudioData(utterance.audio, SAMPLE_RATE, 2) # 2 bytes per sample (int16)
                 query = recognizer.recognize_google(audio_data).lower()
-                print(f"   -> Command received: {query}")
-                return query
+            
+            global last_speech_end
+            last_speech_end = utterance.speech_end
+            print(f"   -> Command received: {query} ({speech_latency_ms():.0f} ms after you stopped speaking)")
+            return query
             
         except sr.UnknownValueError:
             print("   -> Google didn't understand.")
@@ -115,6 +164,7 @@ def take_user_input():
 
     # Fallback to Online (Needs PyAudio - likely to fail if not installed)
     try:
+        recognizer = speech_recognizer.get()
         with sr.Microphone() as source:
             print("🎤 Command Mode: Speak now... (Online Legacy)")
             recognizer.adjust_for_ambient_noise(source, duration=0.2)
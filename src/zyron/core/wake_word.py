@@ -1,20 +1,51 @@
 import os
 import json
-import sounddevice as sd
-import queue
-import sys
+import wave
+from collections import namedtuple
 from vosk import Model, KaldiRecognizer
 
+from zyron.utils.settings import settings
+from zyron.core.audio import audio_capture, SAMPLE_RATE, seconds_to_bytes
+from zyron.core.vad import UtteranceSegmenter
+
+# Command capture decodes whole phrases, so half-second blocks are fine there
+COMMAND_BLOCKSIZE = 8000
+
+# A partial hypothesis that hasn't changed for this long is reported as stable
+STABLE_PARTIAL_MS = 300
+
+# text: everything recognized so far; final: a settled segment (or the end); stable: safe to act on
+Hypothesis = namedtuple('Hypothesis', ['text', 'final', 'stable'])
+
+
+def wav_blocks(path, block_ms=30):
+    """
+    Yields raw int16 blocks of block_ms from a 16 kHz mono WAV file,
+    for replaying recordings through the engine without a microphone.
+    """
+    with wave.open(path, 'rb') as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        frames = max(1, int(SAMPLE_RATE * block_ms / 1000))
+        while True:
+            data = wav.readframes(frames)
+            if not data:
+                return
+            yield data
+
+
 class WakeWordEngine:
-    def __init__(self, model_path="model"):
+    def __init__(self, model_path="model", keyword_spotting=True, block_ms=None, audio=None):
         if not os.path.exists(model_path):
             raise Exception(f"Vosk model not found at '{model_path}'. Please run download_model.py first.")
             
         print(f"⚡ Loading Wake Word Model ({model_path})...")
         # Surpress Vosk logs
         self.model = Model(model_path)
-        self.recognizer = KaldiRecognizer(self.model, 16000)
-        self.audio_queue = queue.Queue()
+        self.recognizer = KaldiRecognizer(self.model, SAMPLE_RATE)
+        
+        # Shared microphone stream (core/audio.py); every capture reads it at its own offset
+        self.audio = audio or audio_capture
         
         # Wake words to listen for (lower case)
         self.wake_words = [
@@ -22,19 +53,44 @@ class WakeWordEngine:
             "he got true", "gotcha", "got you", 
             "be got to", "because to", "he got you"
         ]
+        
+        # Keyword spotting: small blocks into a recognizer that only knows the wake words.
+        # Otherwise (the old behaviour) the open-vocabulary recognizer hears half-second blocks.
+        self.keyword_spotting = keyword_spotting
+        self.block_ms = settings.WAKE_WORD_BLOCK_MS if block_ms is None else block_ms
+        self.wake_recognizer = self._keyword_recognizer() if keyword_spotting else self.recognizer
+        
+        # Stream offset just after the last wake word: the next capture starts there
+        self.command_offset = None
+        # Seconds of audio consumed when the last wake word was detected (for benchmarks)
+        self.detected_at = None
         print("✅ Offline Wake Word Engine Ready.")
 
-    def _callback(self, indata, frames, time, status):
-        """This is called (from a separate thread) for each audio block."""
-        if status:
-            print(status, file=sys.stderr)
-        self.audio_queue.put(bytes(indata))
+    def _keyword_recognizer(self):
+        # Phrases missing from the model's vocabulary are dropped by Vosk with a warning;
+        # "[unk]" absorbs all other speech
+        recognizer = KaldiRecognizer(self.model, SAMPLE_RATE, json.dumps(self.wake_words + ["[unk]"]))
+        recognizer.SetWords(True)
+        if hasattr(recognizer, "SetPartialWords"):
+            recognizer.SetPartialWords(True)
+        return recognizer
 
     def stop(self):
-        """Stops the engine and clears the queue."""
-        self.audio_queue = queue.Queue()
+        """Stops the engine and forgets the pending command audio."""
+        self.command_offset = None
         print("🛑 Wake Word Engine Stopped.")
 
+    def _command_reader(self):
+        offset, self.command_offset = self.command_offset, None
+        return self.audio.reader(offset)
+
+    def _wake_text(self, text):
+        """The heard text if it contains a wake word, else None"""
+        text = " ".join(word for word in text.split() if word != "[unk]")
+        if text and any(word in text for word in self.wake_words):
+            return text
+        return None
+
     def listen(self):
         """
         Blocks until a wake word is detected.
@@ -42,28 +98,55 @@ class WakeWordEngine:
         """
         print("\n👂 Waiting for 'Pikachu' (Offline)...")
         
-        with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                                channels=1, callback=self._callback):
-             while True:
-                try:
-                    data = self.audio_queue.get(timeout=0.2) # Fixed: Add timeout for SIGINT/CTRL+C
-                except queue.Empty:
-                    continue
-
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get("text", "")
-                    if text:
-                        print(f"   [Debug] Full heard: '{text}'")
-                    
-                    if any(word in text for word in self.wake_words):
-                        print(f"⚡ Wake Word Detected: '{text}'")
-                        return text
-                else:
-                    partial = json.loads(self.recognizer.PartialResult())
-                    p_text = partial.get("partial", "")
-                    if p_text:
-                        print(f"   [Debug] Partial: '{p_text}'", end="\r")
+        reader = self.audio.reader()
+        block_bytes = seconds_to_bytes(self.block_ms / 1000) if self.keyword_spotting else COMMAND_BLOCKSIZE * 2
+        return self.detect(reader.blocks(block_bytes), start_offset=reader.offset)
+
+    def detect(self, blocks, start_offset=0):
+        """
+        Feeds raw int16 blocks (a stream reader or wav_blocks) to the wake word recognizer.
+        Returns the text containing the wake word, or None when the blocks run out.
+        start_offset is the stream offset of the first block.
+        """
+        recognizer = self.wake_recognizer
+        recognizer.Reset()
+        fed = 0
+        
+        for data in blocks:
+            fed += len(data)
+
+            if recognizer.AcceptWaveform(data):
+                result = json.loads(recognizer.Result())
+                text = result.get("text", "")
+                if text and not self.keyword_spotting:
+                    print(f"   [Debug] Full heard: '{text}'")
+            elif self.keyword_spotting:
+                # The grammar keeps partials cheap and precise: act on them instead of waiting for the pause
+                result = json.loads(recognizer.PartialResult())
+                text = result.get("partial", "")
+            else:
+                partial = json.loads(recognizer.PartialResult())
+                p_text = partial.get("partial", "")
+                if p_text:
+                    print(f"   [Debug] Partial: '{p_text}'", end="\r")
+                continue
+
+            wake_text = self._wake_text(text)
+            if wake_text:
+                print(f"⚡ Wake Word Detected: '{wake_text}'")
+                self.detected_at = fed / 2 / SAMPLE_RATE
+                # The command starts where the wake word ended (by the recognizer's word timings)
+                wake_end = self._wake_word_end(result)
+                self.command_offset = start_offset + (seconds_to_bytes(wake_end) if wake_end is not None else fed)
+                recognizer.Reset()
+                return wake_text
+        return None
+
+    @staticmethod
+    def _wake_word_end(result):
+        words = result.get("result") or result.get("partial_result") or []
+        ends = [w.get("end", 0) for w in words if w.get("word") != "[unk]"]
+        return max(ends) if ends else None
 
     def capture_command(self, timeout=5):
         """
@@ -73,27 +156,15 @@ class WakeWordEngine:
         print("🎤 Command Mode: Speak now... (Offline)")
         full_text = []
         
-        # Helper to stop after timeout
-        import time
-        start_time = time.time()
-        
-        with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                               channels=1, callback=self._callback):
-             # Clear queue
-             while not self.audio_queue.empty():
-                 self.audio_queue.get()
-                 
-             while (time.time() - start_time) < timeout:
-                if not self.audio_queue.empty():
-                    data = self.audio_queue.get()
-                    if self.recognizer.AcceptWaveform(data):
-                        result = json.loads(self.recognizer.Result())
-                        text = result.get("text", "")
-                        if text:
-                            print(f"   -> '{text}'")
-                            full_text.append(text)
-                else:
-                    sd.sleep(50) # Tiny sleep to prevent cpu hog
+        # Starts right after the wake word when it was just heard (the stream never closed)
+        reader = self._command_reader()
+        for data in reader.blocks(COMMAND_BLOCKSIZE * 2, duration=timeout):
+            if self.recognizer.AcceptWaveform(data):
+                result = json.loads(self.recognizer.Result())
+                text = result.get("text", "")
+                if text:
+                    print(f"   -> '{text}'")
+                    full_text.append(text)
         
         # Get final bit
         final = json.loads(self.recognizer.FinalResult())
@@ -102,6 +173,62 @@ class WakeWordEngine:
             
         return " ".join(full_text)
 
+    def transcribe_stream(self, blocks):
+        """
+        Feeds raw int16 blocks to the open-vocabulary recognizer and yields Hypothesis tuples
+        as it goes: every new partial, the same partial again as `stable` once it has not
+        changed for STABLE_PARTIAL_MS of audio, and `final` ones whenever a segment is settled.
+        The text always covers everything heard so far; the last hypothesis is the transcript.
+        """
+        stable_bytes = seconds_to_bytes(STABLE_PARTIAL_MS / 1000)
+        self.recognizer.Reset()
+        segments = []
+        last_partial = None
+        unchanged = 0
+        
+        for data in blocks:
+            if self.recognizer.AcceptWaveform(data):
+                text = json.loads(self.recognizer.Result()).get("text", "")
+                last_partial = None
+                if text:
+                    segments.append(text)
+                    yield Hypothesis(" ".join(segments), True, True)
+                continue
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            if not partial:
+                continue
+            if partial != last_partial:
+                last_partial = partial
+                unchanged = 0
+                yield Hypothesis(" ".join(segments + [partial]), False, False)
+            elif unchanged < stable_bytes:
+                unchanged += len(data)
+                if unchanged >= stable_bytes:
+                    yield Hypothesis(" ".join(segments + [partial]), False, True)
+        
+        final = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if final:
+            segments.append(final)
+        yield Hypothesis(" ".join(segments), True, True)
+
+    def capture_utterance(self, on_hypothesis=None, **limits):
+        """
+        Captures one spoken command, ending on trailing silence (see core/vad.py), while Vosk
+        transcribes it. on_hypothesis(Hypothesis) sees every partial/final as it is recognized.
+        Returns an Utterance whose text is the Vosk transcript; its audio can also go to an
+        online recognizer.
+        """
+        print("🎤 Command Mode: Speak now...")
+        segmenter = UtteranceSegmenter(**limits)
+        text = ""
+        for hypothesis in self.transcribe_stream(segmenter.frames(self._command_reader())):
+            text = hypothesis.text
+            if hypothesis.final and text:
+                print(f"   -> '{text}'")
+            if on_hypothesis is not None:
+                on_hypothesis(hypothesis)
+        return segmenter.utterance._replace(text=text)
+
     def capture_audio(self, timeout=5):
         """
         Captures raw audio for a specific duration.
@@ -109,25 +236,8 @@ class WakeWordEngine:
         Used for Hybrid Mode (sending this audio to Google).
         """
         print("🎤 Command Mode: Speak now... (Hybrid/SoundDevice)")
-        frames = []
-        
-        import time
-        start_time = time.time()
-        
-        with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                               channels=1, callback=self._callback):
-             # Clear queue
-             while not self.audio_queue.empty():
-                 self.audio_queue.get()
-                 
-             while (time.time() - start_time) < timeout:
-                if not self.audio_queue.empty():
-                    data = self.audio_queue.get()
-                    frames.append(data)
-                else:
-                    sd.sleep(50)
-                    
-        return b''.join(frames), 16000
+        reader = self._command_reader()
+        return b''.join(reader.blocks(duration=timeout)), SAMPLE_RATE
 
 if __name__ == "__main__":
     # Test run
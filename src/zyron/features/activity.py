@@ -1,12 +1,14 @@
 import psutil
-import json
 import os
 import subprocess
-import sqlite3
-import shutil
 from collections import defaultdict
-from pathlib import Path
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from zyron.utils.settings import settings
+from zyron.features.processes import snapshot as process_snapshot, lookup as process_lookup
+from zyron.features.history import recent_urls, chromium_history_path, CHROMIUM_QUERY, FIREFOX_QUERY
 
 try:
     import win32gui
@@ -47,211 +49,73 @@ def get_running_processes():
     processes = []
     
     try:
-        for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
-            try:
-                processes.append({
-                    'pid': proc.info['pid'],
-                    'name': proc.info['name'],
-                    'exe': proc.info['exe'],
-                    'cmdline': proc.info['cmdline']
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        for proc in process_snapshot():
+            processes.append({
+                'pid': proc.pid,
+                'name': proc.name,
+                'exe': proc.exe,
+                'cmdline': list(proc.cmdline) if proc.cmdline is not None else None
+            })
     except Exception as e:
         print(f"Error getting processes: {e}")
     
     return processes
 
 
+def _history_tabs(history_db, query=CHROMIUM_QUERY):
+    """30 most recent history entries as tabs, from the shared history snapshot"""
+    tabs = []
+    for url, title in recent_urls(history_db, query)[:30]:  # Limit to 30 recent
+        if url:
+            # Use URL as title if title is missing
+            display_title = title if title else url
+            tabs.append({
+                'title': display_title,
+                'url': url
+            })
+    return tabs
+
+
 def get_chrome_tabs():
     """Get all Chrome tabs from session storage"""
-    tabs = []
-    
     try:
-        # Chrome user data path
-        chrome_path = os.path.join(
-            os.environ.get('LOCALAPPDATA', ''),
-            'Google', 'Chrome', 'User Data', 'Default'
-        )
-        
-        # Try to read History file
-        history_db = os.path.join(chrome_path, 'History')
-        
-        if os.path.exists(history_db):
-            # Copy to temp to avoid locking
-            temp_db = os.path.join(os.environ.get('TEMP', ''), 'chrome_history_temp.db')
-            try:
-                shutil.copy2(history_db, temp_db)
-                
-                conn = sqlite3.connect(temp_db)
-                cursor = conn.cursor()
-                
-                # Get recent URLs
-                cursor.execute("""
-                    SELECT url, title, last_visit_time 
-                    FROM urls 
-                    ORDER BY last_visit_time DESC 
-                    LIMIT 50
-                """)
-                
-                results = cursor.fetchall()
-                conn.close()
-                
-                # Clean up temp file
-                try:
-                    os.remove(temp_db)
-                except:
-                    pass
-            
-                for url, title, _ in results[:30]:  # Limit to 30 recent
-                    if url:
-                        # Use URL as title if title is missing
-                        display_title = title if title else url
-                        tabs.append({
-                            'title': display_title,
-                            'url': url
-                        })
-                        
-            except Exception as e:
-                print(f"Error reading Chrome history: {e}")
-                
+        return _history_tabs(chromium_history_path('chrome.exe'))
     except Exception as e:
         print(f"Error getting Chrome tabs: {e}")
-    
-    return tabs
+        return []
 
 
 def get_brave_tabs():
     """Get all Brave tabs from session storage"""
-    tabs = []
-    
     try:
-        # Brave user data path
-        brave_path = os.path.join(
-            os.environ.get('LOCALAPPDATA', ''),
-            'BraveSoftware', 'Brave-Browser', 'User Data', 'Default'
-        )
-        
-        history_db = os.path.join(brave_path, 'History')
-        
-        if os.path.exists(history_db):
-            temp_db = os.path.join(os.environ.get('TEMP', ''), 'brave_history_temp.db')
-            try:
-                shutil.copy2(history_db, temp_db)
-                
-                conn = sqlite3.connect(temp_db)
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT url, title, last_visit_time 
-                    FROM urls 
-                    ORDER BY last_visit_time DESC 
-                    LIMIT 50
-                """)
-                
-                results = cursor.fetchall()
-                conn.close()
-                
-                try:
-                    os.remove(temp_db)
-                except:
-                    pass
-                
-                for url, title, _ in results[:30]:
-                    if url:
-                        display_title = title if title else url
-                        tabs.append({
-                            'title': display_title,
-                            'url': url
-                        })
-                        
-            except Exception as e:
-                print(f"Error reading Brave history: {e}")
-                
+        return _history_tabs(chromium_history_path('brave.exe'))
     except Exception as e:
         print(f"Error getting Brave tabs: {e}")
-    
-    return tabs
+        return []
 
 
 def get_edge_tabs():
     """Get all Edge tabs from session storage"""
-    tabs = []
-    
     try:
-        # Edge user data path
-        edge_path = os.path.join(
-            os.environ.get('LOCALAPPDATA', ''),
-            'Microsoft', 'Edge', 'User Data', 'Default'
-        )
-        
-        history_db = os.path.join(edge_path, 'History')
-        
-        if os.path.exists(history_db):
-            temp_db = os.path.join(os.environ.get('TEMP', ''), 'edge_history_temp.db')
-            try:
-                shutil.copy2(history_db, temp_db)
-                
-                conn = sqlite3.connect(temp_db)
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT url, title, last_visit_time 
-                    FROM urls 
-                    ORDER BY last_visit_time DESC 
-                    LIMIT 50
-                """)
-                
-                results = cursor.fetchall()
-                conn.close()
-                
-                try:
-                    os.remove(temp_db)
-                except:
-                    pass
-                
-                for url, title, _ in results[:30]:
-                    if url:
-                        display_title = title if title else url
-                        tabs.append({
-                            'title': display_title,
-                            'url': url
-                        })
-                        
-            except Exception as e:
-                print(f"Error reading Edge history: {e}")
-                
+        return _history_tabs(chromium_history_path('msedge.exe'))
     except Exception as e:
         print(f"Error getting Edge tabs: {e}")
-    
-    return tabs
+        return []
 
 
 def get_firefox_tabs():
-    """Get Firefox tabs using Native Bridge (temp JSON) or fall back to Places database"""
+    """Get Firefox tabs from the Native Bridge's live tab table or fall back to Places database"""
     tabs = []
     
-    # Try Native Bridge first (Real-time data)
-    temp_path = Path(os.environ.get('TEMP', '')) / 'zyron_firefox_tabs.json'
-    if temp_path.exists():
-        try:
-            mtime = temp_path.stat().st_mtime
-            age = time.time() - mtime
-            # Data must be newer than 5 seconds for real-time Focus Mode
-            if age < 5:
-                with open(temp_path, 'r') as f:
-                    tabs = json.load(f)
-                if tabs:
-                    return tabs
-            elif age > 60:
-                # Remove stale data to prevent enforcer acting on zombies
-                try:
-                    os.remove(temp_path)
-                    print(f"🧹 Cleared stale Firefox tab data ({int(age)}s old)")
-                except:
-                    pass
-        except Exception as e:
-            print(f"Error reading Firefox Native Bridge data: {e}")
+    # Try Native Bridge first (Real-time data, kept current by the extension's tab events).
+    # Imported here so importing this module never pulls in the bridge
+    try:
+        from zyron.features.browser_control import get_tabs as browser_tabs
+        live_tabs = browser_tabs()
+        if live_tabs:
+            return live_tabs
+    except Exception as e:
+        print(f"Error reading Firefox Native Bridge data: {e}")
 
     try:
         # Firefox profiles path
@@ -272,48 +136,38 @@ def get_firefox_tabs():
                 places_db = os.path.join(profile_path, 'places.sqlite')
                 
                 if os.path.exists(places_db):
-                    temp_db = os.path.join(os.environ.get('TEMP', ''), 'firefox_places_temp.db')
-                    try:
-                        shutil.copy2(places_db, temp_db)
-                        
-                        conn = sqlite3.connect(temp_db)
-                        cursor = conn.cursor()
-                        
-                        cursor.execute("""
-                            SELECT url, title, last_visit_date 
-                            FROM moz_places 
-                            WHERE url IS NOT NULL 
-                            ORDER BY last_visit_date DESC 
-                            LIMIT 50
-                        """)
-                        
-                        results = cursor.fetchall()
-                        conn.close()
-                        
-                        try:
-                            os.remove(temp_db)
-                        except:
-                            pass
-                        
-                        for url, title, _ in results[:30]:
-                            if url:
-                                display_title = title if title else url
-                                tabs.append({
-                                    'title': display_title,
-                                    'url': url
-                                })
-                        
+                    tabs = _history_tabs(places_db, FIREFOX_QUERY)
+                    if tabs:
                         break # Found and processed the main profile
                         
-                    except Exception as e:
-                        print(f"Error reading Firefox places: {e}")
-                        
     except Exception as e:
         print(f"Error getting Firefox tabs: {e}")
     
     return tabs
 
 
+def _add_window_tab(tabs_by_browser, proc_name, title):
+    """Record a browser window's title as a tab (shared by the window-enumeration backends)"""
+    if not proc_name or proc_name not in BROWSER_PROCESSES or not title or not title.strip():
+        return
+    browser_name = BROWSER_PROCESSES[proc_name]
+    
+    # Clean up browser suffixes from window titles
+    for suffix in [f' - {browser_name}', f' — {browser_name}', 
+                  ' - Google Chrome', ' - Brave', ' - Microsoft Edge',
+                  ' - Mozilla Firefox', ' - Chromium']:
+        if title.endswith(suffix):
+            title = title[:-len(suffix)]
+            break
+    
+    # Filter out generic window titles
+    if title.strip() and title not in ['New Tab', 'Chrome', 'Brave', 'Edge', 'Firefox']:
+        tabs_by_browser[browser_name].append({
+            'title': title.strip(),
+            'url': 'Active Window' # Placeholder as we can't get URL from window title easily
+        })
+
+
 def get_browser_tabs_win32():
     """Get browser tabs using win32gui - reads ACTUAL open windows only"""
     if not HAS_WIN32:
@@ -321,13 +175,18 @@ def get_browser_tabs_win32():
     
     tabs_by_browser = defaultdict(list)
     
+    # pid -> name, built once per enumeration from the shared process snapshot
+    pid_names = {proc.pid: proc.name for proc in process_snapshot()}
+    
     def get_process_name(hwnd):
         """Get process name for a window"""
         try:
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            for proc in psutil.process_iter(['pid', 'name']):
-                if proc.info['pid'] == pid:
-                    return proc.info['name']
+            if pid not in pid_names:
+                # Started after the snapshot: one direct lookup, remembered for the other windows
+                proc = process_lookup(pid)
+                pid_names[pid] = proc.name if proc else None
+            return pid_names[pid]
         except:
             pass
         return None
@@ -337,27 +196,8 @@ def get_browser_tabs_win32():
         if win32gui.IsWindowVisible(hwnd):
             try:
                 proc_name = get_process_name(hwnd)
-                
-                if proc_name and proc_name in BROWSER_PROCESSES:
-                    title = win32gui.GetWindowText(hwnd)
-                    
-                    if title and title.strip():
-                        browser_name = BROWSER_PROCESSES[proc_name]
-                        
-                        # Clean up browser suffixes from window titles
-                        for suffix in [f' - {browser_name}', f' — {browser_name}', 
-                                      ' - Google Chrome', ' - Brave', ' - Microsoft Edge',
-                                      ' - Mozilla Firefox', ' - Chromium']:
-                            if title.endswith(suffix):
-                                title = title[:-len(suffix)]
-                                break
-                        
-                        # Filter out generic window titles
-                        if title.strip() and title not in ['New Tab', 'Chrome', 'Brave', 'Edge', 'Firefox']:
-                            tabs_by_browser[browser_name].append({
-                                'title': title.strip(),
-                                'url': 'Active Window' # Placeholder as we can't get URL from window title easily
-                            })
+                if proc_name in BROWSER_PROCESSES:
+                    _add_window_tab(tabs_by_browser, proc_name, win32gui.GetWindowText(hwnd))
             except Exception as e:
                 pass
     
@@ -369,54 +209,6 @@ def get_browser_tabs_win32():
     return dict(tabs_by_browser)
 
 
-def get_browser_tabs_all():
-    """Get browser tabs from all detected browsers using their databases"""
-    
-    tabs_by_browser = defaultdict(list)
-    
-    # 1. Detect running browsers
-    processes = get_running_processes()
-    running_browsers = set()
-    
-    for proc in processes:
-        if proc['name'] in BROWSER_PROCESSES:
-            browser_name = BROWSER_PROCESSES[proc['name']]
-            running_browsers.add(browser_name)
-    
-    print(f"   → Detected running browsers: {running_browsers}")
-    
-    # 2. Fetch tabs for running browsers using Database methods (Gets ALL tabs, not just active)
-    if 'Google Chrome' in running_browsers:
-        print("   → Fetching Chrome tabs...")
-        chrome_tabs = get_chrome_tabs()
-        if chrome_tabs:
-            tabs_by_browser['Google Chrome'] = chrome_tabs
-            print(f"      ✓ Found {len(chrome_tabs)} Chrome tabs")
-    
-    if 'Brave Browser' in running_browsers:
-        print("   → Fetching Brave tabs...")
-        brave_tabs = get_brave_tabs()
-        if brave_tabs:
-            tabs_by_browser['Brave Browser'] = brave_tabs
-            print(f"      ✓ Found {len(brave_tabs)} Brave tabs")
-    
-    if 'Microsoft Edge' in running_browsers:
-        print("   → Fetching Edge tabs...")
-        edge_tabs = get_edge_tabs()
-        if edge_tabs:
-            tabs_by_browser['Microsoft Edge'] = edge_tabs
-            print(f"      ✓ Found {len(edge_tabs)} Edge tabs")
-    
-    if 'Mozilla Firefox' in running_browsers:
-        print("   → Fetching Firefox tabs...")
-        firefox_tabs = get_firefox_tabs()
-        if firefox_tabs:
-            tabs_by_browser['Mozilla Firefox'] = firefox_tabs
-            print(f"      ✓ Found {len(firefox_tabs)} Firefox tabs")
-    
-    return dict(tabs_by_browser)
-
-
 def get_desktop_applications():
     """Get list of desktop applications currently running"""
     apps = []
@@ -587,47 +379,173 @@ def get_desktop_applications():
     return apps
 
 
-def get_current_activities():
+class CpuSampler:
+    """
+    Samples system CPU% in a background thread, so readers get the latest value instantly
+    instead of sleeping through psutil.cpu_percent(interval=...) themselves.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._latest = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            self._latest = psutil.cpu_percent(interval=self.interval)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="cpu-sampler")
+                self._thread.start()
+
+    def latest(self):
+        self.start()
+        if self._latest is None:
+            # First call only: a short sample instead of waiting for the sampler
+            return psutil.cpu_percent(interval=0.1)
+        return self._latest
+
+
+cpu_sampler = CpuSampler()
+
+
+def get_system_info():
+    mem = psutil.virtual_memory()
+    return {
+        'cpu_usage': f"{cpu_sampler.latest()}%",
+        'ram_usage': f"{mem.percent}%",
+        'ram_available': f"{round(mem.available / (1024**3), 2)} GB",
+        'total_processes': len(process_snapshot())
+    }
+
+
+# Browser name -> tab collector
+BROWSER_TAB_COLLECTORS = {
+    'Google Chrome': get_chrome_tabs,
+    'Brave Browser': get_brave_tabs,
+    'Microsoft Edge': get_edge_tabs,
+    'Mozilla Firefox': get_firefox_tabs,
+}
+
+# Open browser windows by title (win32): fills in browsers whose history collector found nothing
+WINDOW_TAB_COLLECTOR = 'browser_windows'
+
+_collector_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="activity")
+_last_results = {}  # collector name -> last completed result, served (marked stale) when a collector overruns
+_in_flight = {}  # collector name -> its running Future (never more than one run per collector)
+_in_flight_lock = threading.Lock()
+
+
+def _run_collector(name, func):
+    start = time.time()
+    result = func()
+    _last_results[name] = result
+    return result, time.time() - start
+
+
+def _submit_collector(name, func):
+    """
+    The collector's Future: the run still going from an earlier call when there is one (a hung
+    collector, e.g. on a locked Places DB, must not pile up runs and block the whole pool),
+    otherwise a new run.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(name)
+        if future is None or future.done():
+            future = _in_flight[name] = _collector_pool.submit(_run_collector, name, func)
+        return future
+
+
+def get_current_activities(deadline=None):
     """
     Main function to get all current activities
     Returns a structured dictionary with browsers, desktop apps, and system info
+
+    Collectors run concurrently, all under the same deadline (settings.ACTIVITY_COLLECTOR_TIMEOUT).
+    One that overruns keeps running in the background (later calls wait on that run rather than
+    starting another); this call uses its previous result, listed under 'stale', or leaves its
+    section out, listed under 'missing'.
+    'timings' has each finished collector's time in seconds.
     """
     
     print("🔍 Collecting current activities...")
+    deadline = settings.ACTIVITY_COLLECTOR_TIMEOUT if deadline is None else deadline
+    start = time.time()
     
     activities = {
         'browsers': {},
         'desktop_apps': [],
-        'system_info': {}
+        'system_info': {},
+        'timings': {},
+        'stale': [],
+        'missing': []
     }
     
-    # 1. Browsers
-    print("   → Checking browsers...")
-    browser_tabs = get_browser_tabs_all()
-    activities['browsers'] = browser_tabs
+    # 1. Detect running browsers (shared process snapshot, no collector needed)
+    running_browsers = {BROWSER_PROCESSES[proc.name] for proc in process_snapshot() if proc.name in BROWSER_PROCESSES}
+    print(f"   → Detected running browsers: {running_browsers}")
     
-    # 2. Desktop Apps
-    print("   → Checking desktop applications...")
-    activities['desktop_apps'] = get_desktop_applications()
+    collectors = {name: func for name, func in BROWSER_TAB_COLLECTORS.items() if name in running_browsers}
+    collectors['desktop_apps'] = get_desktop_applications
+    collectors['system_info'] = get_system_info
+    if HAS_WIN32:
+        collectors[WINDOW_TAB_COLLECTOR] = get_browser_tabs_win32
     
-    # 3. System Info
-    try:
-        cpu_percent = psutil.cpu_percent(interval=0.5)
-        mem = psutil.virtual_memory()
-        
-        activities['system_info'] = {
-            'cpu_usage': f"{cpu_percent}%",
-            'ram_usage': f"{mem.percent}%",
-            'ram_available': f"{round(mem.available / (1024**3), 2)} GB",
-            'total_processes': len(list(psutil.process_iter()))
-        }
-    except Exception as e:
-        print(f"Error getting system info: {e}")
+    futures = {name: _submit_collector(name, func) for name, func in collectors.items()}
+    wait(futures.values(), timeout=deadline)
     
-    print("✅ Activity collection complete!")
+    window_tabs = {}
+    for name, future in futures.items():
+        if future.done():
+            try:
+                result, took = future.result()
+                activities['timings'][name] = round(took, 3)
+            except Exception as e:
+                print(f"Error collecting {name}: {e}")
+                activities['missing'].append(name)
+                continue
+        elif name in _last_results:
+            result = _last_results[name]
+            activities['stale'].append(name)
+        else:
+            activities['missing'].append(name)
+            continue
+        
+        if name in BROWSER_TAB_COLLECTORS:
+            if result:
+                activities['browsers'][name] = result
+                print(f"      ✓ Found {len(result)} {name} tabs")
+        elif name == WINDOW_TAB_COLLECTOR:
+            window_tabs = result or {}
+        else:
+            activities[name] = result
+    
+    for browser, tabs in window_tabs.items():
+        if tabs and browser not in activities['browsers']:
+            activities['browsers'][browser] = tabs
+            print(f"      ✓ Found {len(tabs)} {browser} windows")
+    
+    timings = ", ".join(f"{name} {took:.2f}s" for name, took in activities['timings'].items())
+    print(f"⏱️ Collectors: {timings}")
+    if activities['stale'] or activities['missing']:
+        print(f"   ⚠️ Over the {deadline}s deadline: stale={activities['stale']} missing={activities['missing']}")
+    print(f"✅ Activity collection complete! ({time.time() - start:.2f}s)")
     return activities
 
 
+def _collector_notes(activities):
+    """Footer lines naming collectors that missed the deadline"""
+    notes = []
+    if activities.get('stale'):
+        notes.append(f"⏱️ _Still updating (showing last result):_ {escape_markdown(', '.join(activities['stale']))}")
+    if activities.get('missing'):
+        notes.append(f"⏱️ _Timed out:_ {escape_markdown(', '.join(activities['missing']))}")
+    return notes
+
+
 def format_activities_text(activities, max_message_length=4000):
     """
     Format activities into a readable text format for Telegram
@@ -686,6 +604,11 @@ def format_activities_text(activities, max_message_length=4000):
         lines.append(f"   RAM: {info.get('ram_usage', 'N/A')} (Free: {info.get('ram_available', 'N/A')})")
         lines.append(f"   Processes: {info.get('total_processes', 'N/A')}")
     
+    notes = _collector_notes(activities)
+    if notes:
+        lines.append("")
+        lines.extend(notes)
+    
     full_text = "\n".join(lines)
     
     # Split if too long
@@ -768,6 +691,11 @@ def split_long_message(activities, max_length=4000):
         final_lines.append(f"   RAM: {info.get('ram_usage', 'N/A')} (Free: {info.get('ram_available', 'N/A')})")
         final_lines.append(f"   Processes: {info.get('total_processes', 'N/A')}")
     
+    notes = _collector_notes(activities)
+    if notes:
+        final_lines.append("")
+        final_lines.extend(notes)
+    
     if final_lines:
         messages.append("\n".join(final_lines))
     
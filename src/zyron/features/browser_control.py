@@ -1,65 +1,75 @@
-import json
-import os
+import asyncio
 import time
-from pathlib import Path
 
-COMMAND_FILE_PATH = Path(os.environ.get('TEMP', '')) / 'zyron_firefox_commands.json'
+from zyron.core.browser_ipc import BrowserBridge
+from zyron.utils.settings import settings
 
-def send_browser_command(action, **kwargs):
-    """Writes a command to the shared JSON file for the native host to pick up."""
+# Commands whose reply the caller waits for
+RESULT_ACTIONS = ["read", "scan", "create_tab", "click", "type", "scroll"]
+
+# Seconds to wait for a reply unless the caller passes its own timeout
+DEFAULT_TIMEOUT = 10
+
+# Screenshots include activating the tab and letting it render first
+CAPTURE_TIMEOUT = 15
+
+# Local socket/named pipe to the native host (browser_host.py), which connects to us.
+# Not started on import: the voice assistant and the Telegram bot both import this module,
+# and only one process can own the bridge (see start_bridge)
+bridge = BrowserBridge()
+
+def start_bridge():
+    """
+    Takes the browser bridge for this process; when another Zyron process already holds it,
+    attaches to that process instead, so browser commands are relayed through it.
+    Called by the entry points.
+    """
+    try:
+        if bridge.start():
+            return True
+        bridge.attach()
+        print("ℹ️ Browser bridge is held by another Zyron process; browser commands go through it")
+        return True
+    except Exception as e:
+        print(f"⚠️ Browser bridge unavailable: {e}")
+    return False
+
+def send_browser_command(action, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    Sends a command straight to the native host over the browser bridge.
+    Commands that expect a reply carry a request id and wait only for their own reply,
+    so several can be in flight at once (e.g. reading two tabs from different threads).
+    """
     # Ensure tabId is passed if provided
     command = {"action": action, **kwargs}
     
     try:
-        commands = []
-        if COMMAND_FILE_PATH.exists():
-            try:
-                with open(COMMAND_FILE_PATH, 'r') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        commands = data
-            except: pass
-            
-        commands.append(command)
-        
-        with open(COMMAND_FILE_PATH, 'w') as f:
-            json.dump(commands, f)
-        
         # if the action expects a result (like "read" or "scan" or "create_tab"), wait for it
-        if action in ["read", "scan", "create_tab", "click", "type", "scroll"]:
-            return wait_for_result()
-            
+        if action in RESULT_ACTIONS:
+            return unwrap_result(bridge.request(command, timeout=timeout))
+        
+        if not bridge.send(command):
+            print(f"❌ {bridge.unavailable_reason()} (is the extension running?)")
+            return False
         return True
+    except TimeoutError:
+        return {"success": False, "error": "Timeout waiting for browser response"}
+    except ConnectionError as e:
+        print(f"❌ {e} (is the extension running?)")
+        return {"success": False, "error": str(e)}
     except Exception as e:
-        print(f"❌ Failed to queue browser command: {e}")
+        print(f"❌ Failed to send browser command: {e}")
         return False
 
-def wait_for_result(timeout=10):
-    """Polls for the result file from the native host."""
-    nav_path = Path(os.environ.get('TEMP', '')) / 'zyron_nav_result.json'
-    
-    # Clear old result first
-    if nav_path.exists():
-        try: os.remove(nav_path)
-        except: pass
-        
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if nav_path.exists():
-            try:
-                time.sleep(0.1)
-                with open(nav_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Handle direct message or wrapped data
-                    if not data: continue
-                try: os.remove(nav_path)
-                except: pass
-                return data
-            except:
-                pass
-        time.sleep(0.2)
-        
-    return {"success": False, "error": "Timeout waiting for browser response"}
+def get_tabs():
+    """Tabs from the native host's live tab table, or None while no browser is connected."""
+    return bridge.tabs.tabs()
+
+def unwrap_result(message):
+    """tab_created is returned whole (it carries tabId), navigation results unwrapped"""
+    if message.get("action") == "tab_created":
+        return message
+    return message.get("data", {})
 
 def close_tab(tab_id):
     return send_browser_command("close_tab", tabId=tab_id)
@@ -103,3 +113,56 @@ def press_key(selector, key, tab_id=None):
         selector = f'[data-zyron-id="{selector}"]'
     return send_browser_command("press_key", selector=selector, key=key, tabId=tab_id)
 
+def _capture_command(tab_id, window_id=None, fmt=None, quality=None, max_width=None):
+    return {
+        "action": "capture_tab",
+        "tabId": tab_id,
+        "windowId": window_id,
+        "format": (fmt or settings.TAB_CAPTURE_FORMAT).lower(),
+        "quality": settings.TAB_CAPTURE_QUALITY if quality is None else quality,
+        "maxWidth": settings.TAB_CAPTURE_MAX_WIDTH if max_width is None else max_width,
+    }
+
+def _capture_reply(message, started):
+    if message.get("action") != "capture_result":
+        return {"success": False, "error": message.get("error", "Capture failed")}
+    timings = message.get("timings", {})
+    timings["totalMs"] = round((time.perf_counter() - started) * 1000, 1)
+    return {
+        "success": True,
+        "image": message["image"],
+        "mime": message.get("mime"),
+        "width": message.get("width"),
+        "height": message.get("height"),
+        "timings": timings,
+    }
+
+def capture_tab(tab_id, window_id=None, fmt=None, quality=None, max_width=None, timeout=CAPTURE_TIMEOUT):
+    """
+    Screenshot of a tab as image bytes: {"success": True, "image": b"...", "mime": ..., "timings": {...}}.
+    Format, quality and maximum width default to the TAB_CAPTURE_* settings.
+    """
+    started = time.perf_counter()
+    try:
+        message = bridge.request(_capture_command(tab_id, window_id, fmt, quality, max_width), timeout=timeout)
+    except TimeoutError:
+        return {"success": False, "error": "Timeout waiting for screenshot"}
+    except ConnectionError as e:
+        return {"success": False, "error": str(e)}
+    return _capture_reply(message, started)
+
+def capture_tab_with_window(tab_id, window_id):
+    return capture_tab(tab_id, window_id)
+
+async def capture_tab_async(tab_id, window_id=None, fmt=None, quality=None, max_width=None, timeout=CAPTURE_TIMEOUT):
+    """capture_tab for coroutines: the reply resolves the awaited future directly, no thread is held."""
+    started = time.perf_counter()
+    try:
+        future = bridge.submit(_capture_command(tab_id, window_id, fmt, quality, max_width),
+                               connect_timeout=0)
+        message = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        return {"success": False, "error": "Timeout waiting for screenshot"}
+    except ConnectionError as e:
+        return {"success": False, "error": str(e)}
+    return _capture_reply(message, started)
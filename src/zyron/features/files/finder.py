@@ -4,27 +4,23 @@ Intelligent search engine that understands natural language time/type queries
 Part 2 of Context-Aware File Finder
 """
 
-import json
-import os
+import time
 from datetime import datetime, timedelta
 import re
 from typing import List, Dict, Tuple, Optional
 from difflib import SequenceMatcher
-
-# File to load activity logs from
-FILE_ACTIVITY_LOG = "file_activity_log.json"
+import numpy as np
+from zyron.features.files.store import get_store
+from zyron.features.files.index import get_index
 
 
 def load_file_activity_log():
-    """Load file activity log from JSON"""
-    if os.path.exists(FILE_ACTIVITY_LOG):
-        try:
-            with open(FILE_ACTIVITY_LOG, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading file activity log: {e}")
-            return []
-    return []
+    """Load file activity log from the shared activity store"""
+    try:
+        return get_store().load_entries()
+    except Exception as e:
+        print(f"Error loading file activity log: {e}")
+        return []
 
 
 def parse_time_query(query_text: str) -> Optional[Tuple[datetime, datetime]]:
@@ -328,6 +324,26 @@ def extract_keyword(query_text: str) -> Optional[str]:
     return None
 
 
+def recency_score(hours_old: float) -> int:
+    """Base score for how recently a file was accessed (10-40 points)"""
+    if hours_old < 1: return 40
+    elif hours_old < 6: return 35
+    elif hours_old < 24: return 30
+    elif hours_old < 72: return 20
+    else: return 10
+
+
+def duration_score(duration: int) -> int:
+    """Score for how long a file was open (max 20 points)"""
+    if duration > 300:  # >5 minutes
+        return 20
+    elif duration > 60:  # >1 minute
+        return 15
+    elif duration > 0:
+        return 10
+    return 0
+
+
 def calculate_relevance_score(entry: Dict, time_range: Optional[Tuple[datetime, datetime]], 
                               file_types: Optional[List[str]], keyword: Optional[str],
                               target_app: Optional[str] = None) -> float:
@@ -364,20 +380,10 @@ def calculate_relevance_score(entry: Dict, time_range: Optional[Tuple[datetime,
             
     # 2. RECENCY SCORE (Base - Existing)
     hours_old = (datetime.now() - entry_time).total_seconds() / 3600
-    if hours_old < 1: score += 40
-    elif hours_old < 6: score += 35
-    elif hours_old < 24: score += 30
-    elif hours_old < 72: score += 20
-    else: score += 10
+    score += recency_score(hours_old)
     
     # Duration score (max 20 points)
-    duration = entry.get('duration_seconds', 0)
-    if duration > 300:  # >5 minutes
-        score += 20
-    elif duration > 60:  # >1 minute
-        score += 15
-    elif duration > 0:
-        score += 10
+    score += duration_score(entry.get('duration_seconds', 0))
     
     # 3. TYPE MATCH (Existing)
     if file_types and entry['file_type'] in file_types:
@@ -408,6 +414,76 @@ def calculate_relevance_score(entry: Dict, time_range: Optional[Tuple[datetime,
     return min(score, 100.0)
 
 
+# Score tiers as lookup tables for vectorized scoring (same rules as recency_score/duration_score)
+_RECENCY_HOURS = np.array([1, 6, 24, 72])
+_RECENCY_POINTS = np.array([40, 35, 30, 20, 10])
+_DURATION_SECONDS = np.array([0, 60, 300])
+_DURATION_POINTS = np.array([0, 10, 15, 20])
+
+
+def search_index(time_range: Optional[Tuple[datetime, datetime]], file_types: Optional[List[str]],
+                 keyword: Optional[str], target_app: Optional[str] = None, limit: int = 5) -> List[Dict]:
+    """
+    Same scoring as calculate_relevance_score(), but vectorized over the file search index.
+
+    Only rows inside the time range are scored, keyword matching runs once per distinct
+    file name, and only the top `limit` rows are turned back into dicts.
+    Ties go to the more recent file.
+    """
+    index = get_index()
+    
+    with index.lock:
+        if time_range:
+            rows = index.rows_in_range(*time_range)
+            time_points = 100
+        else:
+            rows = index.time_order()
+            time_points = 0
+        if not len(rows) or limit <= 0:
+            return []
+        
+        epochs = index.epochs.view()[rows]
+        hours_old = (time.time() - epochs) / 3600
+        
+        scores = time_points + _RECENCY_POINTS[np.searchsorted(_RECENCY_HOURS, hours_old, side='right')]
+        scores = scores + _DURATION_POINTS[np.searchsorted(_DURATION_SECONDS, index.durations.view()[rows], side='left')]
+        
+        if file_types:
+            type_hit = index.type_mask(file_types)[index.type_codes.view()[rows]]
+            scores = scores + np.where(type_hit, 20, -20)
+        
+        if target_app:
+            app_hit = index.app_mask(target_app)[index.app_codes.view()[rows]]
+            scores = scores + np.where(app_hit, 50, -20)
+        
+        if keyword:
+            # Points per distinct name, then broadcast to rows through the name codes
+            name_points = np.zeros(len(index.names))
+            contains = index.names_containing(keyword)
+            name_points[list(contains)] = 40
+            for nid, ratio in index.names_similar(keyword, exclude=contains).items():
+                name_points[nid] = ratio * 30
+            scores = scores + name_points[index.name_codes.view()[rows]]
+        
+        scores = np.minimum(scores, 100.0)
+        
+        # Top-k: everything above the k-th best score, plus ties at it broken by recency
+        positive = np.flatnonzero(scores > 0)
+        if not len(positive):
+            return []
+        if len(positive) > limit:
+            kth = np.partition(scores[positive], -limit)[-limit]
+            positive = positive[scores[positive] >= kth]
+        best = positive[np.lexsort((-epochs[positive], -scores[positive]))][:limit]
+        
+        results = []
+        for pos in best:
+            result = index.entries[rows[pos]].copy()
+            result['confidence_score'] = float(scores[pos])
+            results.append(result)
+        return results
+
+
 def find_files(time_query: Optional[str] = None, file_type: Optional[str] = None, 
                keyword: Optional[str] = None, limit: int = 5) -> List[Dict]:
     """
@@ -422,12 +498,6 @@ def find_files(time_query: Optional[str] = None, file_type: Optional[str] = None
     Returns:
         List of matching file entries with confidence scores
     """
-    # Load activity log
-    activity_log = load_file_activity_log()
-    
-    if not activity_log:
-        return []
-    
     # Parse time range
     time_range = None
     if time_query:
@@ -438,23 +508,8 @@ def find_files(time_query: Optional[str] = None, file_type: Optional[str] = None
     if file_type:
         file_types = normalize_file_type(file_type)
     
-    # Filter and score results
-    scored_results = []
-    
-    for entry in activity_log:
-        # Calculate relevance score (Uses default None for target_app here)
-        score = calculate_relevance_score(entry, time_range, file_types, keyword)
-        
-        if score > 0:
-            result = entry.copy()
-            result['confidence_score'] = score
-            scored_results.append(result)
-    
-    # Sort by score (highest first)
-    scored_results.sort(key=lambda x: x['confidence_score'], reverse=True)
-    
-    # Return top N results
-    return scored_results[:limit]
+    # Score candidates from the search index (no target_app here)
+    return search_index(time_range, file_types, keyword, limit=limit)
 
 
 def find_files_from_query(natural_query: str, limit: int = 5) -> List[Dict]:
@@ -484,25 +539,8 @@ def find_files_from_query(natural_query: str, limit: int = 5) -> List[Dict]:
     elif "code" in q_lower or "vscode" in q_lower: target_app = "code"
     elif "notepad" in q_lower: target_app = "notepad"
     
-    # Load logs
-    activity_log = load_file_activity_log()
-    if not activity_log:
-        return []
-        
-    scored_results = []
-    
-    for entry in activity_log:
-        # Pass all extracted info to the score calculator
-        score = calculate_relevance_score(entry, time_range, file_types, keyword, target_app)
-        
-        if score > 0:
-            result = entry.copy()
-            result['confidence_score'] = score
-            scored_results.append(result)
-            
-    # Sort results
-    scored_results.sort(key=lambda x: x['confidence_score'], reverse=True)
-    return scored_results[:limit]
+    # Pass all extracted info to the indexed search
+    return search_index(time_range, file_types, keyword, target_app, limit=limit)
 
 
 def format_search_results(results: List[Dict], include_paths: bool = True) -> str:
@@ -4,21 +4,23 @@ Tracks all file opens/access in real-time and logs activity
 """
 
 import os
-import json
 import time
 import threading
-import sqlite3
-import shutil
 import urllib.parse
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict
 import win32gui
 import win32process
 import psutil
+from zyron.features.files.store import get_store
+from zyron.features.files.path_filter import get_path_filter
+from zyron.features.files.index import index_entry, index_duration, prune_index
+from zyron.features.history import recent_urls, chromium_history_path
+import zyron.features.processes as processes
 
 # Configuration
-FILE_ACTIVITY_LOG = "file_activity_log.json"
 MAX_LOG_DAYS = 30  # Keep last 30 days of activity
+NEGATIVE_CACHE_SECONDS = 10  # How long a window that showed no file is left alone
 CHECK_INTERVAL = 2  # Check every 2 seconds
 
 # Global state
@@ -36,86 +38,29 @@ BROWSER_APPS = {
     'opera.exe': 'Opera'
 }
 
-# System/temp paths to ignore
-IGNORE_PATHS = [
-    "\\AppData\\Local\\Temp",
-    "\\Windows\\",
-    "\\System32\\",
-    "\\Program Files\\",
-    "\\ProgramData\\",
-    "\\$Recycle.Bin",
-    "\\.git",
-    "\\node_modules",
-    "\\venv\\",
-    "\\__pycache__",
-]
-
-# File extensions we care about
-TRACKED_EXTENSIONS = [
-    # Documents
-    '.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt',
-    # Spreadsheets
-    '.xlsx', '.xls', '.csv', '.ods',
-    # Presentations
-    '.pptx', '.ppt', '.odp',
-    # Images
-    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp',
-    # Videos
-    '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv',
-    # Audio
-    '.mp3', '.wav', '.flac', '.aac', '.ogg',
-    # Code
-    '.py', '.js', '.java', '.cpp', '.c', '.html', '.css', '.json', '.xml',
-    # Archives
-    '.zip', '.rar', '.7z', '.tar', '.gz',
-    # Others
-    '.exe', '.msi', '.apk', '.dmg'
-]
-
-
 def load_activity_log():
-    """Load existing activity log from file"""
+    """Load existing activity log from the activity store"""
     global file_activity_log
     
-    if os.path.exists(FILE_ACTIVITY_LOG):
-        try:
-            with open(FILE_ACTIVITY_LOG, 'r', encoding='utf-8') as f:
-                file_activity_log = json.load(f)
-                print(f"📁 Loaded {len(file_activity_log)} file activity records")
-        except Exception as e:
-            print(f"Error loading file activity log: {e}")
-            file_activity_log = []
-    else:
+    try:
+        file_activity_log = get_store().load_entries()
+        print(f"📁 Loaded {len(file_activity_log)} file activity records")
+    except Exception as e:
+        print(f"Error loading file activity log: {e}")
         file_activity_log = []
-        # Create empty file immediately to ensure it exists
-        save_activity_log()
 
 
 def save_activity_log():
-    """Save activity log to file"""
+    """Flush pending activity log writes to disk"""
     try:
-        with open(FILE_ACTIVITY_LOG, 'w', encoding='utf-8') as f:
-            json.dump(file_activity_log, f, indent=2, ensure_ascii=False)
+        get_store().flush()
     except Exception as e:
         print(f"Error saving file activity log: {e}")
 
 
 def should_ignore_file(file_path):
     """Check if file should be ignored based on path or extension"""
-    if not file_path or not isinstance(file_path, str):
-        return True
-    
-    # Ignore system/temp paths
-    for ignore_path in IGNORE_PATHS:
-        if ignore_path.lower() in file_path.lower():
-            return True
-    
-    # Check if extension is tracked
-    _, ext = os.path.splitext(file_path)
-    if ext.lower() not in TRACKED_EXTENSIONS:
-        return True
-    
-    return False
+    return get_path_filter()(file_path)
 
 
 def get_browser_local_file(browser_process_name, window_title):
@@ -124,62 +69,33 @@ def get_browser_local_file(browser_process_name, window_title):
     to see if the user is looking at a local file (file:///...)
     """
     try:
-        history_db = None
-        user_data_dir = os.environ.get('LOCALAPPDATA', '')
-
-        # Define paths to History DB based on browser
-        if browser_process_name == 'chrome.exe':
-            history_db = os.path.join(user_data_dir, 'Google', 'Chrome', 'User Data', 'Default', 'History')
-        elif browser_process_name == 'msedge.exe':
-            history_db = os.path.join(user_data_dir, 'Microsoft', 'Edge', 'User Data', 'Default', 'History')
-        elif browser_process_name == 'brave.exe':
-            history_db = os.path.join(user_data_dir, 'BraveSoftware', 'Brave-Browser', 'User Data', 'Default', 'History')
-        
-        if not history_db or not os.path.exists(history_db):
+        history_db = chromium_history_path(browser_process_name)
+        if not history_db:
             return None
 
-        # Copy DB to temp to avoid locking issues
-        temp_db = os.path.join(os.environ.get('TEMP', ''), 'tracker_history_temp.db')
-        try:
-            shutil.copy2(history_db, temp_db)
-            
-            conn = sqlite3.connect(temp_db)
-            cursor = conn.cursor()
-            
-            # IMPROVEMENT: Get last 20 items, not just 1.
-            # This helps if the user opened 3 tabs and we want to find the one matching the window title.
-            cursor.execute("SELECT url, title FROM urls ORDER BY last_visit_time DESC LIMIT 20")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            for row in rows:
-                url, db_title = row
-                if not url: continue
-
-                # CHECK: Is it a local file?
-                if url.startswith('file:///'):
-                    # Convert file:///C:/Users/Name%20Here/Doc.pdf -> C:\Users\Name Here\Doc.pdf
-                    # 1. Unquote removes %20 and other URL encoding
-                    decoded_url = urllib.parse.unquote(url)
-                    # 2. Strip prefix and fix slashes
-                    clean_path = decoded_url.replace('file:///', '').replace('/', '\\')
-                    
-                    # 3. Fuzzy Match: Check if the filename appears in the Window Title
-                    # Window Title: "Project Proposal.pdf - Google Chrome"
-                    # File Name: "Project Proposal.pdf"
-                    filename = os.path.basename(clean_path)
-                    
-                    if filename and (filename.lower() in window_title.lower()):
-                        # Verify file actually exists
-                        if os.path.exists(clean_path):
-                            return clean_path
-        except Exception as e:
-            # print(f"DB Error: {e}")
-            pass
-        finally:
-            if os.path.exists(temp_db):
-                try: os.remove(temp_db)
-                except: pass
+        # Shared snapshot: re-read only when the History file changes, never copied per tick
+        # IMPROVEMENT: Get last 20 items, not just 1.
+        # This helps if the user opened 3 tabs and we want to find the one matching the window title.
+        for url, db_title in recent_urls(history_db, limit=20):
+            if not url: continue
+
+            # CHECK: Is it a local file?
+            if url.startswith('file:///'):
+                # Convert file:///C:/Users/Name%20Here/Doc.pdf -> C:\Users\Name Here\Doc.pdf
+                # 1. Unquote removes %20 and other URL encoding
+                decoded_url = urllib.parse.unquote(url)
+                # 2. Strip prefix and fix slashes
+                clean_path = decoded_url.replace('file:///', '').replace('/', '\\')
+                
+                # 3. Fuzzy Match: Check if the filename appears in the Window Title
+                # Window Title: "Project Proposal.pdf - Google Chrome"
+                # File Name: "Project Proposal.pdf"
+                filename = os.path.basename(clean_path)
+                
+                if filename and (filename.lower() in window_title.lower()):
+                    # Verify file actually exists
+                    if os.path.exists(clean_path):
+                        return clean_path
 
     except Exception as e:
         print(f"Error checking browser file: {e}")
@@ -187,6 +103,47 @@ def get_browser_local_file(browser_process_name, window_title):
     return None
 
 
+class WindowFileCache:
+    """
+    What each foreground window resolved to, keyed on (window handle, pid, title).
+
+    A window keeps its answer until its title or pid changes (editors put the document name
+    in the title), so sitting in one document costs a title read per tick. "No file"
+    answers are only trusted for NEGATIVE_CACHE_SECONDS, since a file can show up in a
+    browser's history or a process's handles a moment later.
+    """
+
+    def __init__(self, negative_ttl=None, max_windows=64):
+        self.negative_ttl = NEGATIVE_CACHE_SECONDS if negative_ttl is None else negative_ttl
+        self.max_windows = max_windows
+        self._entries = OrderedDict()  # key -> ((path, app), expires or None)
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, window, pid, title, resolver):
+        key = (window, pid, title)
+        now = time.time()
+        cached = self._entries.get(key)
+        if cached is not None and (cached[1] is None or now < cached[1]):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+        
+        self.misses += 1
+        result = resolver(window, title, pid)
+        self._entries[key] = (result, None if result[0] else now + self.negative_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_windows:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+
+window_file_cache = WindowFileCache()
+
+
 def get_active_window_file():
     """Get file path from currently active window using multiple detection methods"""
     try:
@@ -203,10 +160,25 @@ def get_active_window_file():
         # Get process ID
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
         
+        # Same window, same title: reuse the earlier answer instead of re-deriving it
+        return window_file_cache.resolve(hwnd, pid, window_title, _resolve_window_file)
+    
+    except Exception as e:
+        print(f"[DEBUG] Error in detector: {e}")
+    
+    return None, None
+
+
+def _resolve_window_file(hwnd, window_title, pid):
+    """Uncached detection for one window: browser history, cmdline, open handles, title"""
+    try:
         # Get process info
         try:
-            process = psutil.Process(pid)
-            app_name = process.name().lower()
+            info = processes.lookup(pid)
+            if info is None:
+                return None, None
+            process = processes.get_process(info)
+            app_name = info.name.lower()
             potential_paths = []
 
             # DEBUG: Un-comment this line if you want to see every window check in console
@@ -222,7 +194,7 @@ def get_active_window_file():
 
             # --- METHOD 1: Command Line Arguments (Most Reliable for Notepad, etc.) ---
             try:
-                cmdline = process.cmdline()
+                cmdline = info.cmdline
                 if cmdline:
                     # Skip the first argument (executable itself)
                     for arg in cmdline[1:]:
@@ -303,16 +275,26 @@ def log_file_activity(file_path, app_name, duration=None):
             time_diff = (current_time - last_time).total_seconds()
             
             if time_diff < 300:  # 5 minutes
-                # Update existing entry's duration
+                # Update existing entry's duration (single-row write)
                 last_entry['duration_seconds'] = int(time_diff)
-                save_activity_log()
+                try:
+                    get_store().update_duration(last_entry)
+                except Exception as e:
+                    print(f"Error saving file activity log: {e}")
+                index_duration(last_entry)
                 return
     
     # Add new entry
     file_activity_log.append(entry)
     
-    # FIXED: Save immediately after adding new entry
-    save_activity_log()
+    # Persist immediately (append-only, no full rewrite)
+    try:
+        get_store().append(entry)
+    except Exception as e:
+        print(f"Error saving file activity log: {e}")
+    
+    # Keep the finder's search index current without a rebuild
+    index_entry(entry)
     
     print(f"📁 Tracked: {entry['file_name']} ({app_name})")
 
@@ -323,11 +305,6 @@ def track_files():
     
     print("👁️ File tracking started...")
     
-    # Ensure log file exists at start
-    if not os.path.exists(FILE_ACTIVITY_LOG):
-        print("[DEBUG] Creating initial JSON log file...")
-        save_activity_log()
-    
     while tracking_active:
         try:
             # Get currently active file
@@ -445,18 +422,22 @@ def cleanup_old_logs(days=30):
     global file_activity_log
     
     cutoff_date = datetime.now() - timedelta(days=days)
-    original_count = len(file_activity_log)
     
     file_activity_log = [
         entry for entry in file_activity_log
         if datetime.strptime(entry['timestamp'], '%Y-%m-%d %H:%M:%S') > cutoff_date
     ]
     
-    removed_count = original_count - len(file_activity_log)
+    try:
+        cutoff_timestamp = cutoff_date.strftime('%Y-%m-%d %H:%M:%S')
+        removed_count = get_store().prune(cutoff_timestamp)
+        prune_index(cutoff_timestamp)
+    except Exception as e:
+        print(f"Error cleaning up file activity log: {e}")
+        removed_count = 0
     
     if removed_count > 0:
         print(f"🗑️ Cleaned up {removed_count} old file activity records")
-        save_activity_log()
 
 
 def format_file_activity_text(entries, limit=20):
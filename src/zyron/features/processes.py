@@ -0,0 +1,149 @@
+"""
+Process Snapshot Service for Zyron Desktop Assistant
+One shared walk of the process table for the activity monitor, focus mode, zombie reaper and file tracker
+"""
+
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from zyron.utils.settings import settings
+
+# name/exe/cmdline never change for a running process, so they are fetched once per (pid, create_time)
+ProcessInfo = namedtuple('ProcessInfo', ['pid', 'name', 'exe', 'cmdline', 'create_time', 'rss'])
+
+
+class ProcessSnapshot:
+    """Read-only view of the process table at one moment"""
+
+    def __init__(self, processes, taken_at):
+        self.processes = tuple(processes)
+        self.taken_at = taken_at
+        self.by_pid = MappingProxyType({p.pid: p for p in self.processes})
+
+    def __len__(self):
+        return len(self.processes)
+
+    def __iter__(self):
+        return iter(self.processes)
+
+    def get(self, pid):
+        return self.by_pid.get(pid)
+
+    def named(self, *names):
+        """Processes whose name is one of `names` (case-insensitive)"""
+        wanted = {n.lower() for n in names}
+        return [p for p in self.processes if p.name and p.name.lower() in wanted]
+
+    def any_named(self, *names):
+        return bool(self.named(*names))
+
+
+class ProcessSnapshotService:
+    """
+    Refreshes the process table at most every `interval` seconds, on demand; idle means no walking.
+
+    A refresh is one psutil.process_iter() pass, which reuses its own Process objects and reads
+    create_time and memory together (oneshot) for each process. name/exe/cmdline are only
+    fetched for processes that are new since the last refresh, keyed by (pid, create_time):
+    a reused pid gets a new create_time and therefore a fresh entry.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = settings.PROCESS_SNAPSHOT_INTERVAL if interval is None else interval
+        self._procs = {}         # (pid, create_time) -> psutil.Process
+        self._static = {}        # (pid, create_time) -> (name, exe, cmdline)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def snapshot(self, max_age=None):
+        """Current snapshot, refreshed when older than max_age (default: the service interval)"""
+        max_age = self.interval if max_age is None else max_age
+        with self._lock:
+            if self._snapshot is None or time.time() - self._snapshot.taken_at >= max_age:
+                self._snapshot = self._refresh()
+            return self._snapshot
+
+    def _refresh(self):
+        infos = []
+        alive = {}
+        static = {}
+        # Exited processes are skipped by process_iter; denied attributes come back as None
+        for proc in psutil.process_iter(['create_time', 'memory_info']):
+            create_time = proc.info['create_time']
+            if create_time is None:
+                continue
+            key = (proc.pid, create_time)
+            if key in self._static:
+                name, exe, cmdline = self._static[key]
+            else:
+                try:
+                    name, exe, cmdline = self._fetch_static(proc)
+                except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                    continue
+            memory = proc.info['memory_info']
+            alive[key] = self._procs.get(key, proc)
+            static[key] = (name, exe, cmdline)
+            infos.append(ProcessInfo(proc.pid, name, exe, cmdline, create_time, memory.rss if memory else 0))
+
+        # Drop processes that exited since the last refresh
+        self._procs = alive
+        self._static = static
+        self.refreshes += 1
+        return ProcessSnapshot(infos, time.time())
+
+    @staticmethod
+    def _fetch_static(proc):
+        with proc.oneshot():
+            name = proc.name()
+            try:
+                exe = proc.exe()
+            except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                exe = None
+            try:
+                cmdline = tuple(proc.cmdline())
+            except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                cmdline = None
+        return name, exe, cmdline
+
+    def process(self, info):
+        """The cached psutil.Process behind a ProcessInfo (for kill/terminate/open_files)"""
+        with self._lock:
+            proc = self._procs.get((info.pid, info.create_time))
+        return proc if proc is not None else psutil.Process(info.pid)
+
+    def lookup(self, pid):
+        """ProcessInfo for pid; processes started after the last refresh are looked up directly"""
+        info = self.snapshot().get(pid)
+        if info is not None:
+            return info
+        try:
+            proc = psutil.Process(pid)
+            key = (pid, proc.create_time())
+            name, exe, cmdline = self._fetch_static(proc)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            return None
+        with self._lock:
+            # Reused by the next refresh instead of being fetched again
+            self._procs.setdefault(key, proc)
+            self._static.setdefault(key, (name, exe, cmdline))
+        return ProcessInfo(pid, name, exe, cmdline, key[1], 0)
+
+
+process_snapshots = ProcessSnapshotService()
+
+
+def snapshot(max_age=None):
+    return process_snapshots.snapshot(max_age)
+
+
+def lookup(pid):
+    return process_snapshots.lookup(pid)
+
+
+def get_process(info):
+    return process_snapshots.process(info)
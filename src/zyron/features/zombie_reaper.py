@@ -9,6 +9,7 @@ import threading
 import json
 import os
 from datetime import datetime
+import zyron.features.processes as processes
 try:
     import win32gui
     import win32process
@@ -58,11 +59,8 @@ def get_foreground_process_name():
         hwnd = win32gui.GetForegroundWindow()
         if not hwnd: return None
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        try:
-            proc = psutil.Process(pid)
-            return proc.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return None
+        proc = processes.lookup(pid)
+        return proc.name if proc else None
     except Exception:
         return None
 
@@ -101,13 +99,12 @@ def get_zombies():
     # Update current app activity
     track_foreground_window()
     
-    # Scan all processes
-    for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+    # Scan all processes (shared snapshot, no walk of our own)
+    for proc in processes.snapshot():
         try:
-            pinfo = proc.info
-            name = pinfo['name']
-            pid = pinfo['pid']
-            mem_mb = pinfo['memory_info'].rss / (1024 * 1024)
+            name = proc.name
+            pid = proc.pid
+            mem_mb = proc.rss / (1024 * 1024)
             
             # Skip whitelisted or system apps
             if name.lower() in [x.lower() for x in whitelist]:
@@ -147,9 +144,9 @@ def reaper_loop(callback_func):
     
     # Initialize process timers
     start_time = time.time()
-    for proc in psutil.process_iter(['name']):
+    for proc in processes.snapshot():
         try:
-            name = proc.info['name']
+            name = proc.name
             if name:
                 last_active_timestamps[name.lower()] = start_time
         except: pass
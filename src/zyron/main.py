@@ -1,52 +1,107 @@
+import sys
 import time
-from .core.voice import listen_for_command, take_user_input, speak
-from .core.brain import process_command
-from .agents.system import execute_command
+import argparse
+import itertools
 from .utils.ui import print_header, print_status, print_command, print_zyron, print_error, Colors
 from .utils.env_check import check_dependencies
+from .utils import lazy
 
-# Import file tracker - it will auto-start when imported
-import zyron.features.files.tracker as file_tracker
+# Everything heavy (models, the voice stack, system agents) is imported inside main(), after the
+# arguments and dependencies are checked, so `zyron --help` returns right away
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="zyron", description="Zyron Desktop Assistant: say 'Hey Pikachu' and give a command.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each import and engine took to load "
+                             "(for a per-module breakdown run: python -X importtime -m zyron.main)")
+    return parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+def respond(response_text):
+    """Prints/speaks an action's result"""
+    from .core.voice import speak
+    if response_text and isinstance(response_text, str) and not response_text.endswith(".png"):
+        print_zyron(response_text)
+        if response_text != "Done.":
+            speak(response_text)
+    else:
+        print_status("✅", "System action completed.", Colors.GREEN)
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    
     # Final check before startup
     check_dependencies()
     
+    # Each import is timed for the startup report
+    voice = lazy.timed_import("zyron.core.voice")
+    brain = lazy.timed_import("zyron.core.brain")
+    models = lazy.timed_import("zyron.core.models")
+    speculative = lazy.timed_import("zyron.core.speculation")
+    system = lazy.timed_import("zyron.agents.system")
+    # The file tracker starts when imported
+    lazy.timed_import("zyron.features.files.tracker")
+    # Own the browser bridge, or go through the Telegram bot when it already owns it
+    lazy.timed_import("zyron.features.browser_control").start_bridge()
+    listen_for_command, take_user_input, speak, speech_latency_ms = (
+        voice.listen_for_command, voice.take_user_input, voice.speak, voice.speech_latency_ms)
+    stream_command, execute_command = brain.stream_command, system.execute_command
+    
+    # Load the models while the user is still saying the wake word
+    models.warm_up()
+    # The Vosk model, OpenCV and pyautogui load in the background too; whatever isn't
+    # ready yet when it's first needed is waited for there
+    warming = [voice.warm_up(), lazy.warm_up("pyautogui", "cv2")]
+    ready = time.perf_counter() - started
+    
     print_header()
     print_status("✅", "Voice Engine Ready (Offline/Online)", Colors.GREEN)
     print_status("👁️", "Clipboard Monitor Active", Colors.GREEN)
     print_status("📁", "File Tracker Active", Colors.GREEN)
+    if args.startup_report:
+        for thread in warming:
+            thread.join()
+        lazy.startup_report(total=ready)
     print_status("👂", "Say 'Hey Pikachu' to start...", Colors.CYAN)
     
+    # Read-only commands start on a stable partial transcript, before the speaker finishes
+    speculation = speculative.SpeculativeDispatcher(lambda command: execute_command([command]))
+    
     while True:
         if listen_for_command():
-            user_query = take_user_input()
+            user_query = take_user_input(on_hypothesis=speculation.consider)
+            confirmed = speculation.resolve(user_query)
+            
+            if user_query and confirmed is not None:
+                print_command(user_query)
+                print_status("⚡", "Executing (started while you were speaking)", Colors.GREEN)
+                respond(confirmed.result())
+                print_status("⏱️", f"End of speech to result: {speech_latency_ms():.0f} ms", Colors.BLUE)
             
-            if user_query:
+            elif user_query:
                 print_command(user_query)
                 
                 # 1. Think
                 print_status("🤔", "Analyzing intent...", Colors.YELLOW)
-                action_json = process_command(user_query)
+                # Actions arrive one by one while the model is still answering
+                actions = stream_command(user_query)
+                first_action = next(actions, None)
                 
-                if action_json:
+                if first_action:
+                    print_status("⏱️", f"End of speech to first action: {speech_latency_ms():.0f} ms", Colors.BLUE)
+                    
                     # [QUIET MODE CHECK]
-                    current_action = action_json[0].get("action")
+                    current_action = first_action.get("action")
                     if current_action == "web_research":
                         print_status("🔍", "Starting Quiet Research (Background Tab)...", Colors.BLUE)
                     else:
                         print_status("⚡", f"Executing: {current_action}", Colors.GREEN)
                     
                     # 2. Execute
-                    response_text = execute_command(action_json)
+                    response_text = execute_command(itertools.chain([first_action], actions))
                     
                     # 3. Respond
-                    if response_text and isinstance(response_text, str) and not response_text.endswith(".png"):
-                        print_zyron(response_text)
-                        if response_text != "Done.":
-                            speak(response_text)
-                    else:
-                        print_status("✅", "System action completed.", Colors.GREEN)
+                    respond(response_text)
                 else:
                     print_error("Failed to process command.")
                     speak("I'm sorry, my brain had a glitch.")
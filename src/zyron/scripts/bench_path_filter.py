@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: tracker.should_ignore_file before and after the compiled PathFilter.
+Run: python -m zyron.scripts.bench_path_filter
+"""
+
+import os
+import random
+import timeit
+
+from zyron.features.files.path_filter import PathFilter, IGNORE_PATHS, TRACKED_EXTENSIONS
+
+
+def legacy_should_ignore_file(file_path):
+    """The original implementation, kept here for comparison"""
+    if not file_path or not isinstance(file_path, str):
+        return True
+    for ignore_path in IGNORE_PATHS:
+        if ignore_path.lower() in file_path.lower():
+            return True
+    _, ext = os.path.splitext(file_path)
+    if ext.lower() not in TRACKED_EXTENSIONS:
+        return True
+    return False
+
+
+def sample_paths(count=5000, seed=7):
+    """Mix of what the tracker sees: cmdline args, open handles (DLLs, temp files), documents"""
+    rng = random.Random(seed)
+    folders = [
+        "C:\\Users\\Alex\\Documents\\Reports", "C:\\Users\\Alex\\Downloads",
+        "C:\\Users\\Alex\\AppData\\Local\\Temp\\chrome_1234", "C:\\Windows\\System32",
+        "C:\\Program Files\\Microsoft Office\\root", "D:\\Projects\\zyron\\node_modules\\left-pad",
+        "C:\\Users\\Alex\\Desktop", "D:\\Projects\\zyron\\src",
+    ]
+    names = ["Q3 Report.pdf", "notes.txt", "kernel32.dll", "budget.xlsx", "index.js",
+             "cache.tmp", "photo.jpg", "slides.pptx", "font.ttf", "data.json"]
+    return [f"{rng.choice(folders)}\\{rng.choice(names)}" for _ in range(count)]
+
+
+def main():
+    paths = sample_paths()
+    distinct = list(dict.fromkeys(paths))
+    compiled = PathFilter()
+    uncached = PathFilter(cache_size=0)
+
+    mismatches = sum(legacy_should_ignore_file(p) != compiled(p) for p in distinct)
+    print(f"Paths: {len(paths)} ({len(distinct)} distinct), verdict mismatches: {mismatches}")
+
+    runs = 20
+    cases = [
+        ("legacy (lower() per fragment, list scan)", lambda: [legacy_should_ignore_file(p) for p in paths]),
+        ("compiled (regex + frozenset, no cache)", lambda: [uncached._ignores(p) for p in paths]),
+        ("compiled + LRU (steady state)", lambda: [compiled(p) for p in paths]),
+    ]
+    baseline = None
+    for label, func in cases:
+        per_call = min(timeit.repeat(func, number=1, repeat=runs)) / len(paths) * 1e6
+        baseline = baseline or per_call
+        print(f"  {label:<42} {per_call:6.2f} µs/path  ({baseline / per_call:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
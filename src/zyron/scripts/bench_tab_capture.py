@@ -0,0 +1,113 @@
+"""
+Micro-benchmark: tab screenshot delivery, from the extension's encoded image to bytes in the
+Telegram handler, before (data URL -> zyron_tab_screenshot.png -> 500 ms polling) and after
+(base64 chunks -> host decode -> bytes frames over the browser bridge -> awaited future).
+The browser's own capture/encode time is not included; the extension reports it per capture.
+Run: python -m zyron.scripts.bench_tab_capture
+"""
+
+import os
+import json
+import base64
+import asyncio
+import secrets
+import tempfile
+import threading
+import time
+from statistics import median
+
+from zyron.core.browser_ipc import BrowserBridge, FakeBrowserHost
+
+# Random bytes don't compress, so these stand in for real encoded screenshots
+SIZES = [
+    ("PNG, 1920x1080 (old default)", 1_600_000),
+    ("JPEG q80, 1600 px wide", 220_000),
+    ("WebP q80, 1600 px wide", 150_000),
+]
+CHUNK_SIZE = 256 * 1024  # Same as CAPTURE_CHUNK_SIZE in background.js
+
+
+def legacy_delivery(image, shot_path):
+    """The old path: one data-URL message, decoded to a file, found by polling every 500 ms"""
+    started = time.perf_counter()
+    data_url = "data:image/png;base64," + base64.b64encode(image).decode()
+
+    def host():
+        message = json.loads(json.dumps({"action": "capture_result", "data": data_url}))
+        # Written aside and renamed, so the poller never reads a half-written file
+        with open(shot_path + '.part', 'wb') as f:
+            f.write(base64.b64decode(message["data"].split(",", 1)[1]))
+        os.replace(shot_path + '.part', shot_path)
+
+    threading.Thread(target=host).start()
+    for _ in range(10):
+        # The old handler's first check always came before the capture (800 ms settle),
+        # so the earliest it could see the file was one poll later
+        time.sleep(0.5)
+        if os.path.exists(shot_path):
+            with open(shot_path, 'rb') as f:
+                data = f.read()
+            os.remove(shot_path)
+            return data, time.perf_counter() - started
+    raise RuntimeError("legacy delivery timed out")
+
+
+def chunked_responder(image):
+    """What the extension + browser_host.py do: base64 chunks as JSON, decoded by the host"""
+    def respond(command):
+        encoded = base64.b64encode(image).decode()
+        total = max(1, -(-len(encoded) // CHUNK_SIZE))
+        chunks = []
+        for index in range(total):
+            message = json.loads(json.dumps({"action": "capture_chunk", "index": index, "total": total,
+                                             "data": encoded[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]}))
+            message["payload"] = base64.b64decode(message.pop("data"))
+            chunks.append(message)
+        chunks[0]["mime"] = "image/jpeg"
+        return chunks
+    return respond
+
+
+async def bridge_delivery(bridge, image):
+    started = time.perf_counter()
+    future = bridge.submit({"action": "capture_tab", "tabId": 1}, connect_timeout=0)
+    message = await asyncio.wait_for(asyncio.wrap_future(future), 10)
+    return message["image"], time.perf_counter() - started
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="zyron-bench-")
+    address = os.path.join(workdir, "bridge.sock") if os.name != 'nt' else rf'\\.\pipe\zyron-bench-{os.getpid()}'
+    authkey = secrets.token_bytes(32)
+    bridge = BrowserBridge(address=address, authkey=authkey)
+    bridge.start()
+    host = FakeBrowserHost(address=address, authkey=authkey).start()
+    bridge.send({"action": "ping"}, connect_timeout=5)
+
+    runs = 5
+    for label, size in SIZES:
+        image = secrets.token_bytes(size)
+        host.responder = chunked_responder(image)
+
+        legacy = []
+        for _ in range(runs):
+            data, elapsed = legacy_delivery(image, os.path.join(workdir, "zyron_tab_screenshot.png"))
+            assert data == image
+            legacy.append(elapsed)
+
+        bridged = []
+        for _ in range(runs):
+            data, elapsed = asyncio.run(bridge_delivery(bridge, image))
+            assert data == image
+            bridged.append(elapsed)
+
+        print(f"{label:<30} {size // 1024:5d} KB   file + polling {median(legacy) * 1000:7.1f} ms   "
+              f"bridge {median(bridged) * 1000:6.1f} ms  (median of {runs})")
+
+    host.stop()
+    bridge.close()
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: wake word detection replayed from WAV recordings, no microphone needed.
+Compares the old open-vocabulary recognizer on 500 ms blocks with keyword spotting
+(wake-word grammar, WAKE_WORD_BLOCK_MS blocks, detection on partial results).
+
+Recordings must be 16 kHz mono 16-bit PCM. Include one without the wake word to see the idle cost.
+Run: python -m zyron.scripts.bench_wake_word [--model model] say_pikachu.wav room_noise.wav ...
+"""
+
+import argparse
+import time
+
+from zyron.core.wake_word import WakeWordEngine, wav_blocks, COMMAND_BLOCKSIZE, SAMPLE_RATE
+
+
+def replay(engine, path, block_ms):
+    blocks = list(wav_blocks(path, block_ms))
+    audio_seconds = sum(len(b) for b in blocks) / 2 / SAMPLE_RATE
+    engine.detected_at = None
+    started = time.process_time()
+    text = engine.detect(iter(blocks))
+    cpu = time.process_time() - started
+    # How far into the recording the engine was when it fired (or the whole file when it didn't)
+    consumed = engine.detected_at if text else audio_seconds
+    return text, engine.detected_at, cpu / consumed * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--model", default="model")
+    args = parser.parse_args()
+
+    engines = [
+        ("open vocabulary, 500 ms", WakeWordEngine(args.model, keyword_spotting=False), COMMAND_BLOCKSIZE * 1000 // SAMPLE_RATE),
+    ]
+    keyword = WakeWordEngine(args.model, keyword_spotting=True)
+    engines.append((f"keyword spotting, {keyword.block_ms} ms", keyword, keyword.block_ms))
+
+    print()
+    for path in args.wavs:
+        print(path)
+        for label, engine, block_ms in engines:
+            text, detected_at, cpu_percent = replay(engine, path, block_ms)
+            when = f"detected at {detected_at:5.2f} s ('{text}')" if text else "no wake word"
+            print(f"  {label:<28} {when:<40} CPU {cpu_percent:5.1f}% of real time")
+
+
+if __name__ == "__main__":
+    main()
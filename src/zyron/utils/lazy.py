@@ -0,0 +1,123 @@
+"""
+Lazy Components for Zyron Desktop Assistant
+Heavy modules and engines (TTS, Vosk model, OpenCV, pyautogui) are built on first use or warmed
+in a background thread, so importing Zyron is cheap; load times are kept for the startup report
+"""
+
+import time
+import importlib
+import threading
+
+# name -> seconds spent importing/building it (startup report)
+timings = {}
+_timings_lock = threading.Lock()
+
+
+def record(name, seconds):
+    with _timings_lock:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def timed_import(module_name):
+    """importlib.import_module(), with the time it took recorded (0 when already imported)"""
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    record(module_name, time.perf_counter() - started)
+    return module
+
+
+class LazyComponent:
+    """
+    Builds its value with factory() on the first get(), once, even when several threads ask at
+    the same time (a later get() waits for a background warm-up instead of building twice).
+    A factory that fails is not retried: get() raises the same error from then on.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.seconds = None
+        self._value = None
+        self._error = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._build()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _build(self):
+        started = time.perf_counter()
+        try:
+            self._value = self.factory()
+        except Exception as e:
+            self._error = e
+            print(f"⚠️ {self.name} unavailable: {e}")
+        self.seconds = time.perf_counter() - started
+        record(self.name, self.seconds)
+        self._built = True
+
+    @property
+    def ready(self):
+        return self._built and self._error is None
+
+
+class LazyModule:
+    """
+    Stands in for `import name` at module level: the real import happens on first attribute
+    access (pyautogui.press(...), cv2.VideoCapture(...)), so call sites don't change.
+    """
+
+    def __init__(self, component):
+        self._component = component
+
+    def __getattr__(self, attribute):
+        return getattr(self._component.get(), attribute)
+
+
+components = {}
+
+
+def register(name, factory):
+    """Adds a component to the registry (see warm_up)"""
+    components[name] = LazyComponent(name, factory)
+    return components[name]
+
+
+def lazy_import(module_name):
+    """A LazyModule for module_name, registered under that name so it can be warmed up too"""
+    component = components.get(module_name) or register(module_name, lambda: importlib.import_module(module_name))
+    return LazyModule(component)
+
+
+def warm_up(*names):
+    """Builds the named components one after another in a background thread"""
+    def _warm():
+        for name in names:
+            try:
+                components[name].get()
+            except Exception:
+                pass  # Already reported; callers fall back when they get() it
+
+    thread = threading.Thread(target=_warm, daemon=True, name="component-warmup")
+    thread.start()
+    return thread
+
+
+def startup_report(total=None):
+    """Prints where startup time went, slowest first (background warm-ups included once done)"""
+    with _timings_lock:
+        entries = sorted(((seconds, name) for name, seconds in timings.items() if seconds >= 0.001), reverse=True)
+    print("⏱️ Startup report:")
+    for seconds, name in entries:
+        print(f"   {seconds * 1000:8.1f} ms  {name}")
+    pending = [name for name, component in components.items() if not component._built]
+    if pending:
+        print(f"   (still loading in the background: {', '.join(pending)})")
+    if total is not None:
+        print(f"   {total * 1000:8.1f} ms  until ready")
@@ -0,0 +1,127 @@
+"""
+Write-Behind Persistence for Zyron Desktop Assistant
+Batches JSON state saves off the caller's thread and writes them atomically
+"""
+
+import os
+import json
+import atexit
+import tempfile
+import threading
+import weakref
+
+from zyron.utils.settings import settings
+
+# Every live persister, so pending changes can be flushed on interpreter exit
+_persisters = weakref.WeakSet()
+
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON to a temp file next to `path`, fsync it, then os.replace() it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindPersister:
+    """
+    Marks a piece of JSON state dirty and writes it later from a timer thread.
+
+    Changes are merged for `delay` seconds (or until `max_pending` mutations pile up),
+    then `snapshot()` is called once and the result is written atomically.
+    `snapshot` must return a JSON-serializable copy that is safe to dump while the
+    owner keeps mutating its own state. `on_written` (optional) is called after each
+    successful write.
+    """
+
+    def __init__(self, path, snapshot, delay=None, max_pending=None, indent=2, on_written=None):
+        self.path = path
+        self.snapshot = snapshot
+        self.on_written = on_written
+        self.delay = settings.PERSIST_DELAY_SECONDS if delay is None else delay
+        self.max_pending = settings.PERSIST_MAX_PENDING if max_pending is None else max_pending
+        self.indent = indent
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._immediate = False  # A zero-delay flush is queued or running
+        _persisters.add(self)
+
+    def mark_dirty(self):
+        """Record a mutation; the write happens on a background timer"""
+        with self._lock:
+            self.pending += 1
+            if self.pending >= self.max_pending:
+                if not self._immediate:
+                    self._schedule(0)
+            elif self._timer is None:
+                self._schedule(self.delay)
+
+    def _schedule(self, delay):
+        # Caller holds self._lock
+        if self._timer is not None:
+            if delay > 0:
+                return
+            self._timer.cancel()
+        if delay <= 0:
+            self._immediate = True
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (no-op when nothing is dirty)"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = None
+                if not self.pending:
+                    self._immediate = False
+                    return
+                # Still counted as pending until the write has landed, so nobody takes the
+                # file on disk for current while it is being replaced
+                written = self.pending
+                # Mutations during the write don't queue another zero-delay flush; this one
+                # reschedules for them when it is done
+                self._immediate = True
+
+            try:
+                atomic_write_json(self.path, self.snapshot(), indent=self.indent)
+                with self._lock:
+                    self.pending -= written
+                    self._immediate = False
+                    if self.pending >= self.max_pending:
+                        self._schedule(0)
+                    elif self.pending and self._timer is None:
+                        self._schedule(self.delay)
+                if self.on_written:
+                    self.on_written()
+            except Exception as e:
+                print(f"Error saving {self.path}: {e}")
+                with self._lock:
+                    self._immediate = False
+                    # Still dirty: retry on the next window
+                    if self._timer is None:
+                        self._schedule(self.delay)
+
+
+def flush_all():
+    """Flush every live persister (registered with atexit)"""
+    for persister in list(_persisters):
+        persister.flush()
+
+
+atexit.register(flush_all)
@@ -7,6 +7,26 @@ load_dotenv()
 class Settings(BaseSettings):
     MEDIA_PATH: str = os.getenv("MEDIA_PATH", "saved_media")
     MODEL_NAME: str = os.getenv("MODEL_NAME", "qwen2.5-coder:7b")
+    INTENT_MODEL_NAME: str = os.getenv("INTENT_MODEL_NAME", "")
+    MODEL_KEEP_ALIVE: str = os.getenv("MODEL_KEEP_ALIVE", "10m")
+    MODEL_WARMUP: bool = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "604800"))
     OFFLINE_MODE: bool = os.getenv("OFFLINE_MODE", "false").lower() == "true"
+    FILE_LOG_BACKEND: str = os.getenv("FILE_LOG_BACKEND", "sqlite")
+    PERSIST_DELAY_SECONDS: float = float(os.getenv("PERSIST_DELAY_SECONDS", "2.0"))
+    PERSIST_MAX_PENDING: int = int(os.getenv("PERSIST_MAX_PENDING", "20"))
+    ACTIVITY_COLLECTOR_TIMEOUT: float = float(os.getenv("ACTIVITY_COLLECTOR_TIMEOUT", "3.0"))
+    PROCESS_SNAPSHOT_INTERVAL: float = float(os.getenv("PROCESS_SNAPSHOT_INTERVAL", "2.0"))
+    FILE_FILTER_IGNORE_PATHS: str = os.getenv("FILE_FILTER_IGNORE_PATHS", "")
+    FILE_FILTER_EXTENSIONS: str = os.getenv("FILE_FILTER_EXTENSIONS", "")
+    HISTORY_CACHE_TTL: float = float(os.getenv("HISTORY_CACHE_TTL", "2.0"))
+    TAB_CAPTURE_FORMAT: str = os.getenv("TAB_CAPTURE_FORMAT", "jpeg")
+    TAB_CAPTURE_QUALITY: int = int(os.getenv("TAB_CAPTURE_QUALITY", "80"))
+    TAB_CAPTURE_MAX_WIDTH: int = int(os.getenv("TAB_CAPTURE_MAX_WIDTH", "1600"))
+    WAKE_WORD_BLOCK_MS: int = int(os.getenv("WAKE_WORD_BLOCK_MS", "30"))
+    VAD_HANGOVER_MS: int = int(os.getenv("VAD_HANGOVER_MS", "700"))
+    VAD_START_TIMEOUT: float = float(os.getenv("VAD_START_TIMEOUT", "5.0"))
+    VAD_MAX_SECONDS: float = float(os.getenv("VAD_MAX_SECONDS", "10.0"))
 
 settings = Settings()
@@ -11,6 +11,7 @@ import zyron_linux.features.activity as activity_monitor  # Needed to format the
 import zyron_linux.features.clipboard as clipboard_monitor  # For clipboard history
 # import zyron_linux.features.files.tracker as file_tracker  # <--- NEW IMPORT: THIS STARTS THE FILE TRACKER AUTOMATICALLY
 import zyron_linux.features.focus_mode as focus_mode # <--- Feature #11: Focus Mode
+import zyron_linux.features.browser_control as browser_control
 
 load_dotenv()
 TOKEN = os.getenv("TELEGRAM_TOKEN")
@@ -689,9 +690,6 @@ Longitude: {location_data['longitude']}
             command = command_json.get("command") # close, mute
             query = command_json.get("query", "").lower()
             
-            # Helper to find targets
-            import zyron.features.browser_control as browser_control
-            
             # --- SMART MATCHING LOGIC ---
             # 1. Get all open tabs
             tabs = activity_monitor.get_firefox_tabs()
@@ -761,34 +759,17 @@ Longitude: {location_data['longitude']}
                     
                     elif command == "screenshot":
                         window_id = best_match.get('windowId')
-                        browser_control.capture_tab_with_window(tab_id, window_id)
-                        
                         loader = await update.message.reply_text("📸 Capturing tab...", reply_markup=get_main_keyboard())
-                        
-                        # Wait for file
-                        shot_path = os.path.join(os.environ.get('TEMP', ''), 'zyron_tab_screenshot.png')
-                        
-                        # Remove old file if exists to avoid sending stale one
-                        if os.path.exists(shot_path):
-                            try: os.remove(shot_path)
-                            except: pass
-                            
-                        # Poll for new file
-                        found = False
-                        for _ in range(10): # Wait up to 5 seconds
-                            if os.path.exists(shot_path):
-                                found = True
-                                break
-                            await asyncio.sleep(0.5)
-                        
-                        if found:
+                        # The image comes back over the browser bridge as bytes, no temp file to poll
+                        shot = await browser_control.capture_tab_async(tab_id, window_id)
+                        if shot.get("success"):
                             try:
-                                await update.message.reply_photo(photo=open(shot_path, 'rb'), caption=f"📸 **{best_match.get('title')}**")
+                                await update.message.reply_photo(photo=shot["image"], caption=f"📸 **{best_match.get('title')}**")
                                 await loader.delete()
                             except Exception as e:
                                 await loader.edit_text(f"❌ Upload Error: {e}")
                         else:
-                            await loader.edit_text("❌ Screenshot timeout. Native host didn't respond.")
+                            await loader.edit_text(f"❌ Screenshot failed: {shot.get('error')}")
                             
                 else:
                     await update.message.reply_text(f"❌ Found '**{best_match.get('title', 'Unknown')}**' but it has no ID. Reload extension.", reply_markup=get_main_keyboard())
@@ -816,6 +797,9 @@ if __name__ == "__main__":
         application.add_handler(CallbackQueryHandler(handle_clipboard_callback)) # NEW: Clipboard handler
         application.add_handler(MessageHandler(filters.TEXT | filters.COMMAND, handle_message))
         
+        # The bot owns the browser bridge (a voice assistant started later goes through it)
+        browser_control.start_bridge()
+        
         application.run_polling()
     except Exception as e:
         print(f"❌ Critical Error: {e}")
\ No newline at end of file
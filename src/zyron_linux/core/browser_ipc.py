@@ -0,0 +1,793 @@
+"""
+Browser IPC for Zyron Desktop Assistant
+Local socket channel between the assistant and the native messaging host (browser_host.py)
+
+The assistant listens on a Unix domain socket (a named pipe on Windows); the native host,
+started by the browser, connects to it and reconnects whenever the assistant restarts.
+Messages are JSON objects framed with a 4-byte length prefix (multiprocessing.connection's
+send_bytes/recv_bytes), and both ends prove they know a per-user key before talking. Other
+Zyron processes connect to the same address as clients and are relayed through the owner.
+
+Standard library only: browser_host.py imports this module and must start fast.
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import secrets
+import itertools
+import tempfile
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+HOST_MESSAGE_ACTIONS = ("navigation_result", "tab_created", "capture_error")
+TAB_MESSAGE_ACTIONS = ("tab_snapshot", "tab_event")
+
+# What the owning process sends back to the Zyron processes it relays for (see BrowserBridge)
+RELAY_MESSAGE_ACTIONS = HOST_MESSAGE_ACTIONS + ("capture_result", "relay_error", "host_disconnected")
+
+# Minimum seconds between two resync requests while a tab table is out of step
+RESYNC_INTERVAL = 2.0
+
+# Seconds the owning process keeps a relayed request open when the host never answers it
+RELAY_TIMEOUT = 60.0
+
+# Seconds between attempts to reach (or take over) the bridge while another process owns it
+ATTACH_RETRY_INTERVAL = 1.0
+
+# What a blocked recv raises once the peer hung up, or once close() ran on another thread
+# (multiprocessing drops the handle, so the read fails with TypeError)
+_CONNECTION_CLOSED = (EOFError, OSError, TypeError)
+
+_O_NOFOLLOW = getattr(os, 'O_NOFOLLOW', 0)
+_O_BINARY = getattr(os, 'O_BINARY', 0)
+
+
+def _user_tag():
+    try:
+        return str(os.getuid())
+    except AttributeError:
+        return (os.environ.get('USERNAME') or 'user').replace(' ', '_')
+
+
+def _check_private(info, path):
+    """Refuses a file or directory another user owns, or that group/others can access"""
+    if sys.platform == 'win32':
+        return  # TEMP is already per-user; st_uid/st_mode carry no ownership there
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} is not private to this user (owner {info.st_uid}, mode {oct(info.st_mode & 0o777)})")
+
+
+def _runtime_dir():
+    """
+    Where the socket and the key live: TEMP on Windows (already per-user), elsewhere
+    $XDG_RUNTIME_DIR/zyron or <tmp>/zyron-<uid>, created 0700. A shared /tmp is writable by
+    every local user, so a directory someone else owns or can enter is refused.
+    """
+    if sys.platform == 'win32':
+        return os.environ.get('TEMP') or tempfile.gettempdir()
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    path = os.path.join(base, 'zyron') if base else os.path.join(tempfile.gettempdir(), f'zyron-{_user_tag()}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    _check_private(info, path)
+    return path
+
+
+def ipc_address():
+    """Named pipe on Windows, Unix domain socket elsewhere (one per user)"""
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\zyron-browser-{_user_tag()}'
+    return os.path.join(_runtime_dir(), 'zyron-browser.sock')
+
+
+def ipc_family():
+    return 'AF_PIPE' if sys.platform == 'win32' else 'AF_UNIX'
+
+
+def ipc_listener_alive(address):
+    """True when some process is accepting connections on the Unix socket at address"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(0.5)
+    try:
+        probe.connect(address)
+        return True
+    except OSError:
+        return False  # Nobody listening: a socket file left over from a crashed run
+    finally:
+        probe.close()
+
+
+def ipc_authkey():
+    """
+    Shared secret for the connection handshake, created on first use. The file is created
+    exclusively (never through a symlink) and only trusted when it is ours and owner-only.
+    """
+    path = os.path.join(_runtime_dir(), 'zyron-browser.key')
+    for _ in range(20):
+        try:
+            fd = os.open(path, os.O_RDONLY | _O_NOFOLLOW | _O_BINARY)
+        except FileNotFoundError:
+            key = secrets.token_bytes(32)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _O_NOFOLLOW | _O_BINARY, 0o600)
+            except FileExistsError:
+                continue  # Another Zyron process created it first: use theirs
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+            return key
+        with os.fdopen(fd, 'rb') as f:
+            _check_private(os.fstat(f.fileno()), path)
+            key = f.read()
+        if len(key) >= 32:
+            return key
+        time.sleep(0.05)  # Just created by another process, still being written
+    raise PermissionError(f"{path} does not hold a usable key")
+
+
+def send_json(conn, message):
+    conn.send_bytes(json.dumps(message).encode('utf-8'))
+
+
+def recv_json(conn):
+    return json.loads(conn.recv_bytes().decode('utf-8'))
+
+
+def send_frame(conn, message, payload=None):
+    """A JSON message, optionally followed by a raw bytes frame (flagged with "binary")"""
+    if payload is None:
+        send_json(conn, message)
+        return
+    send_json(conn, {**message, "binary": len(payload)})
+    conn.send_bytes(payload)
+
+
+def recv_frame(conn):
+    """Counterpart of send_frame: the message, with any bytes frame under "payload" """
+    message = recv_json(conn)
+    if message.get("binary") is not None:
+        message["payload"] = conn.recv_bytes()
+    return message
+
+
+class TabTable:
+    """
+    In-memory copy of the browser's tabs, kept current from the extension's messages:
+
+        {"action": "tab_snapshot", "seq": n, "tabs": [...]}             full list
+        {"action": "tab_event", "seq": n, "type": "created"|"updated", "tab": {...}}
+        {"action": "tab_event", "seq": n, "type": "removed", "tabId": id}
+        {"action": "tab_event", "seq": n, "type": "activated", "tabId": id, "windowId": w}
+
+    Events must arrive with consecutive sequence numbers. apply() returns False when the table
+    has fallen out of step (a gap, or an event before any snapshot); the owner then asks for a
+    fresh snapshot, at most every RESYNC_INTERVAL seconds (see wants_resync).
+    """
+
+    def __init__(self):
+        self._tabs = {}  # tab id -> tab dict
+        self.seq = None  # None until the first snapshot
+        self._lock = threading.Lock()
+        self._resync_requested_at = 0.0
+
+    @property
+    def synced(self):
+        return self.seq is not None
+
+    def apply(self, message):
+        with self._lock:
+            if message.get("action") == "tab_snapshot":
+                self._tabs = {tab.get("id"): tab for tab in message.get("tabs", [])}
+                self.seq = message.get("seq", 0)
+                self._resync_requested_at = 0.0
+                return True
+            seq = message.get("seq")
+            if self.seq is None or seq is None:
+                return False
+            if seq <= self.seq:
+                return True  # Already covered by the snapshot
+            if seq != self.seq + 1:
+                self.seq = None  # Missed events: nothing in the table can be trusted
+                self._tabs = {}
+                return False
+            self.seq = seq
+            self._apply_event(message)
+            return True
+
+    def _apply_event(self, event):
+        kind = event.get("type")
+        if kind in ("created", "updated"):
+            tab = event.get("tab") or {}
+            self._tabs[tab.get("id")] = tab
+        elif kind == "removed":
+            self._tabs.pop(event.get("tabId"), None)
+        elif kind == "activated":
+            for tab_id, tab in self._tabs.items():
+                if tab.get("windowId") == event.get("windowId"):
+                    tab["active"] = tab_id == event.get("tabId")
+
+    def wants_resync(self):
+        """True (once per RESYNC_INTERVAL) while the table is out of step"""
+        with self._lock:
+            if self.seq is not None or time.time() - self._resync_requested_at < RESYNC_INTERVAL:
+                return False
+            self._resync_requested_at = time.time()
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._tabs = {}
+            self.seq = None
+
+    def tabs(self):
+        """Copies of the current tabs, or None when the table isn't synced"""
+        with self._lock:
+            if self.seq is None:
+                return None
+            return [dict(tab) for tab in self._tabs.values()]
+
+    def snapshot_message(self):
+        with self._lock:
+            return {"action": "tab_snapshot", "seq": self.seq, "tabs": list(self._tabs.values())}
+
+
+class BrowserBridge:
+    """
+    Assistant side: accepts the native host's connection, sends commands to it and collects
+    what it sends back; nothing is polled from disk.
+
+    request() tags each command with a requestId that the extension echoes in its reply, and
+    parks a Future for it in `_pending`. Replies resolve their own Future whatever order they
+    arrive in, so any number of commands (to different tabs, from different threads) can be
+    in flight at once, each with its own timeout.
+
+    `tabs` mirrors the host's tab table: a snapshot when the host connects, then deltas.
+
+    Tab screenshots arrive as capture_chunk messages, each followed by a raw bytes frame (the
+    host decodes the extension's base64); they are joined here and resolve the request's
+    Future as one capture_result with the image bytes.
+
+    Only one process owns the bridge (listens on the address). Any other Zyron process, e.g. the
+    voice assistant next to the Telegram bot, attach()es to the owner as a client: the owner
+    relays its commands through the host connection, sends the replies back under the client's
+    own request ids and forwards the tab table. Peers say which they are when they connect
+    ({"action": "hello", "role": "host"|"client"}). When the owner exits, an attached process
+    takes the bridge over and the host reconnects to it.
+    """
+
+    def __init__(self, address=None, authkey=None):
+        self._address = address
+        self._authkey = authkey
+        self._pending = {}  # requestId -> Future
+        self._captures = {}  # requestId -> chunks received so far
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.tabs = TabTable()
+        self._conn = None  # The native host, or the owning process while attached
+        self._connected = threading.Event()
+        self._send_lock = threading.Lock()
+        self._listener = None
+        self._thread = None
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self._clients = {}  # connection -> send lock, for each process attached to us
+        self._clients_lock = threading.Lock()
+        self._attached = False
+        self._attach_thread = None
+
+    @property
+    def address(self):
+        # Resolved on first use: importing browser_control creates nothing on disk
+        if self._address is None:
+            self._address = ipc_address()
+        return self._address
+
+    @property
+    def authkey(self):
+        if self._authkey is None:
+            self._authkey = ipc_authkey()
+        return self._authkey
+
+    def start(self):
+        """
+        Listen for the native host. Only one process can own the bridge, so nothing is taken
+        over: returns False when another Zyron process is already listening on the address
+        (use attach() to go through it), True otherwise.
+        """
+        with self._start_lock:
+            if self._listener is not None:
+                return True
+            if ipc_family() == 'AF_UNIX' and os.path.exists(self.address):
+                if ipc_listener_alive(self.address):
+                    return False
+                os.remove(self.address)  # Left over from a run that crashed
+            try:
+                self._listener = Listener(self.address, family=ipc_family(), authkey=self.authkey)
+            except PermissionError:
+                # Named pipes are created first-instance-only: another process owns this one
+                if ipc_family() == 'AF_PIPE':
+                    return False
+                raise
+            self._closed = False
+            self._thread = threading.Thread(target=self._accept_loop, daemon=True, name="browser-bridge")
+            self._thread.start()
+            return True
+
+    def attach(self):
+        """
+        Reach the browser through the process that owns the bridge (start() returned False).
+        Connects in the background and keeps reconnecting; takes the bridge over once the
+        owner is gone.
+        """
+        with self._start_lock:
+            if self._attach_thread is not None:
+                return
+            self._closed = False
+            self._attach_thread = threading.Thread(target=self._attach_loop, daemon=True, name="browser-bridge-client")
+            self._attach_thread.start()
+
+    @property
+    def listening(self):
+        return self._listener is not None and not self._closed
+
+    @property
+    def attached(self):
+        """True while commands go through the process that owns the bridge"""
+        return self._attached
+
+    def _attach_loop(self):
+        while not self._closed:
+            try:
+                conn = Client(self.address, family=ipc_family(), authkey=self.authkey)
+                send_json(conn, {"action": "hello", "role": "client"})
+            except AuthenticationError as e:
+                print(f"⚠️ Browser bridge refused this process: {e}")
+                time.sleep(ATTACH_RETRY_INTERVAL)
+                continue
+            except (OSError, EOFError):
+                # The owner exited (or is restarting): take the bridge if nobody holds it now
+                try:
+                    if self.start():
+                        print("🔌 Browser bridge taken over from the Zyron process that owned it")
+                        return
+                except OSError as e:
+                    print(f"⚠️ Browser bridge unavailable: {e}")
+                time.sleep(ATTACH_RETRY_INTERVAL)
+                continue
+            self._conn = conn
+            self._attached = True
+            self._connected.set()
+            print("🔌 Attached to the browser bridge of another Zyron process")
+            self._read_loop(conn)
+            self._attached = False
+
+    def _accept_loop(self):
+        listener = self._listener
+        while True:
+            try:
+                conn = listener.accept()
+            except (EOFError, OSError):
+                if self._closed:
+                    return
+                continue  # The peer hung up mid-handshake (e.g. ipc_listener_alive() probing)
+            except Exception as e:
+                print(f"⚠️ Browser host handshake failed: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True, name="browser-bridge-peer").start()
+
+    def _serve(self, conn):
+        """Tells the native host and attached Zyron processes apart by their hello"""
+        try:
+            hello = recv_json(conn)
+        except (EOFError, OSError, ValueError):
+            conn.close()
+            return
+        role = hello.get("role")
+        if role == "client":
+            self._serve_client(conn)
+            return
+        if role != "host":
+            conn.close()
+            return
+        # The newest host wins (the browser restarted it)
+        old, self._conn = self._conn, conn
+        if old is not None:
+            old.close()
+        self._connected.set()
+        print("🔌 Browser host connected")
+        self._read_loop(conn)
+
+    def _read_loop(self, conn):
+        while True:
+            try:
+                message = recv_frame(conn)
+            except _CONNECTION_CLOSED:
+                break
+            except ValueError:
+                continue
+            self.handle_message(message)
+        if self._conn is conn:
+            self._conn = None
+            self._connected.clear()
+            if self._attached:
+                print("🔌 Lost the Zyron process that owns the browser bridge")
+            else:
+                print("🔌 Browser host disconnected")
+                self._broadcast({"action": "host_disconnected"})
+            # The browser is gone (or restarting): its tabs are no longer known
+            self.tabs.clear()
+            # Replies to commands sent through this host will never come
+            self._fail_pending("Browser host disconnected")
+
+    def handle_message(self, message):
+        action = message.get("action")
+        if action == "capture_chunk":
+            self._add_capture_chunk(message)
+            return
+        if action in TAB_MESSAGE_ACTIONS:
+            if self.tabs.apply(message):
+                self._broadcast(message)
+            elif self.tabs.wants_resync():
+                self.send({"action": "resync_tabs"}, connect_timeout=0)
+            return
+        if action == "host_disconnected":
+            self.tabs.clear()  # Relayed: the owner's browser went away
+            return
+        if action not in RELAY_MESSAGE_ACTIONS:
+            return
+        if action == "capture_result":
+            message["image"] = message.pop("payload", b"")  # Relayed: the image is the bytes frame
+        with self._pending_lock:
+            future = self._pending.pop(message.get("requestId"), None)
+        # No Future: a late reply to a request that already timed out
+        if future is None or future.done():
+            return
+        if action == "relay_error":
+            future.set_exception(ConnectionError(message.get("error", "Browser command failed")))
+        else:
+            future.set_result(message)
+
+    def _add_capture_chunk(self, chunk):
+        request_id = chunk.get("requestId")
+        total = chunk.get("total", 1)
+        with self._pending_lock:
+            if request_id not in self._pending:
+                return  # The caller gave up
+            capture = self._captures.setdefault(request_id, {"parts": {}, "first_at": time.perf_counter()})
+            capture["parts"][chunk.get("index", 0)] = chunk.pop("payload", b"")
+            if chunk.get("index", 0) == 0:
+                capture["meta"] = chunk  # mime, size and the extension's timings ride on the first chunk
+            if len(capture["parts"]) < total:
+                return
+            del self._captures[request_id]
+            future = self._pending.pop(request_id)
+        meta = capture.get("meta", {})
+        timings = dict(meta.get("timings") or {})
+        timings["transferMs"] = round((time.perf_counter() - capture["first_at"]) * 1000, 1)
+        if not future.done():
+            future.set_result({
+                "action": "capture_result",
+                "requestId": request_id,
+                "image": b"".join(capture["parts"][i] for i in range(total)),
+                "mime": meta.get("mime"),
+                "width": meta.get("width"),
+                "height": meta.get("height"),
+                "timings": timings,
+            })
+
+    # --- Relaying for attached processes (owner side) ---
+
+    def _serve_client(self, conn):
+        with self._clients_lock:
+            self._clients[conn] = threading.Lock()
+        if self.tabs.synced:
+            self._send_to_client(conn, self.tabs.snapshot_message())
+        try:
+            while True:
+                try:
+                    command = recv_json(conn)
+                except ValueError:
+                    continue
+                self._relay(conn, command)
+        except _CONNECTION_CLOSED:
+            pass
+        finally:
+            with self._clients_lock:
+                self._clients.pop(conn, None)
+            conn.close()
+
+    def _relay(self, conn, command):
+        request_id = command.pop("requestId", None)
+        if command.get("action") == "resync_tabs" and self.tabs.synced:
+            self._send_to_client(conn, self.tabs.snapshot_message())
+            return
+        if request_id is None:
+            self.send(command)
+            return
+        future = self.submit(command)
+        # A host that never answers must not keep the request here forever
+        timer = threading.Timer(RELAY_TIMEOUT, future.cancel)
+        timer.daemon = True
+        timer.start()
+
+        def reply(done):
+            timer.cancel()
+            if done.cancelled():
+                message = {"action": "relay_error", "error": "No reply from the browser host"}
+            elif done.exception() is not None:
+                message = {"action": "relay_error", "error": str(done.exception())}
+            else:
+                message = dict(done.result())
+            message["requestId"] = request_id
+            self._send_to_client(conn, message, message.pop("image", None))
+
+        future.add_done_callback(reply)
+
+    def _send_to_client(self, conn, message, payload=None):
+        with self._clients_lock:
+            lock = self._clients.get(conn)
+        if lock is None:
+            return
+        with lock:
+            try:
+                send_frame(conn, message, payload)
+            except OSError:
+                pass  # Gone: its serving thread cleans up
+
+    def _broadcast(self, message):
+        with self._clients_lock:
+            clients = list(self._clients)
+        for conn in clients:
+            self._send_to_client(conn, message)
+
+    def _forget(self, request_id):
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+            self._captures.pop(request_id, None)
+
+    def _fail_pending(self, error):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._captures = {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(error))
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def unavailable_reason(self):
+        """Why a command can't be delivered right now (for error messages)"""
+        if self.listening:
+            return "Browser host not connected"
+        if self._attach_thread is not None:
+            return "Zyron process owning the browser bridge not reachable"
+        return "Browser bridge not running in this process"
+
+    def send(self, command, connect_timeout=2.0):
+        """Deliver a command to the host; False when no host connects within connect_timeout"""
+        if not self.listening and self._attach_thread is None:
+            return False  # Neither started nor attached
+        if not self._connected.wait(connect_timeout):
+            return False
+        with self._send_lock:
+            conn = self._conn
+            if conn is None:
+                return False
+            try:
+                send_json(conn, command)
+                return True
+            except OSError:
+                return False
+
+    def submit(self, command, connect_timeout=2.0):
+        """
+        Send a command tagged with a new requestId and return the Future its reply will resolve.
+        The Future fails with ConnectionError when the host is missing or goes away; cancel it
+        (asyncio.wrap_future does so on timeout) to stop waiting.
+        """
+        request_id = next(self._ids)
+        future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+        future.add_done_callback(lambda _: self._forget(request_id))
+        if not self.send({**command, "requestId": request_id}, connect_timeout=connect_timeout):
+            future.set_exception(ConnectionError(self.unavailable_reason()))
+        return future
+
+    def request(self, command, timeout=10.0):
+        """
+        Send a command and wait up to `timeout` seconds for its reply (the host's message dict).
+        Raises TimeoutError when no reply arrives and ConnectionError when the host is missing
+        or goes away.
+        """
+        future = self.submit(command)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"No reply to {command.get('action')} within {timeout}s") from None
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    def close(self):
+        self._closed = True
+        self._fail_pending("Browser bridge closed")
+        with self._clients_lock:
+            clients, self._clients = list(self._clients), {}
+        for conn in clients:
+            conn.close()
+        if self._conn is not None:
+            self._conn.close()
+        if self._listener is not None:
+            # Also removes the socket file; never touched when another process owns it
+            self._listener.close()
+            self._listener = None
+
+
+class HostLink:
+    """
+    Native host side: keeps a connection to the assistant (retrying while it isn't running),
+    hands every received command to on_command and forwards messages back with send().
+    on_connect runs after each (re)connection, e.g. to send the current tab table.
+    """
+
+    def __init__(self, on_command, address=None, authkey=None, retry_interval=1.0, on_connect=None):
+        self.on_command = on_command
+        self.on_connect = on_connect
+        self.address = address or ipc_address()
+        self.authkey = authkey
+        self.retry_interval = retry_interval
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, daemon=True, name="host-link")
+        thread.start()
+        return thread
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                conn = Client(self.address, family=ipc_family(), authkey=self.authkey or ipc_authkey())
+            except (OSError, EOFError):
+                # Assistant not running (yet)
+                self._stopped.wait(self.retry_interval)
+                continue
+            self._conn = conn
+            try:
+                send_json(conn, {"action": "hello", "role": "host"})
+                if self.on_connect is not None:
+                    self.on_connect()
+                while not self._stopped.is_set():
+                    self.on_command(recv_json(conn))
+            except _CONNECTION_CLOSED + (ValueError,):
+                pass
+            finally:
+                self._conn = None
+                conn.close()
+
+    def send(self, message, payload=None):
+        """Forward a message (plus optional raw bytes) to the assistant; False while disconnected"""
+        with self._send_lock:
+            conn = self._conn
+            if conn is None:
+                return False
+            try:
+                send_frame(conn, message, payload)
+                return True
+            except OSError:
+                return False
+
+    def stop(self):
+        self._stopped.set()
+        conn = self._conn
+        if conn is None:
+            return
+        if ipc_family() == 'AF_UNIX':
+            # close() alone doesn't wake the reader blocked on this socket, so the assistant
+            # wouldn't see the disconnect; shutdown() ends the connection for both sides
+            with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        conn.close()
+
+
+class FakeBrowserHost:
+    """
+    In-process stand-in for browser_host.py + the extension, for exercising browser_control
+    without a browser (works on Linux and Windows alike):
+
+        host = FakeBrowserHost(address=..., authkey=...).start()
+        browser_control.read_page()   # answered by host.respond()
+
+    respond(command) returns the extension's reply dict, a list of them (capture chunks, whose
+    "payload" is sent as a bytes frame) or None for fire-and-forget commands; override it or pass `responder` to script other answers. `delay` (seconds,
+    or a function of the command) holds each reply back without blocking the next command.
+    """
+
+    def __init__(self, responder=None, address=None, authkey=None, delay=0.0, tabs=None,
+                 image=None, chunk_size=192 * 1024):
+        self.responder = responder
+        self.image = image if image is not None else b"\xff\xd8\xff\xe0" + secrets.token_bytes(150_000)
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.received = []
+        self.tabs = {tab["id"]: tab for tab in (tabs or [])}
+        self.tab_seq = 0
+        self.link = HostLink(self._on_command, address=address, authkey=authkey, retry_interval=0.05,
+                             on_connect=self.send_tab_snapshot)
+
+    def start(self):
+        self.link.start()
+        return self
+
+    def stop(self):
+        self.link.stop()
+
+    def send_tab_snapshot(self):
+        self.link.send({"action": "tab_snapshot", "seq": self.tab_seq, "tabs": list(self.tabs.values())})
+
+    def tab_event(self, kind, skip_seq=False, **payload):
+        """Apply and send a created/updated/removed event (skip_seq=True simulates a lost event)"""
+        if kind in ("created", "updated"):
+            self.tabs[payload["tab"]["id"]] = payload["tab"]
+        elif kind == "removed":
+            self.tabs.pop(payload["tabId"], None)
+        elif kind == "activated":
+            for tab in self.tabs.values():
+                if tab.get("windowId") == payload["windowId"]:
+                    tab["active"] = tab["id"] == payload["tabId"]
+        self.tab_seq += 2 if skip_seq else 1
+        self.link.send({"action": "tab_event", "type": kind, "seq": self.tab_seq, **payload})
+
+    def respond(self, command):
+        action = command.get("action")
+        if action == "resync_tabs":
+            self.send_tab_snapshot()
+            return None
+        if action == "create_tab":
+            return {"action": "tab_created", "tabId": 1000 + len(self.received)}
+        if action == "capture_tab":
+            # What browser_host.py forwards: chunks with the decoded bytes attached
+            parts = [self.image[i:i + self.chunk_size] for i in range(0, len(self.image), self.chunk_size)] or [b""]
+            chunks = [{"action": "capture_chunk", "index": i, "total": len(parts), "payload": part}
+                      for i, part in enumerate(parts)]
+            chunks[0].update(mime="image/jpeg", timings={"captureMs": 0, "encodeMs": 0})
+            return chunks
+        if action in ("read", "scan", "click", "type", "scroll", "press_key"):
+            return {"action": "navigation_result", "data": {"success": True, "action": action, "tabId": command.get("tabId")}}
+        return None
+
+    def _on_command(self, command):
+        self.received.append(command)
+        reply = (self.responder or self.respond)(command)
+        if reply is None:
+            return
+        replies = reply if isinstance(reply, list) else [reply]
+        for message in replies:
+            # Like background.js: echo the request id so the reply finds its caller
+            message.setdefault("requestId", command.get("requestId"))
+        if self.delay:
+            # Answer from another thread so replies can overlap and arrive out of order
+            delay = self.delay(command) if callable(self.delay) else self.delay
+            threading.Timer(delay, self._send_all, args=(replies,)).start()
+        else:
+            self._send_all(replies)
+
+    def _send_all(self, messages):
+        for message in messages:
+            self.link.send(message, message.pop("payload", None))
@@ -10,6 +10,7 @@ import json
 import os
 import ctypes  # Added for Windows API access
 from datetime import datetime
+from zyron_linux.utils.persistence import WriteBehindPersister
 
 # File to store clipboard history
 CLIPBOARD_HISTORY_FILE = "clipboard_history.json"
@@ -21,6 +22,9 @@ last_clipboard_content = ""
 monitoring_active = False
 monitor_thread = None
 
+# Saves are batched and written atomically off the monitor thread
+history_persister = WriteBehindPersister(CLIPBOARD_HISTORY_FILE, lambda: list(clipboard_history))
+
 
 def load_clipboard_history():
     """Load clipboard history from file"""
@@ -39,12 +43,8 @@ def load_clipboard_history():
 
 
 def save_clipboard_history():
-    """Save clipboard history to file"""
-    try:
-        with open(CLIPBOARD_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(clipboard_history, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving clipboard history: {e}")
+    """Schedule a write-behind save of clipboard history"""
+    history_persister.mark_dirty()
 
 
 def add_to_history(text):
@@ -153,6 +153,7 @@ def stop_monitoring():
     global monitoring_active
     
     monitoring_active = False
+    history_persister.flush()
     print("🛑 Clipboard monitoring deactivated")
 
 
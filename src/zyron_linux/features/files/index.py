@@ -0,0 +1,317 @@
+"""
+File Search Index for Zyron Desktop Assistant
+Inverted index over the file activity log, built once and kept up to date as the tracker logs files
+"""
+
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from zyron_linux.features.files.store import get_store
+from zyron_linux.features.files.path_filter import get_path_filter
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Keywords up to this long are fuzzy-matched against every name: two typos can already break
+# all of their trigrams, so the trigram candidates would miss close matches
+FULL_SCAN_KEYWORD_LENGTH = 6
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def parse_epoch(timestamp):
+    """'%Y-%m-%d %H:%M:%S' -> epoch seconds (local time); much cheaper than strptime for bulk builds"""
+    try:
+        return datetime(int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                        int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19])).timestamp()
+    except (ValueError, TypeError):
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a file name ('Q3_Report-final.pdf' -> q3, report, final, pdf)"""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def trigrams(text):
+    """Character trigrams of an already lowercased string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Column:
+    """Append-only NumPy array with amortized growth; view() is the filled part"""
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self._data):
+            grown = np.zeros(len(self._data) * 2, dtype=self._data.dtype)
+            grown[:self.size] = self._data
+            self._data = grown
+        self._data[self.size] = value
+        self.size += 1
+
+    @classmethod
+    def from_array(cls, values):
+        column = cls(values.dtype, max(len(values), 1024))
+        column._data[:len(values)] = values
+        column.size = len(values)
+        return column
+
+    def __setitem__(self, pos, value):
+        self._data[pos] = value
+
+    def view(self):
+        return self._data[:self.size]
+
+
+class FileSearchIndex:
+    """
+    Posting lists and numeric columns over the activity log, so a query only touches candidate rows.
+
+    Rows are numbered in log order. Each row has an epoch-second timestamp, a duration and
+    interned name/type/app codes stored in NumPy columns, so scoring runs vectorized.
+    File names are interned (many rows share one name) and the token/trigram postings point
+    at name ids, so keyword matching runs once per distinct name instead of once per row.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.entries = []          # row -> entry dict (shared with the store/tracker)
+        self.epochs = _Column(np.float64)
+        self.durations = _Column(np.int64)
+        self.name_codes = _Column(np.int32)
+        self.type_codes = _Column(np.int32)
+        self.app_codes = _Column(np.int32)
+        self.names = []            # name id -> lowercase file name
+        self.types = []            # type code -> file type
+        self.apps = []             # app code -> lowercase app name
+        self._name_ids = {}
+        self._type_ids = {}
+        self._app_ids = {}
+        self._rows_by_id = {}      # store id -> row (sqlite backend only)
+        self._rows_by_obj = {}     # id(entry) -> row
+        # Rows sorted by time (and their epochs); kept in step on in-order appends, re-sorted lazily otherwise
+        self._order = _Column(np.int64)
+        self._sorted_epochs = _Column(np.float64)
+        self._order_dirty = False
+        self.token_postings = defaultdict(set)    # token -> name ids
+        self.trigram_postings = defaultdict(set)  # trigram -> name ids
+
+    def __len__(self):
+        return len(self.entries)
+
+    def build(self, entries):
+        """(Re)build the whole index from a list of entries"""
+        with self.lock:
+            self._reset()
+            for entry in entries:
+                self.add(entry)
+
+    @staticmethod
+    def _intern(value, ids, values):
+        code = ids.get(value)
+        if code is None:
+            code = len(values)
+            ids[value] = code
+            values.append(value)
+        return code
+
+    def add(self, entry):
+        """Index one newly logged entry"""
+        try:
+            epoch = parse_epoch(entry['timestamp'])
+            name = entry['file_name'].lower()
+        except (KeyError, TypeError, ValueError):
+            return  # Unparseable rows can never score, skip them
+        if get_path_filter()(entry.get('file_path')):
+            return  # Logged before the current ignore rules; never offer it as a search result
+
+        with self.lock:
+            # Already indexed (the entry was appended while the index was being built)
+            if entry.get('id') is not None and entry['id'] in self._rows_by_id:
+                return
+            if id(entry) in self._rows_by_obj:
+                return
+
+            row = len(self.entries)
+            self.entries.append(entry)
+            self._rows_by_obj[id(entry)] = row
+            if entry.get('id') is not None:
+                self._rows_by_id[entry['id']] = row
+
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._intern(name, self._name_ids, self.names)
+                for token in tokenize(name):
+                    self.token_postings[token].add(name_id)
+                for gram in trigrams(name):
+                    self.trigram_postings[gram].add(name_id)
+
+            self.epochs.append(epoch)
+            self.durations.append(entry.get('duration_seconds') or 0)
+            self.name_codes.append(name_id)
+            self.type_codes.append(self._intern(entry.get('file_type', ''), self._type_ids, self.types))
+            self.app_codes.append(self._intern((entry.get('app_used') or '').lower(), self._app_ids, self.apps))
+
+            # The tracker logs in time order, so this is almost always an append
+            if self._order_dirty:
+                pass
+            elif not self._sorted_epochs.size or epoch >= self._sorted_epochs.view()[-1]:
+                self._order.append(row)
+                self._sorted_epochs.append(epoch)
+            else:
+                self._order_dirty = True
+
+    def update_duration(self, entry):
+        """Refresh the duration column after the tracker extends an entry"""
+        with self.lock:
+            row = self._rows_by_obj.get(id(entry))
+            if row is None:
+                row = self._rows_by_id.get(entry.get('id'))
+            if row is None:
+                return
+            duration = entry.get('duration_seconds') or 0
+            self.entries[row]['duration_seconds'] = duration
+            self.durations[row] = duration
+
+    def prune(self, cutoff_timestamp):
+        """Drop rows not newer than cutoff_timestamp (same rule as ActivityStore.prune)"""
+        with self.lock:
+            kept = [e for e in self.entries if e.get('timestamp', '') > cutoff_timestamp]
+            if len(kept) != len(self.entries):
+                self.build(kept)
+
+    # ---------------- Lookups ----------------
+
+    def time_order(self):
+        """Row numbers sorted by timestamp (oldest first)"""
+        with self.lock:
+            if self._order_dirty:
+                epochs = self.epochs.view()
+                order = np.argsort(epochs, kind='stable')
+                self._order = _Column.from_array(order.astype(np.int64))
+                self._sorted_epochs = _Column.from_array(epochs[order])
+                self._order_dirty = False
+            return self._order.view()
+
+    def rows_in_range(self, start_dt, end_dt):
+        """Rows with start_dt <= timestamp <= end_dt, oldest first"""
+        with self.lock:
+            order = self.time_order()
+            sorted_epochs = self._sorted_epochs.view()
+            lo = np.searchsorted(sorted_epochs, start_dt.timestamp(), side='left')
+            hi = np.searchsorted(sorted_epochs, end_dt.timestamp(), side='right')
+            return order[lo:hi]
+
+    def type_mask(self, file_types):
+        """Boolean lookup table over type codes"""
+        with self.lock:
+            return np.array([t in file_types for t in self.types], dtype=bool)
+
+    def app_mask(self, target_app):
+        """Boolean lookup table over app codes: app name contains target_app"""
+        with self.lock:
+            return np.array([target_app in app for app in self.apps], dtype=bool)
+
+    def rows_with_types(self, file_types):
+        with self.lock:
+            return np.flatnonzero(self.type_mask(file_types)[self.type_codes.view()])
+
+    def rows_with_app(self, target_app):
+        with self.lock:
+            return np.flatnonzero(self.app_mask(target_app)[self.app_codes.view()])
+
+    def names_with_token(self, token):
+        with self.lock:
+            return set(self.token_postings.get(token.lower(), ()))
+
+    def names_containing(self, keyword):
+        """Name ids whose file name contains keyword as a substring"""
+        keyword = keyword.lower()
+        with self.lock:
+            grams = trigrams(keyword)
+            if not grams:
+                return {nid for nid, name in enumerate(self.names) if keyword in name}
+            candidates = None
+            for gram in sorted(grams, key=lambda g: len(self.trigram_postings.get(g, ()))):
+                postings = self.trigram_postings.get(gram)
+                if not postings:
+                    return set()
+                candidates = set(postings) if candidates is None else candidates & postings
+                if not candidates:
+                    return set()
+            return {nid for nid in candidates if keyword in self.names[nid]}
+
+    def names_similar(self, keyword, threshold=0.6, exclude=()):
+        """
+        Name ids fuzzily matching keyword -> SequenceMatcher ratio (only ratios > threshold).
+        Short keywords are compared with every name, like a plain scan. Longer ones only with
+        names sharing at least one trigram: unlike a full scan, a name that differs from the
+        keyword every two or three characters (e.g. 'abcdef' vs 'abXcdXef') is not found.
+        """
+        keyword = keyword.lower()
+        with self.lock:
+            grams = trigrams(keyword)
+            if grams and len(keyword) > FULL_SCAN_KEYWORD_LENGTH:
+                candidates = set()
+                for gram in grams:
+                    candidates |= self.trigram_postings.get(gram, set())
+            else:
+                candidates = set(range(len(self.names)))
+
+            similar = {}
+            for nid in candidates:
+                if nid in exclude:
+                    continue
+                name = self.names[nid]
+                # ratio = 2*matches/(len_a+len_b) can't beat this bound, skip the expensive diff
+                if 2 * min(len(keyword), len(name)) / (len(keyword) + len(name)) <= threshold:
+                    continue
+                ratio = SequenceMatcher(None, keyword, name).ratio()
+                if ratio > threshold:
+                    similar[nid] = ratio
+            return similar
+
+
+def get_index():
+    """Shared index, built from the activity store on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = FileSearchIndex()
+            try:
+                index.build(get_store().load_entries())
+            except Exception as e:
+                print(f"Error building file search index: {e}")
+            _index = index
+        return _index
+
+
+def index_entry(entry):
+    """Called by the tracker after appending; a no-op until the index has been built"""
+    with _index_lock:
+        if _index is not None:
+            _index.add(entry)
+
+
+def index_duration(entry):
+    if _index is not None:
+        _index.update_duration(entry)
+
+
+def prune_index(cutoff_timestamp):
+    if _index is not None:
+        _index.prune(cutoff_timestamp)
@@ -0,0 +1,103 @@
+"""
+Path Filter for Zyron Desktop Assistant
+Compiled version of the tracker's ignore rules, shared by the tracker and the file search index
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from zyron_linux.utils.settings import settings
+
+# System/temp paths to ignore
+IGNORE_PATHS = [
+    "\\AppData\\Local\\Temp",
+    "\\Windows\\",
+    "\\System32\\",
+    "\\Program Files\\",
+    "\\ProgramData\\",
+    "\\$Recycle.Bin",
+    "\\.git",
+    "\\node_modules",
+    "\\venv\\",
+    "\\__pycache__",
+    "/.cache/",
+    "/.local/share/Trash",
+    "/.config/",
+    "/.mozilla/",
+    "/.git/",
+    "/node_modules/",
+    "/venv/",
+    "/__pycache__/",
+    "/tmp/",
+]
+
+# File extensions we care about
+TRACKED_EXTENSIONS = [
+    # Documents
+    '.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt',
+    # Spreadsheets
+    '.xlsx', '.xls', '.csv', '.ods',
+    # Presentations
+    '.pptx', '.ppt', '.odp',
+    # Images
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp',
+    # Videos
+    '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv',
+    # Audio
+    '.mp3', '.wav', '.flac', '.aac', '.ogg',
+    # Code
+    '.py', '.js', '.java', '.cpp', '.c', '.html', '.css', '.json', '.xml',
+    # Archives
+    '.zip', '.rar', '.7z', '.tar', '.gz',
+    # Others
+    '.exe', '.msi', '.apk', '.dmg'
+]
+
+
+def _split_setting(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class PathFilter:
+    """
+    ignores(path) -> True for paths the tracker should not log.
+
+    Same rules as the original should_ignore_file: a path is ignored if it contains any
+    ignored fragment (case-insensitive) or its extension isn't tracked. The fragments are
+    compiled into one regex, the extensions into a frozenset, and recent verdicts are
+    memoized (the tracker sees the same handful of paths every tick).
+    """
+
+    def __init__(self, ignore_fragments=IGNORE_PATHS, extensions=TRACKED_EXTENSIONS, cache_size=1024):
+        self.ignore_fragments = tuple(ignore_fragments)
+        self.extensions = frozenset(ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in extensions)
+        self._fragments = (re.compile('|'.join(re.escape(f) for f in self.ignore_fragments), re.IGNORECASE)
+                           if self.ignore_fragments else None)
+        self.ignores = lru_cache(maxsize=cache_size)(self._ignores)
+
+    def _ignores(self, file_path):
+        if not file_path or not isinstance(file_path, str):
+            return True
+        if self._fragments is not None and self._fragments.search(file_path):
+            return True
+        return os.path.splitext(file_path)[1].lower() not in self.extensions
+
+    def __call__(self, file_path):
+        try:
+            return self.ignores(file_path)
+        except TypeError:
+            # Unhashable input can't be a path
+            return True
+
+
+_path_filter = None
+
+
+def get_path_filter():
+    """Shared filter: the defaults above plus FILE_FILTER_IGNORE_PATHS / FILE_FILTER_EXTENSIONS from settings"""
+    global _path_filter
+    if _path_filter is None:
+        _path_filter = PathFilter(IGNORE_PATHS + _split_setting(settings.FILE_FILTER_IGNORE_PATHS),
+                                  TRACKED_EXTENSIONS + _split_setting(settings.FILE_FILTER_EXTENSIONS))
+    return _path_filter
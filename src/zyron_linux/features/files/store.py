@@ -0,0 +1,253 @@
+"""
+Activity Store Module for Zyron Desktop Assistant
+Storage backends for the file activity log written by the tracker and read by the finder
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+from zyron_linux.utils.settings import settings
+from zyron_linux.utils.persistence import WriteBehindPersister
+
+# Storage locations (relative to the working directory, like the other logs)
+FILE_ACTIVITY_LOG = "file_activity_log.json"
+FILE_ACTIVITY_DB = "file_activity_log.db"
+
+ENTRY_FIELDS = ('timestamp', 'file_path', 'file_name', 'file_type', 'app_used', 'duration_seconds')
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class ActivityStore(ABC):
+    """
+    Base interface for file activity storage backends.
+    Entries are plain dicts in the format produced by tracker.log_file_activity().
+    """
+
+    @abstractmethod
+    def load_entries(self):
+        """Return all stored entries, oldest first"""
+
+    @abstractmethod
+    def append(self, entry):
+        """Persist a newly logged entry"""
+
+    @abstractmethod
+    def update_duration(self, entry):
+        """Persist a changed 'duration_seconds' on an already stored entry"""
+
+    @abstractmethod
+    def prune(self, cutoff_timestamp):
+        """Remove entries not newer than cutoff_timestamp ('%Y-%m-%d %H:%M:%S'). Returns removed count"""
+
+    def flush(self):
+        """Make sure everything is on disk"""
+        pass
+
+    def close(self):
+        """Release any open handles"""
+        self.flush()
+
+
+class JsonActivityStore(ActivityStore):
+    """
+    Legacy backend: the whole log lives in one JSON file.
+    Rewrites are batched by a write-behind persister instead of happening on every change.
+    """
+
+    def __init__(self, path=FILE_ACTIVITY_LOG):
+        self.path = path
+        self._entries = None
+        self._lock = threading.Lock()
+        self._persister = WriteBehindPersister(path, self._snapshot)
+
+    def _snapshot(self):
+        with self._lock:
+            return [dict(entry) for entry in self._entries or []]
+
+    def _ensure_loaded(self):
+        if self._entries is not None:
+            return
+        self._entries = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                print(f"Error loading file activity log: {e}")
+        else:
+            # Create empty file soon to ensure it exists
+            self._save()
+
+    def _save(self):
+        self._persister.mark_dirty()
+
+    def load_entries(self):
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._entries)
+
+    def append(self, entry):
+        with self._lock:
+            self._ensure_loaded()
+            self._entries.append(entry)
+            self._save()
+
+    def update_duration(self, entry):
+        # Entries are shared dicts, so the new duration is already in self._entries
+        with self._lock:
+            self._ensure_loaded()
+            self._save()
+
+    def prune(self, cutoff_timestamp):
+        with self._lock:
+            self._ensure_loaded()
+            original_count = len(self._entries)
+            self._entries = [e for e in self._entries if e.get('timestamp', '') > cutoff_timestamp]
+            removed_count = original_count - len(self._entries)
+            if removed_count > 0:
+                self._save()
+            return removed_count
+
+    def flush(self):
+        self._persister.flush()
+
+
+class SQLiteActivityStore(ActivityStore):
+    """
+    Append-only SQLite backend (WAL mode).
+    New entries and duration updates are single-row writes instead of a full-file rewrite.
+    """
+
+    def __init__(self, path=FILE_ACTIVITY_DB, legacy_json_path=FILE_ACTIVITY_LOG):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._migrate_legacy_json()
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_activity (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    app_used TEXT,
+                    duration_seconds INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_file_activity_timestamp ON file_activity (timestamp)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _migrate_legacy_json(self):
+        """Import file_activity_log.json once, then move it aside so it is never parsed again"""
+        row = self._conn.execute("SELECT value FROM store_meta WHERE key = 'legacy_json_migrated'").fetchone()
+        if row or not os.path.exists(self.legacy_json_path):
+            return
+
+        try:
+            with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+                legacy_entries = json.load(f)
+        except Exception as e:
+            print(f"Error reading legacy file activity log, skipping migration: {e}")
+            return
+
+        rows = [
+            tuple(entry.get(field, 0 if field == 'duration_seconds' else '') for field in ENTRY_FIELDS)
+            for entry in legacy_entries if isinstance(entry, dict) and entry.get('file_path')
+        ]
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO file_activity (timestamp, file_path, file_name, file_type, app_used, duration_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_json_migrated', ?)",
+                               (str(len(rows)),))
+
+        try:
+            os.replace(self.legacy_json_path, self.legacy_json_path + ".migrated")
+        except OSError as e:
+            print(f"⚠️ Could not rename legacy file activity log: {e}")
+
+        print(f"📁 Migrated {len(rows)} file activity records from {self.legacy_json_path} to SQLite")
+
+    @staticmethod
+    def _row_to_entry(row):
+        entry = dict(zip(('id',) + ENTRY_FIELDS, row))
+        entry['duration_seconds'] = entry['duration_seconds'] or 0
+        return entry
+
+    def load_entries(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, timestamp, file_path, file_name, file_type, app_used, duration_seconds "
+                "FROM file_activity ORDER BY id"
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def append(self, entry):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO file_activity (timestamp, file_path, file_name, file_type, app_used, duration_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(entry.get(field) for field in ENTRY_FIELDS)
+            )
+        entry['id'] = cursor.lastrowid
+
+    def update_duration(self, entry):
+        if entry.get('id') is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE file_activity SET duration_seconds = ? WHERE id = ?",
+                               (entry.get('duration_seconds', 0), entry['id']))
+
+    def prune(self, cutoff_timestamp):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM file_activity WHERE timestamp <= ?", (cutoff_timestamp,))
+        return cursor.rowcount
+
+    def flush(self):
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except sqlite3.Error as e:
+                print(f"Error checkpointing file activity log: {e}")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+def create_store(backend=None):
+    """Create a storage backend by name ('sqlite' or 'json')"""
+    backend = (backend or settings.FILE_LOG_BACKEND).lower()
+    if backend == "json":
+        return JsonActivityStore()
+    if backend != "sqlite":
+        print(f"⚠️ Unknown FILE_LOG_BACKEND '{backend}', using sqlite")
+    try:
+        return SQLiteActivityStore()
+    except sqlite3.Error as e:
+        print(f"⚠️ SQLite activity store unavailable ({e}), falling back to JSON")
+        return JsonActivityStore()
+
+
+def get_store():
+    """Shared store instance used by both the tracker and the finder"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_store()
+        return _store
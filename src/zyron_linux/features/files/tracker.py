@@ -4,28 +4,38 @@ Tracks all file opens/access in real-time and logs activity
 """
 
 import os
-import json
 import time
 import threading
-import sqlite3
-import shutil
 import urllib.parse
 from datetime import datetime, timedelta
-from collections import defaultdict
-import win32gui
-import win32process
+from collections import OrderedDict
 import psutil
+try:
+    from Xlib import X, display as xdisplay
+    HAS_XLIB = True
+except ImportError:
+    HAS_XLIB = False
+from zyron_linux.features.files.store import get_store
+from zyron_linux.features.files.path_filter import get_path_filter
+from zyron_linux.features.files.index import index_entry, index_duration, prune_index
+from zyron_linux.features.history import recent_urls, chromium_history_path
+import zyron_linux.features.processes as processes
+from zyron_linux.features.files.watcher import open_event_source
 
 # Configuration
-FILE_ACTIVITY_LOG = "file_activity_log.json"
 MAX_LOG_DAYS = 30  # Keep last 30 days of activity
-CHECK_INTERVAL = 2  # Check every 2 seconds
+NEGATIVE_CACHE_SECONDS = 10  # How long a window that showed no file is left alone
+CHECK_INTERVAL = 2  # Check every 2 seconds (polling fallback)
+COALESCE_SECONDS = 5  # Repeated open events for the same file within this window count once
+FOCUS_CACHE_SECONDS = 0.5  # How long a read of the focused X11 window is reused
 
 # Global state
 file_activity_log = []
 tracking_active = False
 tracker_thread = None
 currently_open_files = {}  # Track files currently being accessed
+event_source = None  # fanotify/inotify watcher when available
+_last_open_events = {}  # path -> time of the last logged open event
 
 # List of apps that are browsers (need special handling for local files)
 BROWSER_APPS = {
@@ -36,86 +46,29 @@ BROWSER_APPS = {
     'opera.exe': 'Opera'
 }
 
-# System/temp paths to ignore
-IGNORE_PATHS = [
-    "\\AppData\\Local\\Temp",
-    "\\Windows\\",
-    "\\System32\\",
-    "\\Program Files\\",
-    "\\ProgramData\\",
-    "\\$Recycle.Bin",
-    "\\.git",
-    "\\node_modules",
-    "\\venv\\",
-    "\\__pycache__",
-]
-
-# File extensions we care about
-TRACKED_EXTENSIONS = [
-    # Documents
-    '.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt',
-    # Spreadsheets
-    '.xlsx', '.xls', '.csv', '.ods',
-    # Presentations
-    '.pptx', '.ppt', '.odp',
-    # Images
-    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp',
-    # Videos
-    '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv',
-    # Audio
-    '.mp3', '.wav', '.flac', '.aac', '.ogg',
-    # Code
-    '.py', '.js', '.java', '.cpp', '.c', '.html', '.css', '.json', '.xml',
-    # Archives
-    '.zip', '.rar', '.7z', '.tar', '.gz',
-    # Others
-    '.exe', '.msi', '.apk', '.dmg'
-]
-
-
 def load_activity_log():
-    """Load existing activity log from file"""
+    """Load existing activity log from the activity store"""
     global file_activity_log
     
-    if os.path.exists(FILE_ACTIVITY_LOG):
-        try:
-            with open(FILE_ACTIVITY_LOG, 'r', encoding='utf-8') as f:
-                file_activity_log = json.load(f)
-                print(f"📁 Loaded {len(file_activity_log)} file activity records")
-        except Exception as e:
-            print(f"Error loading file activity log: {e}")
-            file_activity_log = []
-    else:
+    try:
+        file_activity_log = get_store().load_entries()
+        print(f"📁 Loaded {len(file_activity_log)} file activity records")
+    except Exception as e:
+        print(f"Error loading file activity log: {e}")
         file_activity_log = []
-        # Create empty file immediately to ensure it exists
-        save_activity_log()
 
 
 def save_activity_log():
-    """Save activity log to file"""
+    """Flush pending activity log writes to disk"""
     try:
-        with open(FILE_ACTIVITY_LOG, 'w', encoding='utf-8') as f:
-            json.dump(file_activity_log, f, indent=2, ensure_ascii=False)
+        get_store().flush()
     except Exception as e:
         print(f"Error saving file activity log: {e}")
 
 
 def should_ignore_file(file_path):
     """Check if file should be ignored based on path or extension"""
-    if not file_path or not isinstance(file_path, str):
-        return True
-    
-    # Ignore system/temp paths
-    for ignore_path in IGNORE_PATHS:
-        if ignore_path.lower() in file_path.lower():
-            return True
-    
-    # Check if extension is tracked
-    _, ext = os.path.splitext(file_path)
-    if ext.lower() not in TRACKED_EXTENSIONS:
-        return True
-    
-    return False
+    return get_path_filter()(file_path)
 
 
 def get_browser_local_file(browser_process_name, window_title):
@@ -124,62 +77,33 @@ def get_browser_local_file(browser_process_name, window_title):
     to see if the user is looking at a local file (file:///...)
     """
     try:
-        history_db = None
-        user_data_dir = os.environ.get('LOCALAPPDATA', '')
-
-        # Define paths to History DB based on browser
-        if browser_process_name == 'chrome.exe':
-            history_db = os.path.join(user_data_dir, 'Google', 'Chrome', 'User Data', 'Default', 'History')
-        elif browser_process_name == 'msedge.exe':
-            history_db = os.path.join(user_data_dir, 'Microsoft', 'Edge', 'User Data', 'Default', 'History')
-        elif browser_process_name == 'brave.exe':
-            history_db = os.path.join(user_data_dir, 'BraveSoftware', 'Brave-Browser', 'User Data', 'Default', 'History')
-        
-        if not history_db or not os.path.exists(history_db):
+        history_db = chromium_history_path(browser_process_name)
+        if not history_db:
             return None
 
-        # Copy DB to temp to avoid locking issues
-        temp_db = os.path.join(os.environ.get('TEMP', ''), 'tracker_history_temp.db')
-        try:
-            shutil.copy2(history_db, temp_db)
-            
-            conn = sqlite3.connect(temp_db)
-            cursor = conn.cursor()
-            
-            # IMPROVEMENT: Get last 20 items, not just 1.
-            # This helps if the user opened 3 tabs and we want to find the one matching the window title.
-            cursor.execute("SELECT url, title FROM urls ORDER BY last_visit_time DESC LIMIT 20")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            for row in rows:
-                url, db_title = row
-                if not url: continue
-
-                # CHECK: Is it a local file?
-                if url.startswith('file:///'):
-                    # Convert file:///C:/Users/Name%20Here/Doc.pdf -> C:\Users\Name Here\Doc.pdf
-                    # 1. Unquote removes %20 and other URL encoding
-                    decoded_url = urllib.parse.unquote(url)
-                    # 2. Strip prefix and fix slashes
-                    clean_path = decoded_url.replace('file:///', '').replace('/', '\\')
-                    
-                    # 3. Fuzzy Match: Check if the filename appears in the Window Title
-                    # Window Title: "Project Proposal.pdf - Google Chrome"
-                    # File Name: "Project Proposal.pdf"
-                    filename = os.path.basename(clean_path)
-                    
-                    if filename and (filename.lower() in window_title.lower()):
-                        # Verify file actually exists
-                        if os.path.exists(clean_path):
-                            return clean_path
-        except Exception as e:
-            # print(f"DB Error: {e}")
-            pass
-        finally:
-            if os.path.exists(temp_db):
-                try: os.remove(temp_db)
-                except: pass
+        # Shared snapshot: re-read only when the History file changes, never copied per tick
+        # IMPROVEMENT: Get last 20 items, not just 1.
+        # This helps if the user opened 3 tabs and we want to find the one matching the window title.
+        for url, db_title in recent_urls(history_db, limit=20):
+            if not url: continue
+
+            # CHECK: Is it a local file?
+            if url.startswith('file:///'):
+                # Convert file:///C:/Users/Name%20Here/Doc.pdf -> C:\Users\Name Here\Doc.pdf
+                # 1. Unquote removes %20 and other URL encoding
+                decoded_url = urllib.parse.unquote(url)
+                # 2. Strip prefix and fix slashes
+                clean_path = decoded_url.replace('file:///', '').replace('/', '\\')
+                
+                # 3. Fuzzy Match: Check if the filename appears in the Window Title
+                # Window Title: "Project Proposal.pdf - Google Chrome"
+                # File Name: "Project Proposal.pdf"
+                filename = os.path.basename(clean_path)
+                
+                if filename and (filename.lower() in window_title.lower()):
+                    # Verify file actually exists
+                    if os.path.exists(clean_path):
+                        return clean_path
 
     except Exception as e:
         print(f"Error checking browser file: {e}")
@@ -187,26 +111,74 @@ def get_browser_local_file(browser_process_name, window_title):
     return None
 
 
+class WindowFileCache:
+    """
+    What each focused window resolved to, keyed on (X11 window id from _NET_ACTIVE_WINDOW,
+    pid, title), the same read focused_window already makes.
+
+    A window keeps its answer until its title or pid changes (editors put the document name
+    in the title), so sitting in one document costs a title read per tick instead of a
+    cmdline and /proc/<pid>/fd scan. "No file" answers are only trusted for
+    NEGATIVE_CACHE_SECONDS, since a file can show up in a browser's history or a process's
+    open files a moment later.
+    """
+
+    def __init__(self, negative_ttl=None, max_windows=64):
+        self.negative_ttl = NEGATIVE_CACHE_SECONDS if negative_ttl is None else negative_ttl
+        self.max_windows = max_windows
+        self._entries = OrderedDict()  # key -> ((path, app), expires or None)
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, window, pid, title, resolver):
+        key = (window, pid, title)
+        now = time.time()
+        cached = self._entries.get(key)
+        if cached is not None and (cached[1] is None or now < cached[1]):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+        
+        self.misses += 1
+        result = resolver(window, title, pid)
+        self._entries[key] = (result, None if result[0] else now + self.negative_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_windows:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+
+window_file_cache = WindowFileCache()
+
+
 def get_active_window_file():
-    """Get file path from currently active window using multiple detection methods"""
+    """Get file path from the focused X11 window using multiple detection methods"""
     try:
-        # Get active window handle
-        hwnd = win32gui.GetForegroundWindow()
-        if not hwnd:
+        window_id, pid, window_title = focused_window.get()
+        if not window_id or not pid:
             return None, None
         
-        # Get window title
-        window_title = win32gui.GetWindowText(hwnd)
-        if not window_title:
-            return None, None
-            
-        # Get process ID
-        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        
+        # Same window, same title: reuse the earlier answer instead of re-deriving it
+        return window_file_cache.resolve(window_id, pid, window_title, _resolve_window_file)
+    
+    except Exception as e:
+        print(f"[DEBUG] Error in detector: {e}")
+    
+    return None, None
+
+
+def _resolve_window_file(window_id, window_title, pid):
+    """Uncached detection for one window: browser history, cmdline, /proc/<pid>/fd, title"""
+    try:
         # Get process info
         try:
-            process = psutil.Process(pid)
-            app_name = process.name().lower()
+            info = processes.lookup(pid)
+            if info is None:
+                return None, None
+            app_name = info.name.lower()
             potential_paths = []
 
             # DEBUG: Un-comment this line if you want to see every window check in console
@@ -222,11 +194,14 @@ def get_active_window_file():
 
             # --- METHOD 1: Command Line Arguments (Most Reliable for Notepad, etc.) ---
             try:
-                cmdline = process.cmdline()
+                cmdline = info.cmdline
                 if cmdline:
                     # Skip the first argument (executable itself)
                     for arg in cmdline[1:]:
                         clean_arg = arg.strip('"').strip("'")
+                        if clean_arg and not os.path.isabs(clean_arg):
+                            # Relative to where the app was started ("gedit notes.txt"), not to us
+                            clean_arg = os.path.join(_process_cwd(pid), clean_arg)
                         if os.path.exists(clean_arg) and os.path.isfile(clean_arg):
                              # FIX: Get filename without extension to match Notepad titles
                              filename = os.path.basename(clean_arg)      # e.g., "hahahaha.txt"
@@ -238,26 +213,23 @@ def get_active_window_file():
             except (psutil.AccessDenied, IndexError, Exception):
                 pass
 
-            # --- METHOD 2: Open Files Handle (Reliable if Admin, flaky otherwise) ---
-            try:
-                open_files = process.open_files()
-                for f in open_files:
-                    if not should_ignore_file(f.path):
-                        filename = os.path.basename(f.path)
-                        name_no_ext = os.path.splitext(filename)[0]
-                        
-                        # FIX: Check if name without extension is in title
-                        if name_no_ext.lower() in window_title.lower():
-                            potential_paths.append(f.path)
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                pass
+            # --- METHOD 2: Open Files (/proc/<pid>/fd, readable for our own user's processes) ---
+            for path in _open_paths(pid):
+                if not should_ignore_file(path):
+                    filename = os.path.basename(path)
+                    name_no_ext = os.path.splitext(filename)[0]
+                    
+                    # FIX: Check if name without extension is in title
+                    if name_no_ext.lower() in window_title.lower():
+                        potential_paths.append(path)
 
             # --- METHOD 3: Window Title Parsing (Fallback) ---
-            if ':\\' in window_title:
-                parts = window_title.split(' ')
-                for part in parts:
-                    if ':\\' in part and os.path.exists(part):
-                         potential_paths.append(part)
+            # Some editors show the full path: "/home/me/notes.txt - Mousepad", "~/todo.md - Kate"
+            for part in window_title.split(' '):
+                if part.startswith(('/', '~/')):
+                    candidate = os.path.expanduser(part)
+                    if os.path.isfile(candidate):
+                        potential_paths.append(candidate)
 
             # --- FINAL SELECTION ---
             for path in potential_paths:
@@ -303,30 +275,176 @@ def log_file_activity(file_path, app_name, duration=None):
             time_diff = (current_time - last_time).total_seconds()
             
             if time_diff < 300:  # 5 minutes
-                # Update existing entry's duration
+                # Update existing entry's duration (single-row write)
                 last_entry['duration_seconds'] = int(time_diff)
-                save_activity_log()
+                try:
+                    get_store().update_duration(last_entry)
+                except Exception as e:
+                    print(f"Error saving file activity log: {e}")
+                index_duration(last_entry)
                 return
     
     # Add new entry
     file_activity_log.append(entry)
     
-    # FIXED: Save immediately after adding new entry
-    save_activity_log()
+    # Persist immediately (append-only, no full rewrite)
+    try:
+        get_store().append(entry)
+    except Exception as e:
+        print(f"Error saving file activity log: {e}")
+    
+    # Keep the finder's search index current without a rebuild
+    index_entry(entry)
     
     print(f"📁 Tracked: {entry['file_name']} ({app_name})")
 
 
+class FocusedWindow:
+    """
+    The focused X11 window as (window id, pid, title): _NET_ACTIVE_WINDOW, then its
+    _NET_WM_PID and _NET_WM_NAME. One Display is kept open (and reopened after an error) and
+    each answer is reused for FOCUS_CACHE_SECONDS, so a burst of inotify events costs one
+    X round-trip instead of a new connection per event.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = FOCUS_CACHE_SECONDS if ttl is None else ttl
+        self._display = None
+        self._lock = threading.Lock()
+        self._current = (None, None, None)
+        self._read_at = 0.0
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._read_at >= self.ttl:
+                self._current = self._read()
+                self._read_at = now
+            return self._current
+
+    def _read(self):
+        if not HAS_XLIB or not os.environ.get('DISPLAY'):
+            return None, None, None
+        try:
+            if self._display is None:
+                self._display = xdisplay.Display()
+            disp = self._display
+            root = disp.screen().root
+            active = root.get_full_property(disp.intern_atom('_NET_ACTIVE_WINDOW'), X.AnyPropertyType)
+            if not active or not len(active.value) or not active.value[0]:
+                return None, None, None
+            window_id = int(active.value[0])
+            window = disp.create_resource_object('window', window_id)
+            wm_pid = window.get_full_property(disp.intern_atom('_NET_WM_PID'), X.AnyPropertyType)
+            pid = int(wm_pid.value[0]) if wm_pid and len(wm_pid.value) else None
+            wm_name = window.get_full_property(disp.intern_atom('_NET_WM_NAME'), X.AnyPropertyType)
+            title = wm_name.value if wm_name else window.get_wm_name()
+            if isinstance(title, bytes):
+                title = title.decode('utf-8', errors='replace')
+            return window_id, pid, title or ''
+        except Exception:
+            # The window vanished mid-read, or the connection broke: start over next time
+            self._close_display()
+            return None, None, None
+
+    def close(self):
+        with self._lock:
+            self._close_display()
+
+    def _close_display(self):
+        if self._display is not None:
+            try:
+                self._display.close()
+            except Exception:
+                pass
+            self._display = None
+
+
+focused_window = FocusedWindow()
+
+
+def active_window_pid():
+    """Pid of the focused X11 window, None when unknown"""
+    return focused_window.get()[1]
+
+
+def _open_paths(pid):
+    """Paths the process has open, from /proc/<pid>/fd (empty when it can't be read)"""
+    try:
+        fds = os.listdir(f'/proc/{pid}/fd')
+    except OSError:
+        return []
+    paths = []
+    for fd in fds:
+        try:
+            target = os.readlink(f'/proc/{pid}/fd/{fd}')
+        except OSError:
+            continue
+        if target.startswith('/'):  # Not pipe:[...], socket:[...], anon_inode:...
+            paths.append(target)
+    return paths
+
+
+def _process_cwd(pid):
+    try:
+        return os.readlink(f'/proc/{pid}/cwd')
+    except OSError:
+        return ''
+
+
+def _holds_file(pid, file_path):
+    """True when the process names file_path on its command line or has it open"""
+    info = processes.lookup(pid)
+    if info and any(arg.strip('"').strip("'") == file_path for arg in (info.cmdline or ())[1:]):
+        return True
+    return file_path in _open_paths(pid)
+
+
+def on_file_opened(file_path, pid=None):
+    """Event-source callback: one open() seen by fanotify/inotify"""
+    if should_ignore_file(file_path):
+        return
+    
+    # Editors and viewers open the same file several times in a row; look at it once.
+    # Checked before attributing the event, so a burst doesn't scan /proc for every open
+    now = time.time()
+    if now - _last_open_events.get(file_path, 0) < COALESCE_SECONDS:
+        return
+    _last_open_events[file_path] = now
+    if len(_last_open_events) > 1024:
+        for path, seen in list(_last_open_events.items()):
+            if now - seen >= COALESCE_SECONDS:
+                del _last_open_events[path]
+    
+    if pid is None:
+        # inotify doesn't say who opened the file. Like the polling path, credit the focused
+        # app, but only when it really holds the file: indexers and thumbnailers open files
+        # in the background and must not be logged (as 'unknown' or as the focused app)
+        pid = active_window_pid()
+        if pid is None or not _holds_file(pid, file_path):
+            return
+    
+    info = processes.lookup(pid) if pid else None
+    app_name = info.name.lower() if info and info.name else 'unknown'
+    log_file_activity(file_path, app_name)
+
+
 def track_files():
     """Background thread that tracks file activity"""
-    global tracking_active, currently_open_files
+    global tracking_active, currently_open_files, event_source
     
     print("👁️ File tracking started...")
     
-    # Ensure log file exists at start
-    if not os.path.exists(FILE_ACTIVITY_LOG):
-        print("[DEBUG] Creating initial JSON log file...")
-        save_activity_log()
+    # Event-driven when the kernel lets us; the thread then just idles until stopped
+    event_source = open_event_source(on_file_opened)
+    if event_source:
+        while tracking_active:
+            time.sleep(1)
+        event_source.stop()
+        event_source = None
+        focused_window.close()
+        print("👁️ File tracking stopped.")
+        return
     
     while tracking_active:
         try:
@@ -445,18 +563,22 @@ def cleanup_old_logs(days=30):
     global file_activity_log
     
     cutoff_date = datetime.now() - timedelta(days=days)
-    original_count = len(file_activity_log)
     
     file_activity_log = [
         entry for entry in file_activity_log
         if datetime.strptime(entry['timestamp'], '%Y-%m-%d %H:%M:%S') > cutoff_date
     ]
     
-    removed_count = original_count - len(file_activity_log)
+    try:
+        cutoff_timestamp = cutoff_date.strftime('%Y-%m-%d %H:%M:%S')
+        removed_count = get_store().prune(cutoff_timestamp)
+        prune_index(cutoff_timestamp)
+    except Exception as e:
+        print(f"Error cleaning up file activity log: {e}")
+        removed_count = 0
     
     if removed_count > 0:
         print(f"🗑️ Cleaned up {removed_count} old file activity records")
-        save_activity_log()
 
 
 def format_file_activity_text(entries, limit=20):
@@ -0,0 +1,269 @@
+"""
+File Open Watcher for Zyron Desktop Assistant (Linux)
+Event-driven file-open notifications through fanotify or inotify, replacing window polling
+"""
+
+import os
+import select
+import stat
+import struct
+import ctypes
+import ctypes.util
+import threading
+from abc import ABC, abstractmethod
+
+from zyron_linux.utils.settings import settings
+
+# Directories under $HOME that are watched (all of $HOME when none of them exist)
+USER_DIRS = ['Documents', 'Desktop', 'Downloads', 'Pictures', 'Videos', 'Music']
+
+# Both sources watch directory by directory; stay well below fs.inotify.max_user_watches
+MAX_WATCHES = 8192
+
+# Never watched: no files worth tracking, and lots of opens (.git, .cache, ...)
+SKIPPED_DIRS = ('node_modules', '__pycache__')
+
+# inotify constants (linux/inotify.h)
+IN_OPEN = 0x00000020
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_ONLYDIR = 0x01000000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+# fanotify constants (linux/fanotify.h)
+FAN_CLASS_NOTIF = 0x00000000
+FAN_CLOEXEC = 0x00000001
+FAN_NONBLOCK = 0x00000002
+FAN_MARK_ADD = 0x00000001
+FAN_OPEN = 0x00000020
+FAN_EVENT_ON_CHILD = 0x08000000
+FAN_ONDIR = 0x40000000
+AT_FDCWD = -100
+_FANOTIFY_EVENT = struct.Struct('=IBBHQii')
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    return _libc
+
+
+def _os_error(what):
+    err = ctypes.get_errno()
+    return OSError(err, f"{what}: {os.strerror(err)}")
+
+
+def _skipped(directory_name):
+    return directory_name.startswith('.') or directory_name in SKIPPED_DIRS
+
+
+def default_roots():
+    home = os.path.expanduser('~')
+    roots = [os.path.join(home, d) for d in USER_DIRS if os.path.isdir(os.path.join(home, d))]
+    return roots or [home]
+
+
+class _EventSource(ABC):
+    """
+    Base for the watchers: a daemon thread reads the notification fd and calls
+    callback(path, pid) for every file opened under `roots` (pid is None when unknown).
+    """
+
+    name = "events"
+
+    def __init__(self, roots, callback):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.callback = callback
+        self.fd = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"file-{self.name}")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Blocks in the kernel until something happens; the timeout only lets stop() through
+            ready, _, _ = select.select([self.fd], [], [], 1.0)
+            if not ready:
+                continue
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                print(f"⚠️ File watcher ({self.name}) stopped: {e}")
+                return
+            for path, pid in self._parse(data):
+                try:
+                    self.callback(path, pid)
+                except Exception as e:
+                    print(f"File watcher callback error: {e}")
+
+    def _watch_tree(self, top):
+        """Watch top and the directories below it (until MAX_WATCHES)"""
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not _skipped(d)]
+            if not self._watch(dirpath):
+                dirnames[:] = []
+                return
+
+    @abstractmethod
+    def _watch(self, path):
+        """Watch one directory; False once no more watches can be added"""
+
+    @abstractmethod
+    def _parse(self, data):
+        """(path, pid) pairs for the file-open events in one read() of the fd"""
+
+
+class InotifySource(_EventSource):
+    """IN_OPEN watches on every directory below the roots (inotify is not recursive); no pid"""
+
+    name = "inotify"
+
+    def __init__(self, roots, callback):
+        super().__init__(roots, callback)
+        libc = _load_libc()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise _os_error("inotify_init1")
+        self._dirs = {}  # wd -> directory
+        for root in self.roots:
+            self._watch_tree(root)
+        print(f"👁️ inotify watching {len(self._dirs)} directories")
+
+    def _watch(self, path):
+        if len(self._dirs) >= MAX_WATCHES:
+            return False
+        wd = _load_libc().inotify_add_watch(self.fd, os.fsencode(path),
+                                            IN_OPEN | IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR)
+        if wd >= 0:
+            self._dirs[wd] = path
+        return True
+
+    def _parse(self, data):
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            raw_name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length]
+            offset += _INOTIFY_EVENT.size + length
+
+            directory = self._dirs.get(wd)
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if directory is None:
+                continue
+            name = os.fsdecode(raw_name.rstrip(b'\0'))
+            path = os.path.join(directory, name) if name else directory
+
+            if mask & IN_ISDIR:
+                # New folder: watch it too
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+            elif mask & IN_OPEN and name:
+                yield path, None
+
+
+class FanotifySource(_EventSource):
+    """
+    FAN_OPEN on every directory below the roots (FAN_EVENT_ON_CHILD), so only opens there are
+    reported, and each event carries the opening pid. A directory created later is marked the
+    first time it is opened (listed). Needs CAP_SYS_ADMIN, so it is
+    usually only available as root.
+    """
+
+    name = "fanotify"
+
+    def __init__(self, roots, callback):
+        super().__init__(roots, callback)
+        libc = _load_libc()
+        libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64, ctypes.c_int, ctypes.c_char_p]
+        self.fd = libc.fanotify_init(FAN_CLASS_NOTIF | FAN_CLOEXEC | FAN_NONBLOCK,
+                                     os.O_RDONLY | getattr(os, 'O_LARGEFILE', 0))
+        if self.fd < 0:
+            raise _os_error("fanotify_init")
+        self._dirs = set()
+        for root in self.roots:
+            if not self._mark(root):
+                error = _os_error(f"fanotify_mark {root}")
+                os.close(self.fd)
+                self.fd = None
+                raise error
+            self._watch_tree(root)
+        self._own_pid = os.getpid()
+        print(f"👁️ fanotify watching {len(self._dirs)} directories")
+
+    def _mark(self, path):
+        mask = FAN_OPEN | FAN_EVENT_ON_CHILD | FAN_ONDIR
+        if _load_libc().fanotify_mark(self.fd, FAN_MARK_ADD, mask, AT_FDCWD, os.fsencode(path)) < 0:
+            return False
+        self._dirs.add(path)
+        return True
+
+    def _watch(self, path):
+        if len(self._dirs) >= MAX_WATCHES:
+            return False
+        if path not in self._dirs:
+            self._mark(path)
+        return True
+
+    def _parse(self, data):
+        offset = 0
+        while offset + _FANOTIFY_EVENT.size <= len(data):
+            event_len, _, _, _, mask, fd, pid = _FANOTIFY_EVENT.unpack_from(data, offset)
+            offset += event_len or _FANOTIFY_EVENT.size
+            if fd < 0:
+                continue
+            try:
+                path = os.readlink(f'/proc/self/fd/{fd}')
+                # Without FID reporting the kernel doesn't flag directory events: ask the fd
+                is_dir = stat.S_ISDIR(os.fstat(fd).st_mode)
+            except OSError:
+                continue
+            finally:
+                os.close(fd)
+            if is_dir:
+                # A directory was opened: mark it if it's new below a watched one
+                if path not in self._dirs and os.path.dirname(path) in self._dirs and not _skipped(os.path.basename(path)):
+                    self._watch_tree(path)
+            elif pid != self._own_pid:
+                yield path, pid
+
+
+def open_event_source(callback, roots=None, mode=None):
+    """
+    Started fanotify or inotify source (per settings.FILE_EVENTS), or None when neither is usable,
+    in which case the caller keeps polling.
+    """
+    mode = (mode or settings.FILE_EVENTS).lower()
+    if mode == 'poll':
+        return None
+    roots = roots or default_roots()
+    kinds = {'fanotify': [FanotifySource], 'inotify': [InotifySource]}.get(mode, [FanotifySource, InotifySource])
+    for kind in kinds:
+        try:
+            source = kind(roots, callback)
+        except (OSError, AttributeError) as e:
+            # EPERM without CAP_SYS_ADMIN, ENOSYS on old kernels, missing symbols on non-glibc
+            print(f"ℹ️ {kind.name} unavailable: {e}")
+            continue
+        source.start()
+        return source
+    return None
@@ -9,6 +9,7 @@ import time
 import threading
 import psutil
 from datetime import datetime
+import zyron_linux.features.processes as processes
 
 # Define paths - Use project root directly, similar to other log files
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -157,13 +158,13 @@ def kill_process(proc_name):
         # Normalize: spotify.exe -> spotify
         clean_target = proc_name.lower().replace(".exe", "")
         
-        for proc in psutil.process_iter(['pid', 'name']):
+        for proc in processes.snapshot(max_age=0):
             try:
-                curr_name = proc.info['name'].lower()
+                curr_name = proc.name.lower()
                 # Check for exact match or name containing target (e.g. Spotify.exe matches spotify)
                 if clean_target == curr_name or clean_target == curr_name.replace(".exe", ""):
-                    proc.kill()
-                    print(f"💀 Focus Mode killed: {proc.info['name']} (PID: {proc.info['pid']})")
+                    processes.get_process(proc).kill()
+                    print(f"💀 Focus Mode killed: {proc.name} (PID: {proc.pid})")
                     return True
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
@@ -174,7 +175,7 @@ def kill_process(proc_name):
 def check_and_block():
     """Main Enforcer Loop - Optimized for performance."""
     import zyron.features.activity as activity_monitor
-    import zyron.features.browser_control as browser_control
+    import zyron_linux.features.browser_control as browser_control
     
     print("🛡️ Focus Mode Enforcer Started.")
     
@@ -204,9 +205,9 @@ def check_and_block():
                     if a in APP_MAPPINGS:
                         expanded_targets.extend(APP_MAPPINGS[a])
                 
-                for proc in psutil.process_iter(['pid', 'name']):
+                for proc in processes.snapshot():
                     try:
-                        curr_name = proc.info['name'].lower()
+                        curr_name = proc.name.lower()
                         curr_base = curr_name.replace(".exe", "")
                         
                         should_kill = False
@@ -217,8 +218,8 @@ def check_and_block():
                                 break
                         
                         if should_kill:
-                            proc.kill()
-                            print(f"💀 Focus Mode killed: {proc.info['name']} (PID: {proc.info['pid']})")
+                            processes.get_process(proc).kill()
+                            print(f"💀 Focus Mode killed: {proc.name} (PID: {proc.pid})")
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         continue
 
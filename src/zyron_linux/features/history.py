@@ -0,0 +1,206 @@
+"""
+Browser History Snapshots for Zyron Desktop Assistant
+One shared, cached view of each browser's history database for the tracker and activity monitor
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+from zyron_linux.utils.settings import settings
+
+# Newest visits first; callers slice what they need from the same cached rows
+CHROMIUM_QUERY = "SELECT url, title FROM urls ORDER BY last_visit_time DESC LIMIT ?"
+FIREFOX_QUERY = ("SELECT url, title FROM moz_places WHERE url IS NOT NULL "
+                 "ORDER BY last_visit_date DESC LIMIT ?")
+
+# Enough rows for every caller (activity lists 30 tabs, the tracker scans 20)
+DEFAULT_LIMIT = 50
+
+CHROMIUM_PROFILES = {
+    'chrome.exe': ('Google', 'Chrome'),
+    'msedge.exe': ('Microsoft', 'Edge'),
+    'brave.exe': ('BraveSoftware', 'Brave-Browser'),
+}
+
+
+def chromium_history_path(browser_process_name):
+    """History DB of a Chromium browser's default profile, or None for other browsers"""
+    vendor = CHROMIUM_PROFILES.get(browser_process_name)
+    if not vendor:
+        return None
+    return os.path.join(os.environ.get('LOCALAPPDATA', ''), *vendor, 'User Data', 'Default', 'History')
+
+
+def _signature(path):
+    """(mtime, size) of the DB and its WAL file; None when the DB is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    try:
+        wal = os.stat(path + '-wal')
+        wal_sig = (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        wal_sig = None
+    return (stat.st_mtime_ns, stat.st_size, wal_sig)
+
+
+class HistorySnapshot:
+    """
+    Cached rows of one history database.
+
+    The browser keeps its History file open (and locked on Windows), so the live file is opened
+    read-only with immutable=1, which skips locking. An immutable connection never sees later
+    changes and ignores the -wal file, so it is reopened whenever the (mtime, size) signature
+    changes. WAL databases with pending WAL content (Firefox) are read from a temp copy of the
+    DB + WAL instead, re-copied only when the signature changes. The copy is also the fallback
+    when the live file can't be read.
+
+    Rows are served from memory for `ttl` seconds; after that a stat decides whether to re-query.
+    """
+
+    def __init__(self, path, query, ttl=None):
+        self.path = path
+        self.query = query
+        self.ttl = settings.HISTORY_CACHE_TTL if ttl is None else ttl
+        self._conn = None
+        self._conn_signature = None
+        self._rows = None
+        self._rows_limit = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._copy_path = None
+
+    def recent(self, limit=DEFAULT_LIMIT):
+        """Most recent (url, title) rows, newest first; [] when the DB is missing or unreadable"""
+        with self._lock:
+            now = time.time()
+            if self._rows is not None and limit <= self._rows_limit and now - self._checked_at < self.ttl:
+                return self._rows[:limit]
+
+            signature = _signature(self.path)
+            self._checked_at = now
+            if signature is None:
+                self._close()
+                self._rows = None
+                return []
+            if self._rows is not None and limit <= self._rows_limit and signature == self._conn_signature:
+                return self._rows[:limit]
+
+            fetch = max(limit, DEFAULT_LIMIT)
+            try:
+                self._rows = self._connection(signature).execute(self.query, (fetch,)).fetchall()
+            except sqlite3.Error:
+                # A live read can race the browser's own write; retry once from a copy
+                try:
+                    self._rows = self._connection(signature, from_copy=True).execute(self.query, (fetch,)).fetchall()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Error reading browser history {self.path}: {e}")
+                    self._close()
+                    self._rows = None
+                    return []
+            self._rows_limit = fetch
+            return self._rows[:limit]
+
+    def _connection(self, signature, from_copy=False):
+        if not from_copy and self._conn is not None and signature == self._conn_signature:
+            return self._conn
+        self._close()
+        has_wal = signature[2] is not None and signature[2][1] > 0
+        conn = None
+        if not has_wal and not from_copy:
+            try:
+                conn = self._open(self.path, immutable=True)
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            except sqlite3.Error:
+                if conn is not None:
+                    conn.close()
+                conn = None
+        if conn is None:
+            conn = self._open(self._copy(), immutable=True)
+        self._conn = conn
+        self._conn_signature = signature
+        return conn
+
+    @staticmethod
+    def _open(path, immutable):
+        uri = 'file:' + pathname2url(os.path.abspath(path)) + '?mode=ro'
+        if immutable:
+            uri += '&immutable=1'
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def _copy(self):
+        """Copy DB (+ WAL, so SQLite replays it) to temp, next to each other under the same name"""
+        if self._copy_path is None:
+            base = os.path.basename(os.path.dirname(self.path)) + '_' + os.path.basename(self.path)
+            self._copy_path = os.path.join(os.environ.get('TEMP', '') or '/tmp', f'zyron_history_{base}.db')
+        for stale in (self._copy_path + '-wal', self._copy_path + '-shm'):
+            if os.path.exists(stale):
+                os.remove(stale)
+        shutil.copy2(self.path, self._copy_path)
+        if os.path.exists(self.path + '-wal'):
+            shutil.copy2(self.path + '-wal', self._copy_path + '-wal')
+            # Fold the WAL into the copy once, so the copy can be opened immutable
+            conn = sqlite3.connect(self._copy_path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+        return self._copy_path
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+        self._conn_signature = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+            self._rows = None
+            if self._copy_path:
+                for path in (self._copy_path, self._copy_path + '-wal', self._copy_path + '-shm'):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+
+class HistorySnapshotService:
+    """One HistorySnapshot per database path, shared by every caller"""
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, path, query=CHROMIUM_QUERY):
+        with self._lock:
+            snap = self._snapshots.get(path)
+            if snap is None:
+                snap = self._snapshots[path] = HistorySnapshot(path, query)
+            return snap
+
+    def recent_urls(self, path, query=CHROMIUM_QUERY, limit=DEFAULT_LIMIT):
+        return self.snapshot(path, query).recent(limit)
+
+    def close(self):
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+            self._snapshots.clear()
+        for snap in snapshots:
+            snap.close()
+
+
+history_snapshots = HistorySnapshotService()
+
+
+def recent_urls(path, query=CHROMIUM_QUERY, limit=DEFAULT_LIMIT):
+    """Cached (url, title) rows from a history DB, newest first"""
+    return history_snapshots.recent_urls(path, query, limit)
@@ -2,11 +2,14 @@ import time
 from .core.voice import listen_for_command, take_user_input, speak
 from .core.brain import process_command
 from .agents.system import execute_command
+from .features.browser_control import start_bridge
 
 # Import file tracker - it will auto-start when imported
 # import zyron.features.files.tracker as file_tracker
 
 def main():
+    # Own the browser bridge, or go through the Telegram bot when it already owns it
+    start_bridge()
     print("⚡ ZYRON ONLINE: Say 'Hey Pikachu' to start...")
     
     while True:
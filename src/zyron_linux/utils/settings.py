@@ -0,0 +1,21 @@
+from dotenv import load_dotenv
+import os
+from pydantic_settings import BaseSettings
+load_dotenv()
+
+
+class Settings(BaseSettings):
+    FILE_EVENTS: str = os.getenv("FILE_EVENTS", "auto").lower()
+    PERSIST_DELAY_SECONDS: float = float(os.getenv("PERSIST_DELAY_SECONDS", "2.0"))
+    PERSIST_MAX_PENDING: int = int(os.getenv("PERSIST_MAX_PENDING", "20"))
+    TAB_CAPTURE_FORMAT: str = os.getenv("TAB_CAPTURE_FORMAT", "jpeg")
+    TAB_CAPTURE_QUALITY: int = int(os.getenv("TAB_CAPTURE_QUALITY", "80"))
+    TAB_CAPTURE_MAX_WIDTH: int = int(os.getenv("TAB_CAPTURE_MAX_WIDTH", "1600"))
+    FILE_LOG_BACKEND: str = os.getenv("FILE_LOG_BACKEND", "sqlite")
+    ACTIVITY_COLLECTOR_TIMEOUT: float = float(os.getenv("ACTIVITY_COLLECTOR_TIMEOUT", "3.0"))
+    PROCESS_SNAPSHOT_INTERVAL: float = float(os.getenv("PROCESS_SNAPSHOT_INTERVAL", "2.0"))
+    FILE_FILTER_IGNORE_PATHS: str = os.getenv("FILE_FILTER_IGNORE_PATHS", "")
+    FILE_FILTER_EXTENSIONS: str = os.getenv("FILE_FILTER_EXTENSIONS", "")
+    HISTORY_CACHE_TTL: float = float(os.getenv("HISTORY_CACHE_TTL", "2.0"))
+
+settings = Settings()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Audio Pipeline Tests
+The shared audio ring and voice activity detection, fed from generated WAV files through
+FileSource instead of a microphone.
+Run: python -m pytest test_audio.py
+"""
+
+import os
+import sys
+import math
+import wave
+import random
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from zyron.core.audio import AudioRing, AudioCaptureService, FileSource, SAMPLE_RATE, seconds_to_bytes
+from zyron.core.vad import capture_utterance
+
+
+def test_ring_wraps_around():
+    ring = AudioRing(100)
+    ring.write(bytes(range(60)))
+    ring.write(bytes(range(60, 120)))  # Crosses the end of the buffer
+
+    assert ring.written == 120
+    assert ring.oldest == 20
+    assert ring.read(20) == (20, bytes(range(20, 120)))
+    # Offsets that were already overwritten start at the oldest byte still held
+    assert ring.read(0) == (20, bytes(range(20, 120)))
+    assert ring.read(110, max_bytes=4) == (110, bytes(range(110, 114)))
+
+
+def test_ring_keeps_the_tail_of_an_oversized_write():
+    ring = AudioRing(100)
+    ring.write(bytes(range(30)))
+    ring.write(bytes(range(30, 160)))
+
+    assert ring.read(0) == (60, bytes(range(60, 160)))
+
+    ring = AudioRing(100)
+    ring.write(bytes(range(130)))
+    assert ring.read(0) == (30, bytes(range(30, 130)))
+
+
+def test_ring_survives_many_laps():
+    ring = AudioRing(64)
+    stream = bytes(random.Random(1).randrange(256) for _ in range(1000))
+    for start in range(0, len(stream), 26):
+        ring.write(stream[start:start + 26])
+        offset, data = ring.read(0)
+        assert data == stream[offset:start + 26]
+
+
+def write_wav(path, segments):
+    """segments: (seconds, amplitude) pairs; amplitude 0 is near-silent room noise"""
+    noise = random.Random(0)
+    samples = []
+    for seconds, amplitude in segments:
+        for i in range(int(seconds * SAMPLE_RATE)):
+            if amplitude:
+                value = amplitude * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)
+            else:
+                value = noise.randint(-30, 30)
+            samples.append(int(value).to_bytes(2, 'little', signed=True))
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b"".join(samples))
+
+
+def syllables(seconds, amplitude=8000):
+    """Speech-like bursts: steady tones with short pauses (a steady tone alone reads as noise)"""
+    return [(0.2, amplitude), (0.05, 0)] * int(seconds / 0.25)
+
+
+def capture_from(path, **limits):
+    service = AudioCaptureService(FileSource(str(path), realtime=False))
+    try:
+        return capture_utterance(service.reader(0), **limits)
+    finally:
+        service.stop()
+
+
+def test_utterance_ends_on_silence(tmp_path):
+    path = tmp_path / "command.wav"
+    write_wav(path, [(0.5, 0)] + syllables(1.0) + [(2.0, 0)])
+
+    utterance = capture_from(path, hangover_ms=400, start_timeout=2.0, max_seconds=5.0)
+
+    assert utterance.ended_by == 'silence'
+    assert abs(utterance.speech_seconds - 0.95) < 0.1
+    # Pre-roll + speech + a little trailing silence, not the whole file
+    assert seconds_to_bytes(1.0) < len(utterance.audio) < seconds_to_bytes(2.0)
+
+
+def test_utterance_stops_at_max_length(tmp_path):
+    path = tmp_path / "rambling.wav"
+    write_wav(path, [(0.2, 0)] + syllables(3.0))
+
+    utterance = capture_from(path, hangover_ms=400, start_timeout=2.0, max_seconds=1.0)
+
+    assert utterance.ended_by == 'max_length'
+
+
+def test_nobody_speaks(tmp_path):
+    path = tmp_path / "quiet.wav"
+    write_wav(path, [(2.0, 0)])
+
+    utterance = capture_from(path, hangover_ms=400, start_timeout=1.0, max_seconds=5.0)
+
+    assert utterance.ended_by == 'no_speech'
+    assert utterance.audio == b""
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Browser Bridge Tests
+Exercises BrowserBridge against FakeBrowserHost over a real local socket (named pipe on
+Windows): request ids, chunked captures and the tab table. No browser needed.
+Run: python -m pytest test_browser_ipc.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import secrets
+import tempfile
+import itertools
+import threading
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from zyron.core.browser_ipc import BrowserBridge, FakeBrowserHost, TabTable
+
+_pipes = itertools.count()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def connect():
+    """connect(**host_options) -> (bridge, host), connected over a private address"""
+    opened = []
+    workdir = tempfile.mkdtemp(prefix="zyron-test-")
+
+    def _connect(**host_options):
+        if os.name == 'nt':
+            address = rf'\\.\pipe\zyron-test-{os.getpid()}-{next(_pipes)}'
+        else:
+            address = os.path.join(workdir, f"bridge-{next(_pipes)}.sock")
+        authkey = secrets.token_bytes(32)
+        bridge = BrowserBridge(address=address, authkey=authkey)
+        assert bridge.start()
+        host = FakeBrowserHost(address=address, authkey=authkey, **host_options).start()
+        opened.append((bridge, host))
+        assert wait_until(lambda: bridge.connected), "fake host never connected"
+        return bridge, host
+
+    _connect.opened = opened
+
+    yield _connect
+    for bridge, host in opened:
+        host.stop()
+        bridge.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def test_replies_find_their_request_out_of_order(connect):
+    # Tab 1 answers last although it was asked first
+    delays = {1: 0.6, 2: 0.3, 3: 0.0}
+    bridge, host = connect(delay=lambda command: delays.get(command.get("tabId"), 0.0))
+
+    results = {}
+    finished = []
+
+    def read(tab_id):
+        results[tab_id] = bridge.request({"action": "read", "tabId": tab_id}, timeout=5)
+        finished.append(tab_id)
+
+    threads = [threading.Thread(target=read, args=(tab_id,)) for tab_id in (1, 2, 3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)  # Sent in order 1, 2, 3
+    for thread in threads:
+        thread.join()
+
+    assert finished == [3, 2, 1]
+    for tab_id, reply in results.items():
+        assert reply["data"]["tabId"] == tab_id
+    assert bridge.in_flight == 0
+
+
+def test_request_times_out_without_blocking_others(connect):
+    bridge, host = connect(delay=lambda command: 2.0 if command.get("tabId") == 1 else 0.0)
+
+    slow = bridge.submit({"action": "read", "tabId": 1})
+    assert bridge.request({"action": "read", "tabId": 2}, timeout=1)["data"]["tabId"] == 2
+    with pytest.raises(TimeoutError):
+        bridge.request({"action": "read", "tabId": 1}, timeout=0.2)
+    slow.cancel()
+
+
+def test_capture_chunks_are_joined_in_order(connect):
+    image = secrets.token_bytes(100_000)
+    bridge, host = connect(image=image, chunk_size=16 * 1024)
+
+    reply = bridge.request({"action": "capture_tab", "tabId": 1}, timeout=5)
+
+    assert reply["action"] == "capture_result"
+    assert reply["image"] == image
+    assert reply["mime"] == "image/jpeg"
+    assert "transferMs" in reply["timings"]
+
+
+def test_capture_chunks_arriving_out_of_order(connect):
+    image = secrets.token_bytes(50_000)
+
+    def shuffled(command):
+        chunks = FakeBrowserHost.respond(host, command)
+        return chunks[::-1] if isinstance(chunks, list) else chunks
+
+    bridge, host = connect(image=image, chunk_size=8 * 1024, responder=shuffled)
+
+    assert bridge.request({"action": "capture_tab", "tabId": 1}, timeout=5)["image"] == image
+
+
+def test_tab_table_follows_snapshot_and_events(connect):
+    bridge, host = connect(tabs=[{"id": 1, "title": "Docs", "windowId": 1, "active": True}])
+    assert wait_until(lambda: bridge.tabs.synced)
+
+    host.tab_event("created", tab={"id": 2, "title": "Mail", "windowId": 1, "active": False})
+    host.tab_event("activated", tabId=2, windowId=1)
+    host.tab_event("removed", tabId=1)
+
+    assert wait_until(lambda: [tab["id"] for tab in bridge.tabs.tabs() or []] == [2])
+    assert bridge.tabs.tabs()[0]["active"] is True
+
+
+def test_tab_table_resyncs_after_a_gap(connect):
+    bridge, host = connect(tabs=[{"id": 1, "title": "Docs", "windowId": 1}])
+    assert wait_until(lambda: bridge.tabs.synced)
+
+    # The event with the next sequence number is lost: the bridge asks for a snapshot
+    host.tab_event("created", skip_seq=True, tab={"id": 2, "title": "Mail", "windowId": 1})
+
+    assert wait_until(lambda: any(command.get("action") == "resync_tabs" for command in host.received))
+    assert wait_until(lambda: sorted(tab["id"] for tab in bridge.tabs.tabs() or []) == [1, 2])
+
+
+def test_second_process_goes_through_the_owner(connect):
+    image = secrets.token_bytes(40_000)
+    owner, host = connect(image=image, tabs=[{"id": 1, "title": "Docs", "windowId": 1}],
+                          delay=lambda command: 0.3 if command.get("tabId") == 1 else 0.0)
+
+    # Same address and key, as another Zyron process would have: the owner keeps the bridge
+    client = BrowserBridge(address=owner.address, authkey=owner.authkey)
+    assert not client.start()
+    client.attach()
+    connect.opened.append((client, host))
+    assert wait_until(lambda: client.attached and client.tabs.synced)
+
+    slow = client.submit({"action": "read", "tabId": 1})
+    assert client.request({"action": "read", "tabId": 2}, timeout=5)["data"]["tabId"] == 2
+    assert slow.result(5)["data"]["tabId"] == 1
+    assert client.request({"action": "capture_tab", "tabId": 3}, timeout=5)["image"] == image
+
+    host.tab_event("created", tab={"id": 2, "title": "Mail", "windowId": 1})
+    assert wait_until(lambda: sorted(tab["id"] for tab in client.tabs.tabs() or []) == [1, 2])
+
+
+def test_tab_table_gap_and_unsynced_events():
+    table = TabTable()
+    # Events before any snapshot can't be applied
+    assert not table.apply({"action": "tab_event", "seq": 1, "type": "removed", "tabId": 1})
+    assert table.tabs() is None
+
+    assert table.apply({"action": "tab_snapshot", "seq": 5, "tabs": [{"id": 1}, {"id": 2}]})
+    # Already covered by the snapshot
+    assert table.apply({"action": "tab_event", "seq": 5, "type": "removed", "tabId": 1})
+    assert table.apply({"action": "tab_event", "seq": 6, "type": "removed", "tabId": 1})
+    assert [tab["id"] for tab in table.tabs()] == [2]
+
+    assert not table.apply({"action": "tab_event", "seq": 8, "type": "removed", "tabId": 2})
+    assert table.tabs() is None
+    assert table.wants_resync()
+    assert not table.wants_resync()  # Throttled to one request per RESYNC_INTERVAL
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+File Finder Tests
+The indexed search (inverted/trigram index + NumPy top-k) must rank a generated activity log
+exactly like scoring every entry with calculate_relevance_score and sorting the whole list.
+Run: python -m pytest test_file_finder.py
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from zyron.features.files import finder
+from zyron.features.files.index import FileSearchIndex, TIMESTAMP_FORMAT
+
+WORDS = ['report', 'budget', 'invoice', 'notes', 'thesis', 'project', 'zyron', 'quarterly',
+         'resume', 'draft', 'final', 'holiday', 'photos', 'meeting', 'reportt', 'budgett']
+EXTENSIONS = {'.pdf': 'PDF', '.docx': 'Word', '.xlsx': 'Excel', '.png': 'Image',
+              '.py': 'Code', '.mp4': 'Video', '.txt': 'Text'}
+APPS = ['Microsoft Edge', 'chrome.exe', 'Code.exe', 'notepad.exe', 'POWERPNT.EXE', '']
+
+
+def generate_log(count, seed=7):
+    """Entries with distinct timestamps (so ties can only be broken one way) kept clear of the recency tiers"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    # Half an hour off any whole hour, so the few milliseconds between both scorers can't cross a tier
+    offsets = rng.sample([hour * 3600 + 1800 + second for hour in range(200) for second in range(600)], count)
+    entries = []
+    for i, seconds in enumerate(offsets):
+        ext = rng.choice(list(EXTENSIONS))
+        name = '_'.join(rng.sample(WORDS, rng.randint(1, 3))) + ext
+        if rng.random() < 0.3:
+            name = name.title()  # Keyword matching is case-insensitive
+        entries.append({
+            'id': i,
+            'file_name': name,
+            'file_path': f'C:\\Users\\me\\Documents\\{name}',
+            'file_type': EXTENSIONS[ext],
+            'app_used': rng.choice(APPS),
+            'timestamp': (now - timedelta(seconds=seconds)).strftime(TIMESTAMP_FORMAT),
+            'duration_seconds': rng.choice([0, 0, 30, 60, 61, 200, 300, 301, 4000]),
+        })
+    rng.shuffle(entries)  # Out of time order, like a log merged from several sources
+    return entries
+
+
+def full_scan(entries, time_range, file_types, keyword, target_app, limit):
+    """The search before the index: score every entry, sort all of them"""
+    scored = []
+    for entry in entries:
+        score = finder.calculate_relevance_score(entry, time_range, file_types, keyword, target_app)
+        if score > 0:
+            scored.append((score, entry['timestamp'], entry['id']))
+    scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return scored[:limit]
+
+
+@pytest.fixture
+def log(monkeypatch):
+    entries = generate_log(3000)
+    index = FileSearchIndex()
+    index.build(entries)
+    assert len(index) == len(entries)
+    monkeypatch.setattr(finder, 'get_index', lambda: index)
+    return entries
+
+
+def now_minus(hours):
+    return datetime.now() - timedelta(hours=hours)
+
+
+QUERIES = [
+    # (time_range, file_types, keyword, target_app)
+    (None, None, None, None),
+    (None, None, 'report', None),
+    (None, None, 'budget', None),          # Keywords arrive lowercased (extract_keyword)
+    (None, None, 'reprot', None),          # Short typo: fuzzy only
+    (None, None, 'quartrely', None),       # Long typo: fuzzy through trigram candidates
+    (None, None, 'no', None),              # Shorter than a trigram
+    (None, None, 'xyzzy', None),           # Matches nothing but still ranks by recency
+    (None, ['PDF'], None, None),
+    (None, ['Word', 'Excel'], 'invoice', None),
+    (None, None, 'notes', 'edge'),
+    (None, ['Code'], 'zyron', 'code'),
+    ((now_minus(30), now_minus(2)), None, None, None),
+    ((now_minus(30), now_minus(2)), ['PDF'], 'thesis', None),
+    ((now_minus(80), now_minus(20)), None, 'project_final', 'chrome'),
+    ((now_minus(1000), now_minus(900)), None, 'report', None),  # Empty range
+]
+
+
+@pytest.mark.parametrize('time_range, file_types, keyword, target_app', QUERIES)
+@pytest.mark.parametrize('limit', [1, 5, 50])
+def test_index_ranks_like_a_full_scan(log, time_range, file_types, keyword, target_app, limit):
+    expected = full_scan(log, time_range, file_types, keyword, target_app, limit)
+
+    results = finder.search_index(time_range, file_types, keyword, target_app, limit=limit)
+
+    assert [(r['timestamp'], r['id']) for r in results] == [(t, i) for _, t, i in expected]
+    for result, (score, _, _) in zip(results, expected):
+        assert result['confidence_score'] == pytest.approx(score)
+
+
+def test_index_keeps_up_with_appends_and_durations(log):
+    index = finder.get_index()
+    newest = dict(log[0], id=len(log), file_name='brand_new_report.pdf',
+                  timestamp=datetime.now().strftime(TIMESTAMP_FORMAT), duration_seconds=0)
+    log.append(newest)
+    index.add(newest)
+
+    newest['duration_seconds'] = 900
+    index.update_duration(newest)
+
+    expected = full_scan(log, None, None, 'report', None, 5)
+    results = finder.search_index(None, None, 'report', limit=5)
+    assert results[0]['id'] == newest['id']
+    assert [r['id'] for r in results] == [i for _, _, i in expected]
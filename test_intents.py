@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Intent Routing Tests
+Table-driven checks of the BRAIN_RULES and TELEGRAM_RULES order: which rule a phrase lands on,
+the command it builds, and which inputs fall through to the LLM.
+Run: python -m pytest test_intents.py
+"""
+
+import os
+import sys
+import random
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from zyron.core.intents import PhraseMatcher, BRAIN_RULES, brain_router, telegram_router, route_command
+
+# (input, rule name, command)
+BRAIN_CASES = [
+    # Find-file queries win over every other keyword they contain
+    ("find that pdf I was reading yesterday", "find_file",
+     {"action": "find_file", "query": "find that pdf I was reading yesterday"}),
+    ("send that battery report", "find_file", {"action": "find_file", "query": "send that battery report"}),
+    ("the document i had open with the camera on", "find_file",
+     {"action": "find_file", "query": "the document i had open with the camera on"}),
+    ("i was working on the cpu benchmark", "find_file",
+     {"action": "find_file", "query": "i was working on the cpu benchmark"}),
+
+    ("turn the camera on", "camera_on", {"action": "camera_stream", "value": "on"}),
+    ("Camera OFF", "camera_off", {"action": "camera_stream", "value": "off"}),
+    ("/sleep", "system_sleep", {"action": "system_sleep"}),
+    ("/shutdown", "shutdown_pc", {"action": "shutdown_pc"}),
+    ("take a screenshot", "take_screenshot", {"action": "take_screenshot"}),
+    ("screenshot this tab", "browser_screenshot",
+     {"action": "browser_control", "command": "screenshot", "query": "screenshot this tab"}),
+    ("how much battery is left", "check_battery", {"action": "check_battery"}),
+    # Earlier rules shadow later ones: battery comes before health
+    ("battery and cpu", "check_battery", {"action": "check_battery"}),
+    ("is the pc lagging", "check_health", {"action": "check_health"}),
+    ("My name is Alex.", "save_memory", {"action": "save_memory", "key": "user_name", "value": "Alex"}),
+    ("record audio", "record_audio", {"action": "record_audio", "duration": 10}),
+    ("what's open right now", "get_activities", {"action": "get_activities"}),
+    ("empty the bin", "clear_recycle_bin", {"action": "clear_recycle_bin"}),
+    ("how much storage do I have", "check_storage", {"action": "check_storage"}),
+    ("show clipboard history", "get_clipboard_history", {"action": "get_clipboard_history"}),
+    ("keep awake for a while", "caffeine_on", {"action": "toggle_caffeine", "state": True}),
+    ("disable caffeine", "caffeine_off", {"action": "toggle_caffeine", "state": False}),
+
+    ("close the youtube tab", "browser_close",
+     {"action": "browser_control", "command": "close", "query": "close the youtube tab"}),
+    ("mute this tab", "browser_mute", {"action": "browser_control", "command": "mute", "query": "mute this tab"}),
+    ("pause the youtube video", "browser_playback",
+     {"action": "browser_control", "command": "pause", "query": "pause the youtube video"}),
+    # The browser playback rule sits above the media keys, as in the original if/elif chain
+    ("play music", "browser_playback", {"action": "browser_control", "command": "play", "query": "play music"}),
+    ("unpause", "media_play", {"action": "control_media", "media_action": "playpause"}),
+    ("skip song", "media_next", {"action": "control_media", "media_action": "nexttrack"}),
+    ("go back", "media_prev", {"action": "control_media", "media_action": "prevtrack"}),
+    ("mute the volume", "media_mute", {"action": "control_media", "media_action": "volumemute"}),
+    ("set volume to 35", "set_volume", {"action": "set_volume", "level": 35}),
+    ("volume 150", "set_volume", {"action": "set_volume", "level": 100}),
+]
+
+# Left to the LLM
+BRAIN_FALLTHROUGH = [
+    "",
+    "what's the weather like",
+    "tell me a joke",
+    "turn the volume up",         # set_volume needs a number
+    "open my resume",
+    "BATTERIES are expensive",    # 'batteries' contains 'batter', not 'battery'
+]
+
+TELEGRAM_CASES = [
+    ("/battery", "check_battery", {"action": "check_battery"}),
+    ("/systemhealth", "check_health", {"action": "check_health"}),
+    ("/screenshot", "take_screenshot", {"action": "take_screenshot"}),
+    ("🚨 Panic", "system_panic", {"action": "system_panic"}),
+    ("where is my laptop", "get_location", {"action": "get_location"}),
+    ("/activities", "get_activities", {"action": "get_activities"}),
+    # Rules without a command are handled by name in telegram.handle_message
+    ("/recordaudio", "record_audio", None),
+    ("/media", "media_menu", None),
+    ("/caffeine", "caffeine", None),
+    ("☕ Stay Awake", "caffeine_on", {"action": "toggle_caffeine", "state": True}),
+    ("💤 Normal Mode", "caffeine_off", {"action": "toggle_caffeine", "state": False}),
+    ("/focus_mode_on", "focus_on", {"action": "focus_mode", "sub_action": "on"}),
+    ("/blacklist add Steam discord", "blacklist",
+     {"action": "focus_mode", "sub_action": "add", "items": ["steam", "discord"]}),
+    ("/blacklist", "blacklist", {"action": "focus_mode", "sub_action": "status"}),
+    ("/scroll up", "browser_scroll", {"action": "browser_nav", "sub_action": "scroll", "direction": "up"}),
+    ("scroll down", "browser_scroll", {"action": "browser_nav", "sub_action": "scroll", "direction": "down"}),
+    ("/type #search hello world", "browser_type",
+     {"action": "browser_nav", "sub_action": "type", "selector": "#search", "text": "hello world"}),
+    ("/type", "browser_type", None),
+    ("/click .play-button", "browser_click", {"action": "browser_nav", "sub_action": "click", "selector": ".play-button"}),
+]
+
+TELEGRAM_FALLTHROUGH = [
+    "hello",
+    "screenshot this tab",        # Tab screenshots go through the LLM here
+    "what did you do today",
+]
+
+
+@pytest.mark.parametrize("text, name, command", BRAIN_CASES)
+def test_brain_routing(text, name, command):
+    match = brain_router.match(text)
+    assert match is not None, f"{text!r} fell through"
+    assert (match.name, match.command) == (name, command)
+    assert route_command(text) == command
+
+
+@pytest.mark.parametrize("text", BRAIN_FALLTHROUGH)
+def test_brain_fallthrough(text):
+    assert route_command(text) is None
+
+
+@pytest.mark.parametrize("text, name, command", TELEGRAM_CASES)
+def test_telegram_routing(text, name, command):
+    match = telegram_router.match(text)
+    assert match is not None, f"{text!r} fell through"
+    assert (match.name, match.command) == (name, command)
+
+
+@pytest.mark.parametrize("text", TELEGRAM_FALLTHROUGH)
+def test_telegram_fallthrough(text):
+    assert telegram_router.match(text) is None
+
+
+def test_commands_are_fresh_copies():
+    first = route_command("/sleep")
+    first["action"] = "changed"
+    assert route_command("/sleep") == {"action": "system_sleep"}
+
+
+def test_phrase_matcher_agrees_with_substring_checks():
+    phrases = sorted({phrase for rule in BRAIN_RULES for phrase in rule.phrases()})
+    matcher = PhraseMatcher(phrases)
+    rng = random.Random(3)
+    # Random concatenations of phrase fragments produce plenty of overlaps and near misses
+    for _ in range(500):
+        text = " ".join(rng.choice(phrases)[:rng.randint(1, 12)] for _ in range(rng.randint(1, 6)))
+        assert matcher.find(text) == {phrase for phrase in phrases if phrase in text}, text